@@ -0,0 +1,169 @@
+import json
+import logging
+import os
+import threading
+
+import numpy as np
+
+from api.candles import CANDLE_DTYPE
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILENAME = "index.json"
+
+
+class CandleStore:
+    """
+    Persistent per-(symbol, interval) candle history on disk.
+
+    Each series is a flat file of CANDLE_DTYPE records sorted by timestamp
+    that only ever grows: new candles are appended and only the last record,
+    a bar that may still have been forming, is rewritten in place. Files are
+    read through read-only memory maps, so reads are zero-copy and months of
+    M1 history never have to fit in RAM. index.json records every series
+    with its record count and first/last timestamps.
+    """
+
+    def __init__(self, root_dir):
+        self.root_dir = root_dir
+        self.lock = threading.Lock()
+        self.maps = {}
+
+        os.makedirs(self.root_dir, exist_ok=True)
+        self.index = self._load_index()
+
+    def reload(self):
+        """
+        Re-read index.json and drop open maps. Call before appending when
+        another process may have written to the store since it was opened
+        """
+        with self.lock:
+            self.index = self._load_index()
+            self.maps.clear()
+
+    def series(self):
+        """Return index entries for every stored series"""
+        with self.lock:
+            return [dict(entry) for entry in self.index.values()]
+
+    def append(self, symbol, interval, candles):
+        """
+        Write a sorted CANDLE_DTYPE array through to disk. Candles older than
+        the last stored one are ignored; a candle with the same timestamp as
+        the last stored one replaces it
+        """
+        if not len(candles):
+            return
+
+        with self.lock:
+            key = self._key(symbol, interval)
+            entry = self.index.get(key)
+            count = entry["count"] if entry else 0
+            offset = count
+
+            if entry:
+                last_timestamp = entry["last_timestamp"]
+                candles = candles[candles["timestamp"] >= last_timestamp]
+                if not len(candles):
+                    return
+                if candles["timestamp"][0] == last_timestamp:
+                    offset = count - 1
+
+            path = os.path.join(self.root_dir, self._filename(symbol, interval))
+            with open(path, "r+b" if entry else "wb") as f:
+                f.seek(offset * CANDLE_DTYPE.itemsize)
+                f.write(np.ascontiguousarray(candles, dtype=CANDLE_DTYPE).tobytes())
+
+            self.index[key] = {
+                "symbol": symbol,
+                "interval": interval,
+                "file": self._filename(symbol, interval),
+                "count": offset + len(candles),
+                "first_timestamp": entry["first_timestamp"] if entry else int(candles["timestamp"][0]),
+                "last_timestamp": int(candles["timestamp"][-1]),
+            }
+            self._save_index()
+
+    def first_timestamp(self, symbol, interval):
+        """Return the open time of the oldest stored candle, or None for an unknown series"""
+        with self.lock:
+            entry = self.index.get(self._key(symbol, interval))
+            return entry["first_timestamp"] if entry and entry["count"] else None
+
+    def read(self, symbol, interval, start_timestamp=None, end_timestamp=None):
+        """
+        Return a read-only memory-mapped view of the candles with
+        start_timestamp <= timestamp <= end_timestamp (both optional)
+        """
+        candles = self._map(symbol, interval)
+        timestamps = candles["timestamp"]
+
+        lo = 0 if start_timestamp is None else np.searchsorted(timestamps, start_timestamp, side="left")
+        hi = len(candles) if end_timestamp is None else np.searchsorted(timestamps, end_timestamp, side="right")
+        return candles[lo:hi]
+
+    def tail(self, symbol, interval, limit):
+        candles = self._map(symbol, interval)
+        return candles[-limit:] if limit else candles[:0]
+
+    def _map(self, symbol, interval):
+        """Return a memory map over the whole series, reopened when it has grown"""
+        with self.lock:
+            key = self._key(symbol, interval)
+            entry = self.index.get(key)
+            if not entry or not entry["count"]:
+                return np.empty(0, dtype=CANDLE_DTYPE)
+
+            candles = self.maps.get(key)
+            if candles is None or len(candles) != entry["count"]:
+                candles = np.memmap(
+                    os.path.join(self.root_dir, entry["file"]),
+                    dtype=CANDLE_DTYPE,
+                    mode="r",
+                    shape=(entry["count"],)
+                )
+                self.maps[key] = candles
+            return candles
+
+    def _load_index(self):
+        path = os.path.join(self.root_dir, INDEX_FILENAME)
+        if not os.path.exists(path):
+            return {}
+
+        try:
+            with open(path) as f:
+                entries = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.error(f"Error reading candle store index: {str(e)}")
+            return {}
+
+        # Trust the files over the index if a write was interrupted
+        index = {}
+        for entry in entries:
+            path = os.path.join(self.root_dir, entry["file"])
+            if not os.path.exists(path):
+                continue
+            count = os.path.getsize(path) // CANDLE_DTYPE.itemsize
+            if count < entry["count"]:
+                entry["count"] = count
+                if not count:
+                    continue
+                last = np.memmap(path, dtype=CANDLE_DTYPE, mode="r", shape=(count,))[-1]
+                entry["last_timestamp"] = int(last["timestamp"])
+            index[self._key(entry["symbol"], entry["interval"])] = entry
+        return index
+
+    def _save_index(self):
+        path = os.path.join(self.root_dir, INDEX_FILENAME)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(list(self.index.values()), f, indent=1)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def _key(symbol, interval):
+        return (symbol, interval)
+
+    @staticmethod
+    def _filename(symbol, interval):
+        return f"{symbol.replace('/', '_')}_{interval}.bin"
@@ -0,0 +1,127 @@
+import numpy as np
+from datetime import datetime
+
+
+# Columnar candle layout used by the buffers and the columnar return mode
+CANDLE_DTYPE = np.dtype([
+    ("datetime", "M8[s]"),
+    ("timestamp", "i8"),
+    ("open", "f8"),
+    ("high", "f8"),
+    ("low", "f8"),
+    ("close", "f8"),
+    ("volume", "f8"),
+])
+
+DATETIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+def candles_to_array(rows):
+    """
+    Convert provider rows (or candle dicts) into a CANDLE_DTYPE array sorted
+    from oldest to newest. Datetimes are parsed in one vectorised pass
+    """
+    candles = np.empty(len(rows), dtype=CANDLE_DTYPE)
+    if not len(rows):
+        return candles
+
+    candles["datetime"] = np.array([row['datetime'] for row in rows], dtype="M8[s]")
+    for column in ("open", "high", "low", "close"):
+        candles[column] = np.array([row[column] for row in rows], dtype="f8")
+    candles["volume"] = np.array([row.get('volume', 0) for row in rows], dtype="f8")
+
+    # Timestamps are local epoch seconds, as datetime.timestamp() gives for the
+    # provider's naive datetimes; fall back to per-row parsing across a DST change
+    wall_seconds = candles["datetime"].astype("i8")
+    first_offset = int(datetime.strptime(rows[0]['datetime'], DATETIME_FORMAT).timestamp()) - wall_seconds[0]
+    last_offset = int(datetime.strptime(rows[-1]['datetime'], DATETIME_FORMAT).timestamp()) - wall_seconds[-1]
+    if first_offset == last_offset:
+        candles["timestamp"] = wall_seconds + first_offset
+    else:
+        candles["timestamp"] = [
+            int(datetime.strptime(row['datetime'], DATETIME_FORMAT).timestamp()) for row in rows
+        ]
+
+    return candles[np.argsort(candles["timestamp"], kind="stable")]
+
+
+def array_to_candles(candles):
+    """Convert a CANDLE_DTYPE array into the list-of-dicts candle format"""
+    datetimes = np.datetime_as_string(candles["datetime"], unit="s")
+    return [
+        {
+            "datetime": dt.replace("T", " "),
+            "timestamp": int(timestamp),
+            "open": float(open_price),
+            "high": float(high_price),
+            "low": float(low_price),
+            "close": float(close_price),
+            "volume": float(volume)
+        }
+        for dt, timestamp, open_price, high_price, low_price, close_price, volume in zip(
+            datetimes,
+            candles["timestamp"].tolist(),
+            candles["open"].tolist(),
+            candles["high"].tolist(),
+            candles["low"].tolist(),
+            candles["close"].tolist(),
+            candles["volume"].tolist()
+        )
+    ]
+
+
+class CandleBuffer:
+    """
+    Fixed-capacity candle buffer for one (symbol, interval), stored as a
+    CANDLE_DTYPE array sorted by timestamp. Merges build a new array, so
+    views handed out by tail() and range() are never modified afterwards
+    """
+
+    def __init__(self, capacity=500):
+        self.capacity = capacity
+        self.candles = np.empty(0, dtype=CANDLE_DTYPE)
+        self.fetched_limit = 0
+        self.next_refresh = 0
+        self.forced_refresh_at = 0
+        self.last_merged = None  # Last merged provider response, to skip merging it twice
+
+    def __len__(self):
+        return len(self.candles)
+
+    @property
+    def first_candle(self):
+        return array_to_candles(self.candles[:1])[0] if len(self.candles) else None
+
+    @property
+    def last_candle(self):
+        return array_to_candles(self.candles[-1:])[0] if len(self.candles) else None
+
+    def get(self, timestamp):
+        """Return the candle opening at timestamp, or None"""
+        timestamps = self.candles["timestamp"]
+        i = np.searchsorted(timestamps, timestamp, side="left")
+        if i < len(timestamps) and timestamps[i] == timestamp:
+            return array_to_candles(self.candles[i:i + 1])[0]
+        return None
+
+    def range(self, start_timestamp, end_timestamp):
+        """Return candles with start_timestamp <= timestamp <= end_timestamp"""
+        timestamps = self.candles["timestamp"]
+        lo = np.searchsorted(timestamps, start_timestamp, side="left")
+        hi = np.searchsorted(timestamps, end_timestamp, side="right")
+        return self.candles[lo:hi]
+
+    def merge(self, candles):
+        """
+        Merge a sorted CANDLE_DTYPE array; cached candles from the first new
+        timestamp onwards are replaced, so a still-forming bar gets updated
+        """
+        if not len(candles):
+            return
+
+        cut = np.searchsorted(self.candles["timestamp"], candles["timestamp"][0], side="left")
+        self.candles = np.concatenate((self.candles[:cut], candles))[-self.capacity:]
+        self.candles.setflags(write=False)
+
+    def tail(self, limit):
+        return self.candles[-limit:] if limit else self.candles[:0]
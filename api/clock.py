@@ -0,0 +1,50 @@
+import threading
+import time
+from datetime import datetime
+
+
+class SystemClock:
+    """Wall-clock time; the default clock of PocketOptionAPI and MarketAnalyzer"""
+
+    def time(self):
+        return time.time()
+
+    def now(self):
+        return datetime.fromtimestamp(self.time())
+
+    def sleep(self, seconds):
+        time.sleep(seconds)
+
+
+class ReplayClock(SystemClock):
+    """
+    Clock for replaying recorded sessions, starting at start_time.
+
+    With a speed (1 for real time, 100 for 100x) replay time runs that many
+    times faster than wall-clock time and sleep() is shortened to match.
+    With speed=None it runs as fast as possible: time only moves when
+    someone sleeps, and sleep() returns immediately.
+    """
+
+    def __init__(self, start_time, speed=None):
+        if speed is not None and speed <= 0:
+            raise ValueError("Replay speed must be positive, or None for as fast as possible")
+
+        self.start_time = start_time
+        self.speed = speed
+        self.started_at = time.monotonic()
+        self.virtual_time = start_time
+        self.lock = threading.Lock()
+
+    def time(self):
+        if self.speed is None:
+            with self.lock:
+                return self.virtual_time
+        return self.start_time + (time.monotonic() - self.started_at) * self.speed
+
+    def sleep(self, seconds):
+        if self.speed is None:
+            with self.lock:
+                self.virtual_time += max(0.0, seconds)
+            return
+        time.sleep(max(0.0, seconds) / self.speed)
@@ -3,148 +3,620 @@ import json
 import logging
 import requests
 from datetime import datetime, timedelta
-import random
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+import numpy as np
 from twelvedata import TDClient
 
+from api.candles import CANDLE_DTYPE, DATETIME_FORMAT, CandleBuffer, array_to_candles, candles_to_array
+from api.clock import ReplayClock, SystemClock
+from api.replay_provider import ProviderRecorder, ReplayProvider
+from api.synthetic_feed import SyntheticMarketFeed
+from api.request_scheduler import PRIORITY_ANALYSIS, PRIORITY_RESULT, RequestDeferred, RequestScheduler
+from api.timeframe_aggregator import TimeframeAggregator
+
 logger = logging.getLogger(__name__)
 
+# Map application timeframes (M1, M5, ...) to Twelve Data intervals
+TIMEFRAME_INTERVALS = {
+    "M1": "1min",
+    "M5": "5min",
+    "M15": "15min",
+    "M30": "30min",
+    "H1": "1h",
+}
+
+# Length of one candle in seconds for each interval
+INTERVAL_SECONDS = {
+    "1min": 60,
+    "5min": 300,
+    "15min": 900,
+    "30min": 1800,
+    "1h": 3600,
+}
+
+# Intervals built locally from the M1 stream instead of fetched
+AGGREGATED_INTERVALS = ("5min", "15min", "30min", "1h")
+
+# Minimum seconds between forced refreshes of one buffer on a lookup miss
+FORCED_REFRESH_INTERVAL = 5
+
+# Provider requests for one bar older than the buffer before the lookup gives up
+CANDLE_LOOKUP_ATTEMPTS = 3
+
+# Bars remembered as missing; the oldest are forgotten first
+MISSING_CANDLES_CAPACITY = 1024
+
+# Backoff between recovery probes while in scalping mode (seconds)
+PROVIDER_RETRY_INITIAL = 5
+PROVIDER_RETRY_MAX = 300
+
+# Credit budget while replaying: provider-side limits are already part of
+# the recording, and the scheduler runs on wall-clock time
+REPLAY_CREDITS_PER_MINUTE = 10 ** 6
+
+
 class PocketOptionAPI:
-    def __init__(self):
-        self.twelve_data_key = os.environ.get("TWELVE_DATA_KEY", "")
-        self.td_client = TDClient(apikey=self.twelve_data_key)
+    def __init__(self, buffer_capacity=500, synthetic_seed=None, candle_store=None, credits_per_minute=None,
+                 clock=None, provider=None, record_path=None):
         self.logger = logging.getLogger(__name__)
+
+        # Every time read goes through the clock so recorded sessions can be replayed
+        self.clock = clock or SystemClock()
+
+        # provider replaces the Twelve Data client (e.g. a ReplayProvider);
+        # with record_path every Twelve Data response is recorded
+        self.provider = provider
+        self.record_path = record_path if record_path is not None else os.environ.get("MARKET_DATA_RECORD_PATH")
+
+        self.twelve_data_key = os.environ.get("TWELVE_DATA_KEY", "")
+        self.td_client = self._create_client(self.twelve_data_key)
         self.using_scalping = False
 
+        # Provider credit budget and recovery probing
+        if credits_per_minute is None:
+            credits_per_minute = int(os.environ.get("TWELVE_DATA_CREDITS_PER_MINUTE", 8))
+        self.request_scheduler = RequestScheduler(credits_per_minute)
+        self.provider_failures = 0
+        self.provider_retry_at = 0
+
+        # Per-(symbol, interval) candle cache
+        self.buffer_capacity = buffer_capacity
+        self.candle_buffers = {}
+        self.buffer_lock = threading.Lock()
+
+        # In-flight provider requests, (symbol, interval, outputsize, start, end) -> Future
+        self.inflight_requests = {}
+        self.inflight_lock = threading.Lock()
+        self.coalesced_requests = 0
+
+        # Old bars the provider did not return, (symbol, interval, timestamp) -> attempts
+        self.missing_candles = OrderedDict()
+
+        # Fallback feed when Twelve Data is unavailable
+        self.synthetic_feed = SyntheticMarketFeed(seed=synthetic_seed, capacity=buffer_capacity, clock=self.clock.time)
+
+        # Optional on-disk history (CandleStore); provider candles are written through
+        self.candle_store = candle_store
+
+        # Higher timeframes derived from the cached M1 candles
+        self.timeframe_aggregator = TimeframeAggregator(capacity=buffer_capacity)
+
+    @classmethod
+    def from_recording(cls, path, speed=None, **kwargs):
+        """
+        Create an API that replays a provider recording instead of calling
+        Twelve Data, on a clock starting at the first recorded request.
+        speed is 1 for real time, 100 for 100x or None for as fast as possible
+        """
+        provider = ReplayProvider(path)
+        if provider.start_time is None:
+            raise ValueError(f"Provider recording {path} is empty")
+
+        provider.clock = ReplayClock(provider.start_time, speed)
+        kwargs.setdefault("credits_per_minute", REPLAY_CREDITS_PER_MINUTE)
+        return cls(clock=provider.clock, provider=provider, **kwargs)
+
+    def _create_client(self, api_key):
+        if self.provider is not None:
+            return self.provider
+
+        client = TDClient(apikey=api_key)
+        if self.record_path:
+            client = ProviderRecorder(client, self.record_path, self.clock)
+        return client
+
     def set_api_key(self, api_key):
         self.twelve_data_key = api_key
-        self.td_client = TDClient(apikey=self.twelve_data_key)
+        self.td_client = self._create_client(self.twelve_data_key)
         self.using_scalping = False
+        self.provider_failures = 0
+        self.provider_retry_at = 0
+        with self.buffer_lock:
+            self.candle_buffers.clear()
+        self.timeframe_aggregator = TimeframeAggregator(capacity=self.buffer_capacity)
 
-    def get_historical_data(self, symbol, timeframe="1min", limit=100):
-        if not self.using_scalping:
-            try:
-                # Convert symbol format
-                formatted_symbol = symbol.replace("/", "")
-
-                # Get forex data from Twelve Data
-                ts = self.td_client.time_series(
-                    symbol=formatted_symbol,
-                    interval=timeframe,
-                    outputsize=limit
+    @staticmethod
+    def _normalize_timeframe(timeframe):
+        """Convert an application timeframe (M1) to a Twelve Data interval (1min)"""
+        return TIMEFRAME_INTERVALS.get(timeframe, timeframe)
+
+    def get_historical_data(self, symbol, timeframe="1min", limit=100, columnar=False,
+                            priority=PRIORITY_ANALYSIS):
+        return self.get_historical_data_many(
+            [symbol], timeframe, limit, columnar=columnar, priority=priority
+        )[symbol]
+
+    def get_historical_data_many(self, symbols, timeframe="1min", limit=100, columnar=False,
+                                 priority=PRIORITY_ANALYSIS, refresh=False):
+        """
+        Get candles for several symbols, refreshing every stale buffer in a
+        single batched provider request. Returns a dict of symbol -> candles,
+        either as lists of dicts or, with columnar=True, as read-only
+        CANDLE_DTYPE arrays that pd.DataFrame() takes without per-row work.
+
+        The request goes through the credit scheduler with the given
+        priority; when it is deferred, the cached candles are returned as is.
+        Higher timeframes are built from the M1 candles after a one-time seed.
+        With refresh=True the buffers are refreshed even before the next
+        candle boundary, which re-fetches the bar that is still forming
+        """
+        interval = self._normalize_timeframe(timeframe)
+        symbols = list(dict.fromkeys(symbols))
+
+        if not symbols:
+            return {}
+
+        if interval in AGGREGATED_INTERVALS and not self.using_scalping:
+            return self._get_aggregated_data_many(symbols, interval, limit, columnar, priority, refresh)
+
+        return self._get_provider_data_many(symbols, interval, limit, columnar, priority, refresh)
+
+    def _get_aggregated_data_many(self, symbols, interval, limit, columnar, priority, refresh=False):
+        """
+        Serve a higher timeframe from the M1 stream. A series without enough
+        history is seeded once with closed bars from the provider
+        """
+        tf_seconds = INTERVAL_SECONDS[interval]
+
+        # Keep the M1 stream current, usually straight from the cache; the
+        # window covers the open bar of the timeframe
+        base_limit = max(100, tf_seconds // 60)
+        base_candles = self.get_historical_data_many(
+            symbols, "1min", base_limit, columnar=True, priority=priority, refresh=refresh
+        )
+        if self.using_scalping:
+            return self._generate_scalping_data_many(symbols, interval, limit, columnar=columnar)
+
+        unseeded = [
+            symbol for symbol in symbols
+            if not self.timeframe_aggregator.has(symbol, tf_seconds, limit)
+        ]
+        if unseeded:
+            seeds = self._get_provider_data_many(unseeded, interval, limit, True, priority)
+            if self.using_scalping:
+                return self._generate_scalping_data_many(symbols, interval, limit, columnar=columnar)
+            for symbol in unseeded:
+                self.timeframe_aggregator.seed(
+                    symbol, tf_seconds, seeds[symbol], base_candles[symbol], limit=limit
                 )
-                data = ts.as_json()
-
-                if not data:
-                    raise Exception("Empty response from Twelve Data")
-
-                # Format data
-                candles = []
-                for item in data:
-                    candle = {
-                        "datetime": item['datetime'],
-                        "timestamp": int(datetime.strptime(item['datetime'], '%Y-%m-%d %H:%M:%S').timestamp()),
-                        "open": float(item['open']),
-                        "high": float(item['high']),
-                        "low": float(item['low']),
-                        "close": float(item['close']),
-                        "volume": float(item.get('volume', 0))
+
+        candles = {
+            symbol: self.timeframe_aggregator.candles(symbol, tf_seconds, limit)
+            for symbol in symbols
+        }
+        if columnar:
+            return candles
+        return {symbol: array_to_candles(data) for symbol, data in candles.items()}
+
+    def _get_provider_data_many(self, symbols, interval, limit, columnar, priority, refresh=False):
+        if not self.using_scalping or self.clock.time() >= self.provider_retry_at:
+            try:
+                with self.buffer_lock:
+                    buffers = {}
+                    for symbol in symbols:
+                        buffer = self.candle_buffers.get((symbol, interval))
+                        if buffer is None:
+                            buffer = self._create_buffer(symbol, interval, limit)
+                            self.candle_buffers[(symbol, interval)] = buffer
+                        buffers[symbol] = buffer
+
+                    # Only go to the provider for buffers where a new candle is due
+                    now = self.clock.time()
+                    stale = {
+                        symbol: buffer for symbol, buffer in buffers.items()
+                        if refresh or limit > buffer.fetched_limit or now >= buffer.next_refresh
                     }
-                    candles.append(candle)
 
-                return candles
+                # Fetched without holding the lock, so concurrent callers
+                # asking for the same candles share one request
+                if stale:
+                    self._refresh_buffers(stale, interval, limit, priority)
+
+                with self.buffer_lock:
+                    candles = {symbol: buffer.tail(limit) for symbol, buffer in buffers.items()}
+
+                self._provider_recovered()
+
+                if columnar:
+                    return candles
+                return {symbol: array_to_candles(data) for symbol, data in candles.items()}
+
+            except RequestDeferred:
+                if not self.using_scalping:
+                    with self.buffer_lock:
+                        candles = {symbol: buffer.tail(limit) for symbol, buffer in buffers.items()}
+                    if columnar:
+                        return candles
+                    return {symbol: array_to_candles(data) for symbol, data in candles.items()}
 
             except Exception as e:
-                self.logger.error(f"Error getting data from Twelve Data: {str(e)}")
-                self.logger.info("Switching to scalping mode")
-                self.using_scalping = True
+                self._provider_failed(e)
 
         # Fallback to scalping simulation
-        return self._generate_scalping_data(symbol, timeframe, limit)
-
-    def _generate_scalping_data(self, symbol, timeframe="1min", limit=100):
-        """
-        Generate realistic scalping data with micro-trends
-        """
-        self.logger.info(f"Generating scalping data for {symbol}")
-
-        # Determine timeframe in minutes
-        tf_minutes = 1
-        if timeframe == "5min":
-            tf_minutes = 5
-        elif timeframe == "15min":
-            tf_minutes = 15
-
-        # Base price and trend settings
-        base_price = self._get_base_price(symbol)
-        trend_duration = random.randint(5, 15)  # Micro-trend duration
-        trend_direction = random.choice([-1, 1])  # -1 for down, 1 for up
-        trend_strength = random.uniform(0.0001, 0.0003)  # Per-candle trend
-
-        candles = []
-        end_time = datetime.now().replace(second=0, microsecond=0)
-        current_price = base_price
-        trend_count = 0
-
-        for i in range(limit-1, -1, -1):
-            candle_time = end_time - timedelta(minutes=i * tf_minutes)
-
-            # Change trend if duration exceeded
-            if trend_count >= trend_duration:
-                trend_direction = -trend_direction
-                trend_duration = random.randint(5, 15)
-                trend_strength = random.uniform(0.0001, 0.0003)
-                trend_count = 0
-
-            # Calculate price movement
-            trend_move = current_price * trend_strength * trend_direction
-            noise = random.uniform(-0.0001, 0.0001) * current_price
-            total_move = trend_move + noise
-
-            # Generate OHLC
-            open_price = current_price
-            close_price = current_price + total_move
-            high_price = max(open_price, close_price) + abs(random.uniform(0, total_move))
-            low_price = min(open_price, close_price) - abs(random.uniform(0, total_move))
-
-            # Update current price for next candle
-            current_price = close_price
-
-            # Generate realistic volume
-            volume = random.randint(100, 1000)
-
-            candle = {
-                "datetime": candle_time.strftime("%Y-%m-%d %H:%M:%S"),
-                "timestamp": int(candle_time.timestamp()),
-                "open": round(open_price, 5),
-                "high": round(high_price, 5),
-                "low": round(low_price, 5),
-                "close": round(close_price, 5),
-                "volume": volume
-            }
-
-            candles.append(candle)
-            trend_count += 1
+        return self._generate_scalping_data_many(symbols, interval, limit, columnar=columnar)
+
+    def _create_buffer(self, symbol, interval, limit):
+        """
+        Create a buffer, warm-started from the candle store when it holds
+        enough history so only the candles since the last run are fetched
+        """
+        buffer = CandleBuffer(max(self.buffer_capacity, limit))
+
+        if self.candle_store is not None:
+            stored = self.candle_store.tail(symbol, interval, buffer.capacity)
+            if len(stored) >= limit:
+                buffer.merge(np.array(stored))
+                buffer.fetched_limit = len(stored)
+
+        return buffer
+
+    def _provider_recovered(self):
+        if self.using_scalping:
+            self.logger.info("Twelve Data available again, leaving scalping mode")
+        self.using_scalping = False
+        self.provider_failures = 0
+
+    def _provider_failed(self, error):
+        """Switch to scalping mode and schedule the next recovery probe with backoff"""
+        self.logger.error(f"Error getting data from Twelve Data: {str(error)}")
+
+        self.provider_failures += 1
+        backoff = min(PROVIDER_RETRY_MAX, PROVIDER_RETRY_INITIAL * 2 ** (self.provider_failures - 1))
+
+        # Out of credits for the current minute: nothing can succeed before the next one
+        if "credits" in str(error).lower():
+            retry_after = 60 - self.clock.time() % 60
+            self.request_scheduler.penalize(retry_after)
+            backoff = max(backoff, retry_after)
+
+        self.provider_retry_at = self.clock.time() + backoff
+
+        if not self.using_scalping:
+            self.logger.info("Switching to scalping mode")
+        self.logger.info(f"Retrying Twelve Data in {round(backoff)}s")
+        self.using_scalping = True
+
+    def can_refresh(self, symbols, reserve, within):
+        """
+        True if refreshing the buffers of symbols now still leaves `reserve`
+        credits for an analysis batch due in `within` seconds. The fallback
+        feed costs nothing
+        """
+        if self.using_scalping:
+            return True
+        return self.request_scheduler.can_spare(len(symbols), reserve, within)
+
+    def get_provider_stats(self):
+        """Report credit usage, scheduler queue depth and provider state"""
+        stats = self.request_scheduler.stats()
+        stats["using_scalping"] = self.using_scalping
+        stats["provider_failures"] = self.provider_failures
+        stats["coalesced_requests"] = self.coalesced_requests
+        stats["next_probe_in"] = round(max(0.0, self.provider_retry_at - self.clock.time()), 1) if self.using_scalping else 0
+        return stats
+
+    def _refresh_buffers(self, buffers, interval, limit, priority=PRIORITY_ANALYSIS):
+        """
+        Fetch only the candles missing from each buffer; the last cached candle
+        is requested again because it may still have been forming. Empty
+        buffers and buffers that already hold data are fetched in one batch each.
+        Called without buffer_lock; the lock is only taken to plan and merge
+        """
+        tf_seconds = INTERVAL_SECONDS.get(interval, 60)
+        now = self.clock.time()
+
+        with self.buffer_lock:
+            full = [symbol for symbol, buffer in buffers.items() if limit > buffer.fetched_limit]
+            delta = [symbol for symbol in buffers if symbol not in full]
+
+            requests_to_send = []
+            if full:
+                requests_to_send.append((full, {"outputsize": limit}))
+            if delta:
+                last_candles = [buffers[symbol].last_candle for symbol in delta]
+                oldest = min(last_candles, key=lambda candle: candle['timestamp'])
+                missing = int((now - oldest['timestamp']) // tf_seconds) + 1
+                requests_to_send.append((delta, {
+                    # At least one bar: the local clock may lag the provider's timestamps
+                    "outputsize": max(1, min(missing, self.buffer_capacity)),
+                    "start_date": oldest['datetime']
+                }))
+
+        next_refresh = (now // tf_seconds + 1) * tf_seconds
+        deferred = False
+        for symbols, params in requests_to_send:
+            try:
+                fetched = self._fetch_candles_many(symbols, interval, priority=priority, **params)
+            except RequestDeferred:
+                # Stays stale and is retried with the next batch
+                deferred = True
+                continue
+
+            with self.buffer_lock:
+                for symbol in symbols:
+                    buffer = buffers[symbol]
+                    candles = fetched.get(symbol)
+                    if candles is None or not len(candles):
+                        self.logger.warning(f"No data from Twelve Data for {symbol}")
+                        continue
+
+                    # A shared response merged by another caller already, or
+                    # one that finished after a newer refresh: nothing to add
+                    if candles is buffer.last_merged or (
+                            len(buffer) and candles["timestamp"][-1] < buffer.candles["timestamp"][-1]):
+                        continue
+
+                    buffer.merge(candles)
+                    buffer.last_merged = candles
+                    if symbol in full:
+                        buffer.fetched_limit = max(buffer.fetched_limit, limit)
+
+                    if interval == "1min":
+                        self.timeframe_aggregator.update(symbol, candles)
+
+                    if self.candle_store is not None:
+                        try:
+                            self.candle_store.append(symbol, interval, candles)
+                        except OSError as e:
+                            self.logger.error(f"Error writing candles for {symbol} to store: {str(e)}")
+
+                    # Next refresh at the next candle boundary
+                    buffer.next_refresh = next_refresh
+
+        if deferred:
+            raise RequestDeferred("Part of the refresh was deferred")
+
+    def _fetch_candles_many(self, symbols, interval, outputsize, start_date=None, end_date=None,
+                            priority=PRIORITY_ANALYSIS):
+        """
+        Fetch candles with in-flight coalescing: a symbol that is already
+        being fetched for the same (interval, outputsize, start_date,
+        end_date) is not requested again, the caller waits for the running
+        request and gets the same result (or exception) instead
+        """
+        window = (interval, outputsize, start_date, end_date)
+
+        with self.inflight_lock:
+            shared = {}
+            own = []
+            for symbol in symbols:
+                future = self.inflight_requests.get((symbol,) + window)
+                if future is not None:
+                    shared[symbol] = future
+                else:
+                    own.append(symbol)
+
+            if own:
+                own_future = Future()
+                for symbol in own:
+                    self.inflight_requests[(symbol,) + window] = own_future
+
+        candles = {}
+        if own:
+            try:
+                candles = self._request_candles_many(own, interval, outputsize, start_date, end_date, priority)
+                own_future.set_result(candles)
+            except BaseException as e:
+                own_future.set_exception(e)
+                raise
+            finally:
+                with self.inflight_lock:
+                    for symbol in own:
+                        self.inflight_requests.pop((symbol,) + window, None)
+
+        if shared:
+            self.coalesced_requests += len(shared)
+        for symbol, future in shared.items():
+            result = future.result().get(symbol)
+            if result is not None:
+                candles[symbol] = result
 
         return candles
 
-    def _get_base_price(self, symbol):
-        """Get realistic base price for currency pair"""
-        if "JPY" in symbol:
-            return random.uniform(125.0, 135.0)
-        elif "USD" in symbol:
-            return random.uniform(1.1, 1.3)
-        elif "GBP" in symbol:
-            return random.uniform(1.2, 1.4)
-        elif "BTC" in symbol:
-            return random.uniform(35000.0, 45000.0)
-        return random.uniform(0.9, 1.1)
+    def _request_candles_many(self, symbols, interval, outputsize, start_date=None, end_date=None,
+                              priority=PRIORITY_ANALYSIS):
+        # Convert symbol format
+        formatted_symbols = {symbol.replace("/", ""): symbol for symbol in symbols}
+
+        # Get forex data from Twelve Data, one request for all symbols
+        params = {
+            "symbol": ",".join(formatted_symbols),
+            "interval": interval,
+            "outputsize": outputsize
+        }
+        if start_date:
+            params["start_date"] = start_date
+        if end_date:
+            params["end_date"] = end_date
+
+        # Twelve Data charges one credit per symbol in a batch
+        data = self.request_scheduler.execute(
+            lambda: self.td_client.time_series(**params).as_json(),
+            cost=len(symbols),
+            priority=priority
+        )
+
+        if not data:
+            raise Exception("Empty response from Twelve Data")
+
+        # A single symbol is not a batch request, so the response is a plain row list
+        if len(symbols) == 1:
+            return {symbols[0]: candles_to_array(data)}
+
+        candles = {}
+        for key, rows in data.items():
+            symbol = formatted_symbols.get(key.replace("/", "").upper())
+            if symbol is not None:
+                candles[symbol] = candles_to_array(rows)
+
+        return candles
+
+    def _generate_scalping_data(self, symbol, timeframe="1min", limit=100, columnar=False):
+        """
+        Generate realistic scalping data with micro-trends from the stateful
+        synthetic feed, so consecutive calls continue the same series
+        """
+        return self._generate_scalping_data_many([symbol], timeframe, limit, columnar=columnar)[symbol]
+
+    def _generate_scalping_data_many(self, symbols, timeframe="1min", limit=100, columnar=False):
+        self.logger.info(f"Generating scalping data for {', '.join(symbols)}")
+
+        interval = self._normalize_timeframe(timeframe)
+        candles = self.synthetic_feed.candles_many(symbols, INTERVAL_SECONDS.get(interval, 60), limit)
+
+        if columnar:
+            return candles
+        return {symbol: array_to_candles(data) for symbol, data in candles.items()}
+
+    def _get_scalping_candle(self, symbol, interval, timestamp):
+        """Look up a synthetic candle, extending the series up to now first"""
+        tf_seconds = INTERVAL_SECONDS.get(interval, 60)
+        self.synthetic_feed.candles(symbol, tf_seconds, 1)
+        return self.synthetic_feed.get(symbol, tf_seconds, timestamp)
 
     def get_candle_by_time(self, symbol, timeframe, candle_time):
-        data = self.get_historical_data(symbol, timeframe, 100)
+        """
+        Look up one candle by its open time. Cached candles are answered
+        without a request; the provider is only asked when the bar is newer
+        or older than everything in the buffer. An old bar is requested at
+        most CANDLE_LOOKUP_ATTEMPTS times, and never when it predates the
+        stored history. Returns None if not found
+        """
+        interval = self._normalize_timeframe(timeframe)
         target_timestamp = int(candle_time.timestamp())
 
-        for candle in data:
-            if candle['timestamp'] == target_timestamp:
+        if self.using_scalping:
+            return self._get_scalping_candle(symbol, interval, target_timestamp)
+
+        if interval in AGGREGATED_INTERVALS:
+            self.get_historical_data(symbol, interval, columnar=True, priority=PRIORITY_RESULT)
+            if self.using_scalping:
+                return self._get_scalping_candle(symbol, interval, target_timestamp)
+            return self.timeframe_aggregator.get(symbol, INTERVAL_SECONDS[interval], target_timestamp)
+
+        with self.buffer_lock:
+            buffer = self.candle_buffers.get((symbol, interval))
+            candle = buffer.get(target_timestamp) if buffer else None
+            if candle is not None:
+                return candle
+
+            # Bar closed after the last refresh: fetch new candles early
+            if (buffer is not None and buffer.last_candle is not None
+                    and target_timestamp > buffer.last_candle['timestamp']):
+                now = self.clock.time()
+                if now - buffer.forced_refresh_at >= FORCED_REFRESH_INTERVAL:
+                    buffer.forced_refresh_at = now
+                    buffer.next_refresh = 0
+
+        if buffer is None or buffer.next_refresh == 0:
+            self.get_historical_data(
+                symbol,
+                interval,
+                max(buffer.fetched_limit if buffer else 0, 100),
+                priority=PRIORITY_RESULT
+            )
+            with self.buffer_lock:
+                buffer = self.candle_buffers.get((symbol, interval))
+                candle = buffer.get(target_timestamp) if buffer else None
+            if self.using_scalping:
+                return self._get_scalping_candle(symbol, interval, target_timestamp)
+            if candle is not None:
                 return candle
 
-        return self._generate_scalping_data(symbol, timeframe, 1)[0]
\ No newline at end of file
+        # Bar older than the buffer: look in the store, then fetch just that bar
+        if (buffer is not None and buffer.first_candle is not None
+                and target_timestamp < buffer.first_candle['timestamp']):
+            if self.candle_store is not None:
+                stored = self.candle_store.read(symbol, interval, target_timestamp, target_timestamp)
+                if len(stored):
+                    return array_to_candles(stored)[0]
+
+                # Older than the stored history: never fetched, and not asked for again
+                first_stored = self.candle_store.first_timestamp(symbol, interval)
+                if first_stored is not None and target_timestamp < first_stored:
+                    return None
+
+            # Each missing bar costs a credit per attempt, so give up after a few
+            key = (symbol, interval, target_timestamp)
+            with self.buffer_lock:
+                if self.missing_candles.get(key, 0) >= CANDLE_LOOKUP_ATTEMPTS:
+                    return None
+
+            try:
+                bar_time = candle_time.strftime(DATETIME_FORMAT)
+                candles = self._fetch_candles_many(
+                    [symbol],
+                    interval,
+                    1,
+                    start_date=bar_time,
+                    end_date=bar_time,
+                    priority=PRIORITY_RESULT
+                ).get(symbol, np.empty(0, dtype=CANDLE_DTYPE))
+            except RequestDeferred:
+                # Not asked this time, so it does not count as an attempt
+                return None
+            except Exception as e:
+                self.logger.error(f"Error getting candle from Twelve Data: {str(e)}")
+                candles = np.empty(0, dtype=CANDLE_DTYPE)
+
+            for candle in array_to_candles(candles):
+                if candle['timestamp'] == target_timestamp:
+                    return candle
+
+            self._candle_missing(key)
+
+        return None
+
+    def _candle_missing(self, key):
+        """Count a provider lookup that did not return the bar"""
+        with self.buffer_lock:
+            self.missing_candles[key] = self.missing_candles.pop(key, 0) + 1
+            while len(self.missing_candles) > MISSING_CANDLES_CAPACITY:
+                self.missing_candles.popitem(last=False)
+
+    def get_candles_between(self, symbol, timeframe, start_time, end_time, columnar=False):
+        """
+        Return stored candles whose open time lies in [start_time, end_time],
+        from the on-disk store when there is one, otherwise from the cache
+        """
+        interval = self._normalize_timeframe(timeframe)
+
+        if self.candle_store is not None:
+            candles = self.candle_store.read(
+                symbol,
+                interval,
+                int(start_time.timestamp()),
+                int(end_time.timestamp())
+            )
+            return candles if columnar else array_to_candles(candles)
+
+        with self.buffer_lock:
+            buffer = self.candle_buffers.get((symbol, interval))
+            if buffer is None:
+                candles = np.empty(0, dtype=CANDLE_DTYPE)
+            else:
+                candles = buffer.range(int(start_time.timestamp()), int(end_time.timestamp()))
+
+        return candles if columnar else array_to_candles(candles)
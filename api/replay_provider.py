@@ -0,0 +1,205 @@
+import gzip
+import json
+import logging
+import threading
+import zlib
+
+from api.clock import SystemClock
+
+logger = logging.getLogger(__name__)
+
+
+class ReplayedProviderError(Exception):
+    """A provider error that was recorded and is raised again on replay"""
+
+
+class _Response:
+    """Deferred response with the as_json() interface of a Twelve Data time series"""
+
+    def __init__(self, fetch):
+        self.fetch = fetch
+
+    def as_json(self):
+        return self.fetch()
+
+
+class ProviderRecorder:
+    """
+    Wraps a Twelve Data client and records every time_series() response, or
+    the error raised instead, to a gzip-compressed JSON lines file:
+
+        {"t": <clock time>, "params": {...}, "data": <as_json() result>}
+        {"t": <clock time>, "params": {...}, "error": "<message>"}
+
+    Every record is written as its own gzip member, so a recording stays
+    readable up to the last complete request if the process is killed.
+    """
+
+    def __init__(self, client, path, clock=None):
+        self.client = client
+        self.path = path
+        self.clock = clock or SystemClock()
+        self.lock = threading.Lock()
+
+    def time_series(self, **params):
+        return _Response(lambda: self._record(params))
+
+    def _record(self, params):
+        recorded_at = self.clock.time()
+        try:
+            data = self.client.time_series(**params).as_json()
+        except Exception as e:
+            self._write({"t": recorded_at, "params": params, "error": str(e)})
+            raise
+
+        self._write({"t": recorded_at, "params": params, "data": data})
+        return data
+
+    def _write(self, record):
+        line = json.dumps(record, separators=(",", ":"), default=str) + "\n"
+        try:
+            with self.lock, gzip.open(self.path, "at", encoding="utf-8") as f:
+                f.write(line)
+        except OSError as e:
+            logger.error(f"Error writing provider recording: {str(e)}")
+
+
+class _ReplaySeries:
+    """Recorded events of one (symbol, interval) and the candles known so far"""
+
+    def __init__(self):
+        self.events = []     # (recorded time, rows or None, error or None)
+        self.cursor = 0
+        self.time = None
+        self.rows = {}       # datetime string -> row
+        self.ordered = None  # datetimes, newest first
+        self.error = None
+
+    def advance(self, now):
+        # The clock went back (a new replay on the same provider): start over
+        if self.time is not None and now < self.time:
+            self.cursor, self.rows, self.ordered, self.error = 0, {}, None, None
+        self.time = now
+
+        while self.cursor < len(self.events) and self.events[self.cursor][0] <= now:
+            _, rows, error = self.events[self.cursor]
+            self.cursor += 1
+            self.error = error
+            if rows:
+                for row in rows:
+                    self.rows[row["datetime"]] = row
+                self.ordered = None
+
+    def select(self, outputsize, start_date=None, end_date=None):
+        if self.ordered is None:
+            self.ordered = sorted(self.rows, reverse=True)
+
+        selected = []
+        for key in self.ordered:
+            if end_date is not None and key > end_date:
+                continue
+            if start_date is not None and key < start_date:
+                break
+            selected.append(self.rows[key])
+            if len(selected) >= outputsize:
+                break
+        return tuple(selected)
+
+
+class ReplayProvider:
+    """
+    Plays a ProviderRecorder file back through the Twelve Data client
+    interface, driven by a clock (usually a ReplayClock).
+
+    A request is answered from everything the provider had returned for
+    that symbol up to the clock's current time, cut to the requested
+    window, so requests do not have to match the recorded ones exactly.
+    A symbol whose latest recorded event is an error raises that error
+    again, which reproduces outages and rate limiting.
+    """
+
+    def __init__(self, path, clock=None):
+        self.path = path
+        self.clock = clock or SystemClock()
+        self.series = {}  # (symbol, interval) -> _ReplaySeries
+        self.lock = threading.Lock()
+        self.start_time = None
+        self.end_time = None
+        self.requests = 0
+
+        self._load()
+
+    def time_series(self, **params):
+        return _Response(lambda: self._respond(params))
+
+    def finished(self):
+        """True once the clock has passed the last recorded request"""
+        return self.end_time is None or self.clock.time() > self.end_time
+
+    def _load(self):
+        records = []
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            try:
+                for line in f:
+                    records.append(json.loads(line))
+            except (EOFError, OSError, ValueError, zlib.error) as e:
+                # Interrupted while writing: replay what is complete
+                logger.warning(f"Provider recording {self.path} is truncated: {str(e)}")
+
+        records.sort(key=lambda record: record["t"])
+        for record in records:
+            params = record["params"]
+            symbols = str(params["symbol"]).split(",")
+            data = record.get("data")
+
+            for symbol in symbols:
+                key = (self._normalize_symbol(symbol), params.get("interval"))
+                if "error" in record:
+                    event = (record["t"], None, record["error"])
+                elif len(symbols) == 1:
+                    event = (record["t"], data or (), None)
+                else:
+                    rows = next(
+                        (rows for name, rows in (data or {}).items()
+                         if self._normalize_symbol(name) == key[0]),
+                        None
+                    )
+                    if rows is None:
+                        continue
+                    event = (record["t"], rows, None)
+                self.series.setdefault(key, _ReplaySeries()).events.append(event)
+
+        if records:
+            self.start_time = records[0]["t"]
+            self.end_time = records[-1]["t"]
+
+        logger.info(f"Loaded {len(records)} recorded provider requests from {self.path}")
+
+    def _respond(self, params):
+        now = self.clock.time()
+        symbols = str(params["symbol"]).split(",")
+        interval = params.get("interval")
+        outputsize = int(params.get("outputsize", 30))
+
+        with self.lock:
+            self.requests += 1
+            result = {}
+            for symbol in symbols:
+                series = self.series.get((self._normalize_symbol(symbol), interval))
+                if series is None:
+                    continue
+                series.advance(now)
+                if series.error is not None:
+                    raise ReplayedProviderError(series.error)
+                rows = series.select(outputsize, params.get("start_date"), params.get("end_date"))
+                if rows:
+                    result[symbol] = rows
+
+        # Like Twelve Data, a single symbol returns a plain row list
+        if len(symbols) == 1:
+            return result.get(symbols[0], ())
+        return result
+
+    @staticmethod
+    def _normalize_symbol(symbol):
+        return symbol.replace("/", "").upper()
@@ -0,0 +1,141 @@
+import threading
+import time
+from collections import deque
+
+# Priority classes, lower runs first
+PRIORITY_RESULT = 0     # Resolving sent signals (_check_signal_results)
+PRIORITY_ANALYSIS = 1   # Routine analysis fetches
+
+PRIORITY_NAMES = {
+    PRIORITY_RESULT: "result",
+    PRIORITY_ANALYSIS: "analysis",
+}
+
+
+class RequestDeferred(Exception):
+    """Raised when a request is deferred to stay inside the credit budget"""
+
+
+class RequestScheduler:
+    """
+    Token-bucket scheduler in front of the market data provider.
+
+    The bucket holds the per-minute credit budget and refills continuously.
+    Result-resolution requests wait (up to a timeout) for credits; analysis
+    requests never wait and are deferred when spending would dip into the
+    credits reserved for results, or while a result request is waiting.
+    A deferred analysis fetch is simply retried on the next tick, where it
+    is merged into that tick's batch request.
+    """
+
+    def __init__(self, credits_per_minute=8, reserved_credits=None, clock=time.monotonic):
+        # clock returns seconds; a replay clock's time() makes the budget follow replay time
+        self.clock = clock
+        self.capacity = credits_per_minute
+        self.refill_rate = credits_per_minute / 60.0
+        self.reserved_credits = (
+            reserved_credits if reserved_credits is not None else max(1, credits_per_minute // 4)
+        )
+
+        self.tokens = float(credits_per_minute)
+        self.updated_at = self.clock()
+        self.blocked_until = 0
+
+        self.condition = threading.Condition()
+        self.waiting = {priority: 0 for priority in PRIORITY_NAMES}
+        self.usage = deque()  # (clock time, cost) over the last minute
+        self.executed = 0
+        self.deferred = 0
+
+    def execute(self, func, cost=1, priority=PRIORITY_ANALYSIS, timeout=10):
+        """
+        Run func() once `cost` credits are available. Raises RequestDeferred
+        if the request cannot run within the budget
+        """
+        self._acquire(cost, priority, timeout)
+        return func()
+
+    def can_spare(self, cost, keep, within=0.0):
+        """
+        True if an analysis request of `cost` credits can run now and still
+        leave `keep` credits above the result reserve `within` seconds
+        later, e.g. for the next scheduled analysis batch
+        """
+        with self.condition:
+            now = self.clock()
+            self._refill(now)
+            if now < self.blocked_until or self.waiting[PRIORITY_RESULT]:
+                return False
+
+            usable = self.capacity - self.reserved_credits
+            left_now = self.tokens - cost - self.reserved_credits
+            left_later = min(self.capacity, self.tokens - cost + within * self.refill_rate) - self.reserved_credits
+            return left_now >= 0 and left_later >= min(keep, usable)
+
+    def penalize(self, retry_after):
+        """The provider reported the limit as hit: spend nothing for retry_after seconds"""
+        with self.condition:
+            self.tokens = min(self.tokens, 0.0)
+            self.blocked_until = max(self.blocked_until, self.clock() + retry_after)
+
+    def stats(self):
+        with self.condition:
+            now = self.clock()
+            self._refill(now)
+            return {
+                "credits_per_minute": self.capacity,
+                "credits_available": round(self.tokens, 2),
+                "credits_used_last_minute": sum(cost for _, cost in self.usage),
+                "blocked_for": round(max(0.0, self.blocked_until - now), 1),
+                "queue_depth": {PRIORITY_NAMES[p]: n for p, n in self.waiting.items()},
+                "executed": self.executed,
+                "deferred": self.deferred,
+            }
+
+    def _acquire(self, cost, priority, timeout):
+        # A batch larger than the whole budget runs once the bucket is full
+        # and leaves it in debt, which paces the following requests
+        needed = min(cost, self.capacity)
+
+        with self.condition:
+            if priority != PRIORITY_RESULT:
+                now = self.clock()
+                self._refill(now)
+                available = self.tokens - self.reserved_credits
+                if (now < self.blocked_until or self.waiting[PRIORITY_RESULT]
+                        or available < min(needed, self.capacity - self.reserved_credits)):
+                    self.deferred += 1
+                    raise RequestDeferred("Analysis request deferred to save provider credits")
+                self._spend(cost, now)
+                return
+
+            deadline = self.clock() + timeout
+            self.waiting[priority] += 1
+            try:
+                while True:
+                    now = self.clock()
+                    self._refill(now)
+                    if now >= self.blocked_until and self.tokens >= needed:
+                        self._spend(cost, now)
+                        return
+
+                    if now >= deadline:
+                        self.deferred += 1
+                        raise RequestDeferred("No provider credits available before the timeout")
+
+                    wait = max(self.blocked_until - now, (needed - self.tokens) / self.refill_rate)
+                    self.condition.wait(min(wait, deadline - now))
+            finally:
+                self.waiting[priority] -= 1
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.refill_rate)
+        self.updated_at = now
+
+        while self.usage and self.usage[0][0] <= now - 60:
+            self.usage.popleft()
+
+    def _spend(self, cost, now):
+        self.tokens -= cost
+        self.usage.append((now, cost))
+        self.executed += 1
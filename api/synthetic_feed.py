@@ -0,0 +1,192 @@
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+
+from api.candles import CANDLE_DTYPE, CandleBuffer
+
+# Realistic base price ranges, checked in order against the symbol
+BASE_PRICE_RANGES = (
+    ("JPY", (125.0, 135.0)),
+    ("USD", (1.1, 1.3)),
+    ("GBP", (1.2, 1.4)),
+    ("BTC", (35000.0, 45000.0)),
+)
+DEFAULT_BASE_PRICE_RANGE = (0.9, 1.1)
+
+# Per-candle trend strength and noise, as a fraction of price
+TREND_STRENGTH_RANGE = (0.0001, 0.0003)
+NOISE_RANGE = 0.0001
+
+
+class SyntheticMarketFeed:
+    """
+    Stateful synthetic candle feed with micro-trends, generated with NumPy
+    for many symbols at once.
+
+    Each (symbol, timeframe) series keeps its last close and trend between
+    calls, so every call extends the same series up to the clock's current
+    candle instead of starting a new one. With a seed and an injected clock
+    the output is fully reproducible.
+    """
+
+    def __init__(self, seed=None, capacity=500, clock=time.time, trend_switch_probability=0.1):
+        self.rng = np.random.default_rng(seed)
+        self.capacity = capacity
+        self.clock = clock
+        # ~10 candle micro-trends on average
+        self.trend_switch_probability = trend_switch_probability
+
+        # (symbol, tf_seconds) -> series state and generated candles
+        self.states = {}
+        self.buffers = {}
+        self.lock = threading.Lock()
+
+    def candles(self, symbol, tf_seconds=60, limit=100):
+        return self.candles_many([symbol], tf_seconds, limit)[symbol]
+
+    def candles_many(self, symbols, tf_seconds=60, limit=100):
+        """
+        Extend every symbol's series to the current candle and return the
+        last `limit` candles of each as read-only CANDLE_DTYPE arrays
+        """
+        end_timestamp = int(self.clock()) // tf_seconds * tf_seconds
+
+        with self.lock:
+            # Symbols whose series end at the same time are generated together
+            groups = {}
+            for symbol in dict.fromkeys(symbols):
+                key = (symbol, tf_seconds)
+                state = self.states.get(key)
+                history = max(self.capacity, limit)
+
+                if state is None:
+                    state = self._initial_state(symbol, end_timestamp - history * tf_seconds)
+                    self.states[key] = state
+                    self.buffers[key] = CandleBuffer(history)
+
+                # After a long pause only the last `history` candles are generated
+                state["timestamp"] = max(state["timestamp"], end_timestamp - history * tf_seconds)
+
+                if state["timestamp"] < end_timestamp:
+                    groups.setdefault(state["timestamp"], []).append(key)
+
+            for start_timestamp, keys in groups.items():
+                steps = (end_timestamp - start_timestamp) // tf_seconds
+                block = self._to_records(self._simulate(keys, tf_seconds, steps))
+                for key, candles in zip(keys, block):
+                    self.buffers[key].merge(candles)
+
+            return {symbol: self.buffers[(symbol, tf_seconds)].tail(limit) for symbol in symbols}
+
+    def generate(self, symbols, tf_seconds=60, steps=1000):
+        """
+        Advance each symbol's series by `steps` candles regardless of the
+        clock and return them as 2-D (symbols x time) columns:
+        {'timestamp': (S, T), 'open': (S, T), ..., 'volume': (S, T)}
+
+        Meant for offline load tests and benchmarks; the candles are not
+        kept in the buffers that candles_many() serves.
+        """
+        with self.lock:
+            keys = []
+            for symbol in symbols:
+                key = (symbol, tf_seconds)
+                if key not in self.states:
+                    start_timestamp = int(self.clock()) // tf_seconds * tf_seconds - steps * tf_seconds
+                    self.states[key] = self._initial_state(symbol, start_timestamp)
+                    self.buffers[key] = CandleBuffer(self.capacity)
+                keys.append(key)
+
+            return self._simulate(keys, tf_seconds, steps)
+
+    def get(self, symbol, tf_seconds, timestamp):
+        """Return an already generated candle as a dict, or None"""
+        with self.lock:
+            buffer = self.buffers.get((symbol, tf_seconds))
+            return buffer.get(timestamp) if buffer is not None else None
+
+    def _initial_state(self, symbol, timestamp):
+        low, high = DEFAULT_BASE_PRICE_RANGE
+        for code, price_range in BASE_PRICE_RANGES:
+            if code in symbol:
+                low, high = price_range
+                break
+
+        return {
+            "timestamp": timestamp,
+            "close": round(self.rng.uniform(low, high), 5),
+            "direction": self.rng.choice((-1, 1)),
+            "strength": self.rng.uniform(*TREND_STRENGTH_RANGE),
+        }
+
+    def _simulate(self, keys, tf_seconds, steps):
+        """
+        Generate the next `steps` candles for every key in one
+        (symbols x steps) pass and advance their states
+        """
+        rng = self.rng
+        shape = (len(keys), steps)
+        states = [self.states[key] for key in keys]
+
+        last_close = np.array([state["close"] for state in states])
+        direction = np.array([state["direction"] for state in states])
+        strength = np.array([state["strength"] for state in states])
+        last_timestamp = np.array([state["timestamp"] for state in states], dtype="i8")
+
+        # Trend flips direction and picks a new strength at random switch points
+        switches = rng.random(shape) < self.trend_switch_probability
+        flipped = np.logical_xor.accumulate(switches, axis=1)
+        directions = np.where(flipped, -direction[:, None], direction[:, None])
+
+        strengths = np.zeros(shape)
+        strengths[:, 0] = strength
+        strengths[switches] = rng.uniform(*TREND_STRENGTH_RANGE, size=np.count_nonzero(switches))
+        switch_index = np.where(switches, np.arange(steps), 0)
+        np.maximum.accumulate(switch_index, axis=1, out=switch_index)
+        strengths = np.take_along_axis(strengths, switch_index, axis=1)
+
+        moves = strengths * directions
+        moves += rng.uniform(1 - NOISE_RANGE, 1 + NOISE_RANGE, size=shape)
+        closes = np.cumprod(moves, axis=1)
+        closes *= last_close[:, None]
+        np.round(closes, 5, out=closes)
+        opens = np.empty(shape)
+        opens[:, 0] = last_close
+        opens[:, 1:] = closes[:, :-1]
+
+        # Wicks up to the size of the candle body
+        body = np.abs(closes - opens)
+        highs = np.round(np.maximum(opens, closes) + rng.random(shape) * body, 5)
+        lows = np.round(np.minimum(opens, closes) - rng.random(shape) * body, 5)
+
+        timestamps = last_timestamp[:, None] + tf_seconds * np.arange(1, steps + 1, dtype="i8")
+
+        for i, state in enumerate(states):
+            state["timestamp"] = int(timestamps[i, -1])
+            state["close"] = closes[i, -1]
+            state["direction"] = directions[i, -1]
+            state["strength"] = strengths[i, -1]
+
+        return {
+            "timestamp": timestamps,
+            "open": opens,
+            "high": highs,
+            "low": lows,
+            "close": closes,
+            "volume": rng.integers(100, 1001, size=shape).astype("f8"),
+        }
+
+    @staticmethod
+    def _to_records(columns):
+        """Pack 2-D candle columns into a (symbols x time) CANDLE_DTYPE array"""
+        timestamps = columns["timestamp"]
+        utc_offset = int(datetime.fromtimestamp(int(timestamps[0, 0])).astimezone().utcoffset().total_seconds())
+
+        block = np.empty(timestamps.shape, dtype=CANDLE_DTYPE)
+        block["timestamp"] = timestamps
+        block["datetime"] = (timestamps + utc_offset).astype("M8[s]")
+        for column in ("open", "high", "low", "close", "volume"):
+            block[column] = columns[column]
+        return block
@@ -0,0 +1,148 @@
+import threading
+
+import numpy as np
+
+from api.candles import CANDLE_DTYPE, CandleBuffer, array_to_candles
+
+
+class _Series:
+    """Aggregation state of one (symbol, timeframe)"""
+
+    def __init__(self, capacity):
+        self.closed = CandleBuffer(capacity)
+        self.seeded_limit = 0
+        self.bucket = None          # Open time of the open bar
+        self.bucket_datetime = None
+        self.settled = None         # [open, high, low, close, volume] of finished base bars in the bucket
+        self.forming = None         # Last base bar, which may still be revised
+        self.last_base_timestamp = None
+
+
+class TimeframeAggregator:
+    """
+    Builds higher-timeframe candles (M5, M15, H1, ...) from a stream of M1
+    candles.
+
+    Each series is seeded once with closed higher-timeframe bars; after that
+    every M1 bar updates the open bar of each timeframe in constant time.
+    The open bar is kept as the settled M1 bars so far plus the last M1 bar,
+    so a revised (still-forming) M1 bar replaces its previous values instead
+    of being counted twice.
+    """
+
+    def __init__(self, capacity=500):
+        self.capacity = capacity
+        self.series = {}  # (symbol, tf_seconds) -> _Series
+        self.lock = threading.Lock()
+
+    def has(self, symbol, tf_seconds, limit):
+        """True when the series was seeded for at least `limit` bars"""
+        with self.lock:
+            series = self.series.get((symbol, tf_seconds))
+            return series is not None and max(series.seeded_limit, len(series.closed) + 1) >= limit
+
+    def seed(self, symbol, tf_seconds, candles, base_candles, limit=None):
+        """
+        Start a series from closed higher-timeframe bars (e.g. fetched once
+        from the provider) and the base bars that cover the open bar
+        """
+        with self.lock:
+            series = _Series(max(self.capacity, len(candles)))
+            series.seeded_limit = limit if limit is not None else len(candles)
+
+            if len(base_candles):
+                open_bucket = int(base_candles["timestamp"][-1]) // tf_seconds * tf_seconds
+                candles = candles[candles["timestamp"] < open_bucket]
+                base_candles = base_candles[base_candles["timestamp"] >= open_bucket]
+
+            series.closed.merge(np.array(candles))
+            self.series[(symbol, tf_seconds)] = series
+
+            for candle in base_candles:
+                self._apply(series, tf_seconds, candle)
+
+    def update(self, symbol, base_candles):
+        """Feed sorted M1 candles to every seeded series of the symbol"""
+        with self.lock:
+            for (series_symbol, tf_seconds), series in self.series.items():
+                if series_symbol != symbol:
+                    continue
+                for candle in base_candles:
+                    self._apply(series, tf_seconds, candle)
+
+    def get(self, symbol, tf_seconds, timestamp):
+        """Return the bar opening at timestamp as a candle dict, or None"""
+        with self.lock:
+            series = self.series.get((symbol, tf_seconds))
+            if series is None:
+                return None
+            if timestamp == series.bucket:
+                open_bar = self._open_bar(series)
+                return array_to_candles(open_bar)[0] if open_bar is not None else None
+            return series.closed.get(timestamp)
+
+    def candles(self, symbol, tf_seconds, limit=100):
+        """Return the last `limit` bars, the open bar included, as a CANDLE_DTYPE array"""
+        with self.lock:
+            series = self.series.get((symbol, tf_seconds))
+            if series is None:
+                return np.empty(0, dtype=CANDLE_DTYPE)
+
+            open_bar = self._open_bar(series)
+            if open_bar is None:
+                return series.closed.tail(limit)
+            if limit <= 1:
+                return open_bar
+            return np.concatenate((series.closed.tail(limit - 1), open_bar))
+
+    def _apply(self, series, tf_seconds, candle):
+        timestamp = int(candle["timestamp"])
+        if series.last_base_timestamp is not None and timestamp < series.last_base_timestamp:
+            return
+
+        values = [float(candle["open"]), float(candle["high"]), float(candle["low"]),
+                  float(candle["close"]), float(candle["volume"])]
+
+        # Same base bar again: it was still forming, replace it
+        if timestamp == series.last_base_timestamp:
+            series.forming = values
+            return
+
+        bucket = timestamp // tf_seconds * tf_seconds
+        if bucket != series.bucket:
+            open_bar = self._open_bar(series)
+            if open_bar is not None:
+                series.closed.merge(open_bar)
+            series.bucket = bucket
+            series.bucket_datetime = candle["datetime"] - np.timedelta64(timestamp - bucket, "s")
+            series.settled = None
+        elif series.forming is not None:
+            series.settled = self._combine(series.settled, series.forming)
+
+        series.forming = values
+        series.last_base_timestamp = timestamp
+
+    def _open_bar(self, series):
+        values = self._combine(series.settled, series.forming)
+        if values is None:
+            return None
+
+        bar = np.empty(1, dtype=CANDLE_DTYPE)
+        bar["datetime"] = series.bucket_datetime
+        bar["timestamp"] = series.bucket
+        bar["open"], bar["high"], bar["low"], bar["close"], bar["volume"] = values
+        return bar
+
+    @staticmethod
+    def _combine(first, second):
+        if first is None:
+            return second
+        if second is None:
+            return first
+        return [
+            first[0],
+            max(first[1], second[1]),
+            min(first[2], second[2]),
+            second[3],
+            first[4] + second[4],
+        ]
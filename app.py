@@ -1,5 +1,8 @@
 import os
+import json
+import atexit
 import logging
+import threading
 from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, session
 from flask_sqlalchemy import SQLAlchemy
 from sqlalchemy.orm import DeclarativeBase
@@ -40,7 +43,7 @@ login_manager.init_app(app)
 login_manager.login_view = 'login'
 
 # Import model setelah definisi database
-from models import User, Signal, Setting
+from models import User, Signal, Setting, BotStats
 
 @login_manager.user_loader
 def load_user(user_id):
@@ -52,7 +55,7 @@ from utils.market_analyzer import MarketAnalyzer
 from utils.technical_indicators import TechnicalIndicators
 from utils.chart_generator import ChartGenerator
 from utils.ml_predictor import MLPredictor
-from api.pocket_option import PocketOptionAPI
+from utils.leader_election import LeaderElection, utc_now
 
 # Membuat objek telegram bot
 telegram_bot = TelegramBot()
@@ -60,9 +63,6 @@ telegram_bot = TelegramBot()
 # Membuat objek market analyzer
 market_analyzer = MarketAnalyzer()
 
-# Membuat instance untuk Pocket Option API
-pocket_option_api = PocketOptionAPI()
-
 # Memastikan semua tabel database terbuat
 with app.app_context():
     db.create_all()
@@ -107,21 +107,113 @@ with app.app_context():
         
         db.session.commit()
         logger.info("Pengaturan telah diperbarui dengan environment variables")
+
+# Mencegah bot dimulai dua kali oleh thread leader dan startup main.py
+bot_lock = threading.Lock()
+
+# updated_at dari Setting yang terakhir diterapkan bot di proses ini
+applied_setting_version = None
+
+def start_bot():
+    """
+    Mulai analisis pasar dan listener Telegram jika bot aktif. Hanya
+    dijalankan oleh proses leader, supaya beberapa worker web tidak
+    mengirim sinyal ganda
+    """
+    with bot_lock, app.app_context():
+        _apply_setting(Setting.query.first())
+
+def sync_bot():
+    """
+    Terapkan pengaturan yang disimpan oleh worker web mana pun. Route hanya
+    menulis ke database; leader memeriksa updated_at setiap heartbeat dan
+    memulai ulang bot dengan pengaturan baru jika berubah
+    """
+    with bot_lock, app.app_context():
+        setting = Setting.query.first()
+        if not setting or setting.updated_at == applied_setting_version:
+            return
         
-    # Inisialisasi market analyzer untuk keseluruhan aplikasi
-    from utils.market_analyzer import MarketAnalyzer
-    import flask
+        logger.info("Pengaturan berubah, bot dimulai ulang dengan pengaturan baru")
+        market_analyzer.stop_analysis()
+        _apply_setting(setting)
+
+def _apply_setting(setting):
+    global applied_setting_version
+    if not setting:
+        return
+    applied_setting_version = setting.updated_at
+    
+    # Token Telegram dan API key provider (lewat start_analysis) dipasang ke
+    # objek yang dipakai bot di proses leader ini
+    telegram_bot.set_token(setting.telegram_token)
+    if not setting.active_status:
+        market_analyzer.stop_analysis()
+        telegram_bot.stop_listening()
+        return
     
-    # Menggunakan g untuk menyimpan market_analyzer
-    market_analyzer = MarketAnalyzer()
+    if not market_analyzer.running:
+        market_analyzer.start_analysis(setting)
+        logger.info("Bot analisis pasar dimulai secara otomatis")
     
-    # Mulai analisis market jika bot aktif
-    if setting and setting.active_status:
-        try:
-            market_analyzer.start_analysis(setting)
-            logger.info("Bot analisis pasar dimulai secara otomatis")
-        except Exception as e:
-            logger.error(f"Error saat memulai bot analisis pasar: {str(e)}")
+    telegram_bot.start_listening()
+
+def stop_bot():
+    """
+    Hentikan analisis pasar dan listener Telegram saat proses ini bukan lagi
+    leader. Sinyal yang masih antre dibuang, karena leader baru mungkin
+    sudah berjalan dan akan mengirim sinyal untuk candle yang sama
+    """
+    global applied_setting_version
+    with bot_lock:
+        applied_setting_version = None
+        market_analyzer.stop_analysis(discard_pending=True)
+        telegram_bot.stop_listening()
+
+def publish_bot_stats():
+    """
+    Simpan statistik bot di proses leader ke database, supaya route stats
+    di worker mana pun menampilkan angka leader, bukan angka worker yang
+    kebetulan melayani request
+    """
+    pipeline = market_analyzer.pipeline
+    payload = json.dumps({
+        'provider': market_analyzer.pocket_option_api.get_provider_stats(),
+        'indicators': market_analyzer.indicator_cache.stats(),
+        'pipeline': pipeline.stats() if pipeline else {},
+    })
+    with app.app_context():
+        stats = db.session.get(BotStats, leader_election.name) or BotStats(name=leader_election.name)
+        stats.holder = leader_election.identity
+        stats.payload = payload
+        stats.published_at = utc_now()
+        db.session.add(stats)
+        db.session.commit()
+
+def on_leader_heartbeat():
+    sync_bot()
+    publish_bot_stats()
+
+def _leader_stats(section):
+    """
+    Statistik yang terakhir diterbitkan leader untuk satu bagian
+    (provider, indicators, pipeline), beserta pemegang dan waktunya
+    """
+    stats = db.session.get(BotStats, leader_election.name)
+    if not stats:
+        return jsonify(stats={}, leader=None, published_at=None, is_leader=leader_election.is_leader)
+    return jsonify(
+        stats=json.loads(stats.payload).get(section, {}),
+        leader=stats.holder,
+        published_at=stats.published_at.isoformat() + 'Z',
+        is_leader=leader_election.is_leader
+    )
+
+# Pemilihan leader lewat lease di database: hanya satu proses yang menjalankan bot
+leader_election = LeaderElection(app, db, 'analyzer', on_elected=start_bot, on_demoted=stop_bot,
+                                 on_renewed=on_leader_heartbeat)
+leader_election.start()
+atexit.register(leader_election.stop)
 
 # Route untuk halaman utama
 @app.route('/')
@@ -166,9 +258,9 @@ def dashboard():
     settings.active_status = True
     db.session.commit()
     
-    # Jika bot belum dijalankan, jalankan sekarang
+    # Jika bot belum dijalankan di proses leader ini, jalankan sekarang
     try:
-        if not market_analyzer.running:
+        if leader_election.is_leader and not market_analyzer.running:
             market_analyzer.start_analysis(settings)
             logger.info("Bot analisis pasar dimulai dari dashboard")
     except Exception as e:
@@ -194,12 +286,8 @@ def settings():
         
         db.session.commit()
         
-        # Memperbarui token telegram bot
-        telegram_bot.set_token(settings.telegram_token)
-        
-        # Memperbarui API key untuk Pocket Option
-        pocket_option_api.set_api_key(settings.pocket_option_api_key)
-        
+        # Token Telegram dan API key diterapkan oleh proses leader (sync_bot),
+        # yang mungkin bukan worker yang melayani request ini
         flash('Pengaturan berhasil disimpan!', 'success')
         return redirect(url_for('settings'))
     
@@ -220,10 +308,7 @@ def toggle_bot():
         settings.active_status = True
         db.session.commit()
         
-        # Jalankan market analyzer jika belum berjalan
-        if not market_analyzer.running:
-            market_analyzer.start_analysis(settings)
-        
+        # Proses leader menjalankan bot pada heartbeat berikutnya (sync_bot)
         flash('Bot telah aktif!', 'success')
     
     return redirect(url_for('dashboard'))
@@ -252,5 +337,23 @@ def get_latest_signals():
     
     return jsonify(signals_data)
 
+# Route API untuk memantau pemakaian kredit dan antrean request data pasar
+@app.route('/api/provider/stats', methods=['GET'])
+@login_required
+def get_provider_stats():
+    return _leader_stats('provider')
+
+# Route API untuk memantau cache indikator (hit/miss)
+@app.route('/api/indicators/cache', methods=['GET'])
+@login_required
+def get_indicator_cache_stats():
+    return _leader_stats('indicators')
+
+# Route API untuk memantau antrean pipeline sinyal per tahap
+@app.route('/api/pipeline/stats', methods=['GET'])
+@login_required
+def get_pipeline_stats():
+    return _leader_stats('pipeline')
+
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=5000, debug=True)
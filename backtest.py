@@ -0,0 +1,95 @@
+"""
+Backtest aturan sinyal atas riwayat candle di CandleStore.
+
+Contoh:
+    python backtest.py --symbols EUR/USD,GBP/USD --start 2024-01-01 --end 2024-12-31 --min-confidence 75
+
+Mode sweep mencoba kombinasi ambang aturan sinyal dan mencetak peringkatnya:
+    python backtest.py --sweep --rsi-oversold 25,30 --min-confidence-grid 70,75,80
+    python backtest.py --sweep --random 50 --seed 1
+"""
+import argparse
+import logging
+import os
+import time
+from datetime import datetime
+
+from api.pocket_option import TIMEFRAME_INTERVALS
+from utils.backtester import ANALYSIS_WINDOW, SHARD_CANDLES, run_backtest
+from utils.parameter_sweep import PARAMETER_GRID, grid_combinations, random_combinations, run_sweep
+
+
+def parse_date(value):
+    """Tanggal YYYY-MM-DD atau 'YYYY-MM-DD HH:MM:SS' (waktu lokal, seperti timestamp candle) ke epoch"""
+    for date_format in ('%Y-%m-%d %H:%M:%S', '%Y-%m-%d'):
+        try:
+            return int(datetime.strptime(value, date_format).timestamp())
+        except ValueError:
+            continue
+    raise argparse.ArgumentTypeError(f"Format tanggal tidak valid: {value}")
+
+
+def parse_values(value):
+    """Daftar angka dipisah koma"""
+    try:
+        return tuple(float(item) if '.' in item else int(item) for item in value.split(','))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Daftar angka tidak valid: {value}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backtest aturan sinyal atas riwayat candle tersimpan")
+    parser.add_argument('--store', default=os.environ.get('CANDLE_STORE_PATH', os.path.join('instance', 'candles')),
+                        help="Direktori CandleStore")
+    parser.add_argument('--symbols', help="Daftar simbol dipisah koma (default: semua simbol tersimpan)")
+    parser.add_argument('--timeframe', default='M1', help="Timeframe candle (default: M1)")
+    parser.add_argument('--start', type=parse_date, help="Candle pertama yang dianalisis")
+    parser.add_argument('--end', type=parse_date, help="Candle terakhir yang dianalisis")
+    parser.add_argument('--min-confidence', type=float, default=75, help="Confidence minimum sinyal (default: 75)")
+    parser.add_argument('--workers', type=int, help="Jumlah proses (default: jumlah CPU)")
+    parser.add_argument('--window', type=int, default=ANALYSIS_WINDOW, help="Candle per analisis (default: 100)")
+    parser.add_argument('--shard-candles', type=int, default=SHARD_CANDLES, help="Candle per shard")
+
+    sweep = parser.add_argument_group("sweep")
+    sweep.add_argument('--sweep', action='store_true', help="Cari kombinasi ambang terbaik")
+    for name, values in PARAMETER_GRID.items():
+        option = '--min-confidence-grid' if name == 'min_confidence_threshold' else '--' + name.replace('_', '-')
+        sweep.add_argument(option, dest=name, type=parse_values, default=values,
+                           help=f"Nilai yang dicoba (default: {','.join(map(str, values))})")
+    sweep.add_argument('--random', type=int, help="Coba sejumlah kombinasi acak dari grid, bukan semuanya")
+    sweep.add_argument('--seed', type=int, help="Seed pencarian acak")
+    sweep.add_argument('--top', type=int, default=20, help="Jumlah kombinasi yang ditampilkan")
+    sweep.add_argument('--min-signals', type=int, default=30, help="Sinyal minimum agar kombinasi diperingkat")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    symbols = [symbol.strip() for symbol in args.symbols.split(',')] if args.symbols else None
+    options = dict(
+        symbols=symbols,
+        interval=TIMEFRAME_INTERVALS.get(args.timeframe, args.timeframe),
+        start_timestamp=args.start,
+        end_timestamp=args.end,
+        workers=args.workers,
+        window=args.window,
+        shard_candles=args.shard_candles
+    )
+    started = time.perf_counter()
+
+    if args.sweep:
+        grid = {name: getattr(args, name) for name in PARAMETER_GRID}
+        if args.random:
+            combinations = random_combinations(grid, args.random, args.seed)
+        else:
+            combinations = grid_combinations(grid)
+        report = run_sweep(args.store, combinations, **options)
+        print(report.format(top=args.top, min_signals=args.min_signals))
+    else:
+        report = run_backtest(args.store, min_confidence_threshold=args.min_confidence, **options)
+        print(report.format())
+
+    print(f"Selesai dalam {time.perf_counter() - started:.1f} detik")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""
+Throughput of the backtesting engine: candles analysed per second on a
+temporary CandleStore filled from the synthetic feed, for one process and
+for a process pool, plus the projected time for a year of M1 data for 30
+pairs.
+
+Run with: python -m benchmarks.bench_backtest
+"""
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from api.candle_store import CandleStore
+from api.synthetic_feed import SyntheticMarketFeed
+from utils.backtester import run_backtest
+
+SYMBOLS = [f"SYM{i}/USD" for i in range(4)]
+CANDLES = 50_000
+YEAR_OF_M1_FOR_30_PAIRS = 30 * 365 * 24 * 60
+
+
+def main():
+    with tempfile.TemporaryDirectory() as root:
+        store = CandleStore(root)
+        feed = SyntheticMarketFeed(seed=1, capacity=CANDLES, clock=lambda: 1_700_000_000)
+        for symbol, candles in feed.candles_many(SYMBOLS, 60, CANDLES).items():
+            store.append(symbol, "1min", np.array(candles))
+
+        total = len(SYMBOLS) * CANDLES
+        print(f"{'workers':>8} {'seconds':>8} {'candles/s':>10} {'signals':>8} {'year x 30 pairs (min)':>22}")
+        for workers in sorted({1, os.cpu_count() or 1}):
+            start = time.perf_counter()
+            report = run_backtest(root, SYMBOLS, workers=workers, shard_candles=10_000)
+            elapsed = time.perf_counter() - start
+
+            rate = total / elapsed
+            print(f"{workers:>8} {elapsed:>8.2f} {rate:>10.0f} {report.total()['signals']:>8} "
+                  f"{YEAR_OF_M1_FOR_30_PAIRS / rate / 60:>22.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Micro-benchmark: the previous scalar candlestick detector, run once per bar
+over every prefix of a series, vs classify_candles labelling the whole
+series in one pass. Also checks that both agree on every bar and reports
+how often each pattern occurred.
+
+Run with: python -m benchmarks.bench_candle_patterns
+"""
+import time
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+from api.synthetic_feed import SyntheticMarketFeed
+from utils.candle_patterns import candle_pattern_labels
+
+SIZES = (1_000, 5_000)
+LARGE_SIZE = 1_000_000
+
+
+def scalar_pattern(df):
+    """The previous per-tick detector: last three rows copied, cells written with .loc, scalar checks"""
+    if len(df) < 3:
+        return "Unknown Pattern"
+
+    # Ambil 3 candle terakhir
+    last_candles = df.iloc[-3:].copy()
+
+    # Hitung panjang body dan shadow untuk setiap candle
+    for i in range(len(last_candles)):
+        candle = last_candles.iloc[i]
+        body_size = abs(candle['close'] - candle['open'])
+        candle_range = candle['high'] - candle['low']
+
+        # Tambahkan kolom baru
+        last_candles.loc[last_candles.index[i], 'body_size'] = body_size
+        last_candles.loc[last_candles.index[i], 'candle_range'] = candle_range
+        last_candles.loc[last_candles.index[i], 'is_bullish'] = candle['close'] > candle['open']
+
+    # Candle terakhir
+    last_candle = last_candles.iloc[-1]
+    prev_candle = last_candles.iloc[-2]
+
+    # Deteksi berbagai pola candlestick
+
+    # Pola Hammer (bullish reversal)
+    if (last_candle['is_bullish'] and 
+        last_candle['body_size'] < 0.3 * last_candle['candle_range'] and 
+        (last_candle['high'] - max(last_candle['open'], last_candle['close'])) < 0.2 * last_candle['candle_range'] and
+        (min(last_candle['open'], last_candle['close']) - last_candle['low']) > 0.6 * last_candle['candle_range']):
+        return "Hammer Rebound AI-classified"
+
+    # Pola Shooting Star (bearish reversal)
+    if (not last_candle['is_bullish'] and 
+        last_candle['body_size'] < 0.3 * last_candle['candle_range'] and 
+        (last_candle['high'] - max(last_candle['open'], last_candle['close'])) > 0.6 * last_candle['candle_range'] and
+        (min(last_candle['open'], last_candle['close']) - last_candle['low']) < 0.2 * last_candle['candle_range']):
+        return "Shooting Star Pattern"
+
+    # Pola Engulfing (reversal)
+    if (last_candle['is_bullish'] and not prev_candle['is_bullish'] and 
+        last_candle['body_size'] > prev_candle['body_size'] and 
+        last_candle['open'] < prev_candle['close'] and 
+        last_candle['close'] > prev_candle['open']):
+        return "Bullish Engulfing Pattern"
+
+    if (not last_candle['is_bullish'] and prev_candle['is_bullish'] and 
+        last_candle['body_size'] > prev_candle['body_size'] and 
+        last_candle['open'] > prev_candle['close'] and 
+        last_candle['close'] < prev_candle['open']):
+        return "Bearish Engulfing Pattern"
+
+    # Pola Doji (indecision)
+    if last_candle['body_size'] < 0.1 * last_candle['candle_range']:
+        return "Doji Pattern (indecision)"
+
+    # Pola Marubozu (strong trend)
+    if (last_candle['body_size'] > 0.8 * last_candle['candle_range']):
+        if last_candle['is_bullish']:
+            return "Bullish Marubozu (strong buyers)"
+        else:
+            return "Bearish Marubozu (strong sellers)"
+
+    # Pola Inside Bar (consolidation)
+    if (last_candle['high'] < prev_candle['high'] and last_candle['low'] > prev_candle['low']):
+        return "Inside Bar Pattern"
+
+    # Pola Three White Soldiers (bullish continuation)
+    if (len(last_candles) >= 3 and 
+        all(last_candles.iloc[i]['is_bullish'] for i in range(-3, 0)) and 
+        last_candles.iloc[-1]['close'] > last_candles.iloc[-2]['close'] > last_candles.iloc[-3]['close'] and
+        last_candles.iloc[-1]['open'] > last_candles.iloc[-2]['open'] > last_candles.iloc[-3]['open']):
+        return "Three White Soldiers Pattern"
+
+    # Tidak ada pola spesifik yang terdeteksi
+    if last_candle['is_bullish']:
+        return "Bullish Candle"
+    else:
+        return "Bearish Candle"
+
+
+def synthetic_frame(size):
+    feed = SyntheticMarketFeed(seed=1, capacity=size, clock=lambda: 1_700_000_000)
+    return pd.DataFrame(np.array(feed.candles("EUR/USD", 60, size)))
+
+
+def random_frame(size, seed=1):
+    """Independent bars with random body and shadow sizes, so every pattern occurs"""
+    rng = np.random.default_rng(seed)
+    open_ = 1.1 + np.cumsum(rng.normal(0, 1e-4, size))
+    close = open_ + rng.normal(0, 1e-4, size) * rng.choice([0.05, 1, 3], size)
+    high = np.maximum(open_, close) + rng.exponential(1e-4, size) * rng.choice([0, 0.2, 1, 4], size)
+    low = np.minimum(open_, close) - rng.exponential(1e-4, size) * rng.choice([0, 0.2, 1, 4], size)
+    return pd.DataFrame({'open': open_, 'high': high, 'low': low, 'close': close})
+
+
+def main():
+    print(f"{'candles':>8} {'series':>9} {'scalar, per bar (ms)':>21} {'vectorised (ms)':>16} {'mismatches':>11}")
+    for size in SIZES:
+        for series, make_frame in (('synthetic', synthetic_frame), ('random', random_frame)):
+            df = make_frame(size)
+
+            start = time.perf_counter()
+            expected = [scalar_pattern(df.iloc[:end]) for end in range(1, size + 1)]
+            scalar_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            labels = candle_pattern_labels(df)
+            vector_time = time.perf_counter() - start
+
+            mismatches = sum(label != reference for label, reference in zip(labels, expected))
+            print(f"{size:>8} {series:>9} {scalar_time * 1000:>21.1f} {vector_time * 1000:>16.2f} {mismatches:>11}")
+
+    df = random_frame(LARGE_SIZE)
+    start = time.perf_counter()
+    labels = candle_pattern_labels(df)
+    print(f"{LARGE_SIZE:>8} {'random':>9} {'':>21} {(time.perf_counter() - start) * 1000:>16.1f}")
+
+    print()
+    for label, count in Counter(labels).most_common():
+        print(f"{label:<34} {count:>8}")
+
+
+if __name__ == "__main__":
+    main()
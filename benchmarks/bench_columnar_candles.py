@@ -0,0 +1,94 @@
+"""
+Micro-benchmark: list-of-dicts candle path vs the columnar CANDLE_DTYPE path.
+
+Parsing: both paths start from provider rows (dicts of strings, as Twelve Data
+returns them) and end with the DataFrame that MarketAnalyzer feeds to the
+indicators. Cache hit: both paths start from a buffered CANDLE_DTYPE array,
+which is what every analysis tick between two candles reads.
+
+Run with: python -m benchmarks.bench_columnar_candles
+"""
+import time
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from api.candles import array_to_candles, candles_to_array
+
+SIZES = (100, 10_000, 1_000_000)
+
+
+def make_rows(n):
+    start = datetime(2024, 1, 1)
+    rows = []
+    for i in range(n):
+        price = 1.1 + (i % 100) * 0.0001
+        rows.append({
+            "datetime": (start + timedelta(minutes=i)).strftime("%Y-%m-%d %H:%M:%S"),
+            "open": f"{price:.5f}",
+            "high": f"{price + 0.0002:.5f}",
+            "low": f"{price - 0.0002:.5f}",
+            "close": f"{price + 0.0001:.5f}",
+            "volume": "0",
+        })
+    return rows
+
+
+def dict_path(rows):
+    """The previous path: one dict and one strptime per row, then DataFrame"""
+    candles = []
+    for item in rows:
+        candles.append({
+            "datetime": item['datetime'],
+            "timestamp": int(datetime.strptime(item['datetime'], '%Y-%m-%d %H:%M:%S').timestamp()),
+            "open": float(item['open']),
+            "high": float(item['high']),
+            "low": float(item['low']),
+            "close": float(item['close']),
+            "volume": float(item.get('volume', 0))
+        })
+    return pd.DataFrame(candles)
+
+
+def columnar_path(rows):
+    return pd.DataFrame(candles_to_array(rows))
+
+
+def cached_dict_path(candles):
+    return pd.DataFrame(array_to_candles(candles))
+
+
+def cached_columnar_path(candles):
+    return pd.DataFrame(candles)
+
+
+def best_of(func, rows, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(rows)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def report(name, dict_func, columnar_func, inputs):
+    print(name)
+    print(f"{'candles':>10} {'dicts (ms)':>12} {'columnar (ms)':>14} {'speedup':>8}")
+    for n, data in inputs:
+        repeat = 20 if n <= 10_000 else 2
+        dict_time = best_of(dict_func, data, repeat)
+        columnar_time = best_of(columnar_func, data, repeat)
+        print(f"{n:>10} {dict_time * 1000:>12.2f} {columnar_time * 1000:>14.2f} {dict_time / columnar_time:>7.1f}x")
+    print()
+
+
+def main():
+    rows = [(n, make_rows(n)) for n in SIZES]
+    report("Parsing provider rows", dict_path, columnar_path, rows)
+
+    arrays = [(n, candles_to_array(data)) for n, data in rows]
+    report("Cache hit", cached_dict_path, cached_columnar_path, arrays)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Micro-benchmark: calculate_indicators on one DataFrame per symbol vs
+calculate_indicators_batch on a (symbols x time) matrix, for the analyzer's
+100-candle window and a range of symbol counts.
+
+Run with: python -m benchmarks.bench_indicator_batch
+"""
+import time
+
+import numpy as np
+import pandas as pd
+
+from api.synthetic_feed import SyntheticMarketFeed
+from utils.technical_indicators import TechnicalIndicators
+
+SYMBOL_COUNTS = (10, 100, 500)
+WINDOW = 100
+
+
+def timed(func):
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def main():
+    indicators = TechnicalIndicators()
+
+    print(f"{'symbols':>8} {'per-symbol (ms)':>16} {'batch (ms)':>11} {'batch + frames (ms)':>20} {'speedup':>8}")
+    for n_symbols in SYMBOL_COUNTS:
+        symbols = [f"SYM{i}/USD" for i in range(n_symbols)]
+        feed = SyntheticMarketFeed(seed=1, capacity=WINDOW, clock=lambda: 1_700_000_000)
+        candles = {symbol: np.array(data) for symbol, data in feed.candles_many(symbols, 60, WINDOW).items()}
+
+        per_symbol_time = timed(lambda: [
+            indicators.calculate_indicators(pd.DataFrame(candles[symbol])) for symbol in symbols
+        ])
+        batch_time = timed(lambda: indicators.calculate_indicators_batch(candles))
+
+        # What the analyzer does: one batch, then a DataFrame per symbol for the detector
+        def batch_with_frames():
+            batch = indicators.calculate_indicators_batch(candles)
+            for symbol in symbols:
+                batch.frame(symbol)
+        frames_time = timed(batch_with_frames)
+
+        print(f"{n_symbols:>8} {per_symbol_time * 1000:>16.1f} {batch_time * 1000:>11.1f} "
+              f"{frames_time * 1000:>20.1f} {per_symbol_time / frames_time:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Micro-benchmark: the previous pandas indicator path vs calculate_indicators
+on the NumPy kernels.
+Reports wall time per call, peak memory allocated during a call (traced
+with tracemalloc) and the largest difference from the pandas path.
+
+Run with: python -m benchmarks.bench_indicator_kernels
+"""
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from api.synthetic_feed import SyntheticMarketFeed
+from utils.indicator_kernels import INDICATOR_COLUMNS
+from utils.technical_indicators import TechnicalIndicators
+
+SIZES = (100, 1_000, 10_000, 100_000)
+
+
+def pandas_indicators(df):
+    """The previous path: df.copy(), Series temporaries and a DataFrame for the ATR row max"""
+    df = df.copy()
+
+    delta = df['close'].diff()
+    gain = delta.mask(delta < 0, 0.0)
+    loss = -delta.mask(delta > 0, 0.0)
+    rs = gain.rolling(window=14).mean() / loss.rolling(window=14).mean()
+    df['rsi'] = 100 - (100 / (1 + rs))
+
+    ema_fast = df['close'].ewm(span=12, adjust=False).mean()
+    ema_slow = df['close'].ewm(span=26, adjust=False).mean()
+    df['macd'] = ema_fast - ema_slow
+    df['macd_signal'] = df['macd'].ewm(span=9, adjust=False).mean()
+    df['macd_hist'] = df['macd'] - df['macd_signal']
+
+    df['ema50'] = df['close'].ewm(span=50, adjust=False).mean()
+
+    df['bb_middle'] = df['close'].rolling(window=20).mean()
+    rolling_std = df['close'].rolling(window=20).std()
+    df['bb_upper'] = df['bb_middle'] + (rolling_std * 2)
+    df['bb_lower'] = df['bb_middle'] - (rolling_std * 2)
+
+    tr1 = df['high'] - df['low']
+    tr2 = abs(df['high'] - df['close'].shift())
+    tr3 = abs(df['low'] - df['close'].shift())
+    tr = pd.DataFrame({'tr1': tr1, 'tr2': tr2, 'tr3': tr3}).max(axis=1)
+    df['atr'] = tr.rolling(window=14).mean()
+
+    df['volume_ma'] = df['volume'].rolling(window=20).mean()
+    return df
+
+
+def measure(func, repeat):
+    """Return (seconds per call, peak KiB allocated during one call)"""
+    func()  # warm-up: buffers and caches are allocated once
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    elapsed = (time.perf_counter() - start) / repeat
+
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    baseline = tracemalloc.get_traced_memory()[0]
+    func()
+    peak = tracemalloc.get_traced_memory()[1] - baseline
+    tracemalloc.stop()
+    return elapsed, peak / 1024
+
+
+def main():
+    indicators = TechnicalIndicators()
+
+    print(f"{'candles':>8} | {'pandas':>18} | {'calculate_indicators':>22} | {'max diff':>9}")
+    print(f"{'':>8} | {'ms':>8} {'KiB':>9} | {'ms':>10} {'KiB':>11} |")
+    for size in SIZES:
+        feed = SyntheticMarketFeed(seed=1, capacity=size, clock=lambda: 1_700_000_000)
+        candles = np.array(feed.candles("EUR/USD", 60, size))
+        df = pd.DataFrame(candles)
+        repeat = max(3, 20_000 // size)
+
+        pandas_time, pandas_peak = measure(lambda: pandas_indicators(df), repeat)
+        wrapper_time, wrapper_peak = measure(lambda: indicators.calculate_indicators(df), repeat)
+
+        expected = pandas_indicators(df)
+        result = indicators.calculate_indicators(df)
+        diff = max(
+            np.nanmax(np.abs(result[column].to_numpy() - expected[column].to_numpy()))
+            for column in INDICATOR_COLUMNS
+        )
+
+        print(f"{size:>8} | {pandas_time * 1000:>8.2f} {pandas_peak:>9.1f} | {wrapper_time * 1000:>10.2f} "
+              f"{wrapper_peak:>11.1f} | {diff:>9.1e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Micro-benchmark: MarketAnalyzer._detect_signal run once per bar over every
+prefix of a series vs evaluate_signals scoring the whole series in one
+pass. Checks that direction, confidence, win rate and risk level agree on
+every bar.
+
+Run with: python -m benchmarks.bench_signal_evaluator
+"""
+import logging
+import time
+import types
+
+import numpy as np
+import pandas as pd
+
+from api.clock import SystemClock
+from api.synthetic_feed import SyntheticMarketFeed
+from utils.market_analyzer import MarketAnalyzer
+from utils.signal_evaluator import evaluate_signals
+from utils.technical_indicators import TechnicalIndicators
+
+SIZES = (500, 2_000)
+LARGE_SIZE = 1_000_000
+THRESHOLDS = (0, 75)
+FIELDS = ('direction', 'confidence', 'win_rate_prediction', 'risk_level')
+
+
+def scalar_signals(analyzer, df, settings):
+    """_detect_signal on df.iloc[:i + 1] for every i; a bar whose evaluation raises has no signal"""
+    signals = []
+    for end in range(1, len(df) + 1):
+        try:
+            signals.append(analyzer._detect_signal(df.iloc[:end], "EUR/USD", settings))
+        except (ValueError, OverflowError):
+            signals.append(None)
+    return signals
+
+
+def mismatches(signals, evaluated):
+    count = 0
+    for signal, (_, row) in zip(signals, evaluated.iterrows()):
+        if signal is None:
+            count += not pd.isna(row['direction'])
+        else:
+            count += any(signal[field] != row[field] for field in FIELDS)
+    return count
+
+
+def main():
+    logging.disable(logging.CRITICAL)
+
+    # Only the detector is needed: no provider, database or analysis thread
+    analyzer = MarketAnalyzer.__new__(MarketAnalyzer)
+    analyzer.clock = SystemClock()
+    indicators = TechnicalIndicators()
+
+    print(f"{'candles':>8} {'threshold':>9} {'scalar, per bar (ms)':>21} {'vectorised (ms)':>16} "
+          f"{'signals':>8} {'mismatches':>11}")
+    for size in SIZES:
+        feed = SyntheticMarketFeed(seed=1, capacity=size, clock=lambda: 1_700_000_000)
+        df = indicators.calculate_indicators(pd.DataFrame(np.array(feed.candles("EUR/USD", 60, size))))
+
+        for threshold in THRESHOLDS:
+            settings = types.SimpleNamespace(min_confidence_threshold=threshold)
+
+            start = time.perf_counter()
+            signals = scalar_signals(analyzer, df, settings)
+            scalar_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            evaluated = evaluate_signals(df, threshold)
+            vector_time = time.perf_counter() - start
+
+            print(f"{size:>8} {threshold:>9} {scalar_time * 1000:>21.1f} {vector_time * 1000:>16.2f} "
+                  f"{evaluated['direction'].notna().sum():>8} {mismatches(signals, evaluated):>11}")
+
+    feed = SyntheticMarketFeed(seed=1, capacity=LARGE_SIZE, clock=lambda: 1_700_000_000)
+    df = indicators.calculate_indicators(pd.DataFrame(np.array(feed.candles("EUR/USD", 60, LARGE_SIZE))))
+    start = time.perf_counter()
+    evaluated = evaluate_signals(df)
+    print(f"{LARGE_SIZE:>8} {0:>9} {'':>21} {(time.perf_counter() - start) * 1000:>16.1f} "
+          f"{evaluated['direction'].notna().sum():>8}")
+
+
+if __name__ == "__main__":
+    main()
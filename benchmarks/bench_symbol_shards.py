@@ -0,0 +1,89 @@
+"""
+Throughput of the heavy analysis phase (indicators and _detect_signal for
+every symbol) in this process and sharded over worker processes that read
+candles from shared memory, with and without rendering the chart of each
+signal.
+
+Run with: python -m benchmarks.bench_symbol_shards
+"""
+import logging
+import os
+import tempfile
+import time
+import types
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from api.clock import ReplayClock
+from api.synthetic_feed import SyntheticMarketFeed
+from utils.market_analyzer import ANALYSIS_INDICATORS, MarketAnalyzer
+from utils.symbol_shards import SymbolShards
+from utils.technical_indicators import TechnicalIndicators
+
+SYMBOLS = [f"SYM{i}/USD" for i in range(200)]
+CYCLES = 5
+CHARTS = 8
+NOW = 1_700_000_000
+
+
+def cycles():
+    """CYCLES consecutive 100-candle windows per symbol"""
+    feed = SyntheticMarketFeed(seed=1, capacity=100 + CYCLES, clock=lambda: NOW)
+    history = {symbol: np.array(candles) for symbol, candles in feed.candles_many(SYMBOLS, 60, 100 + CYCLES).items()}
+    return [{symbol: candles[cycle:cycle + 100] for symbol, candles in history.items()} for cycle in range(CYCLES)]
+
+
+def in_process(windows):
+    indicators = TechnicalIndicators()
+    detector = MarketAnalyzer.detector(ReplayClock(NOW))
+    settings = types.SimpleNamespace(min_confidence_threshold=0)
+    start = time.perf_counter()
+    for data in windows:
+        batch = indicators.calculate_indicators_batch(data, columns=ANALYSIS_INDICATORS)
+        for symbol in data:
+            detector._detect_signal(batch.frame(symbol), symbol, settings)
+    return time.perf_counter() - start
+
+
+def sharded(windows, processes):
+    shards = SymbolShards(SYMBOLS, processes)
+    try:
+        shards.detect(shards.write(windows[0]), 0, NOW)  # start the workers
+
+        start = time.perf_counter()
+        for data in windows:
+            shards.detect(shards.write(data), 0, NOW)
+        detect = time.perf_counter() - start
+
+        # The analyzer confirms candidates from its thread pool, one shards.confirm per symbol
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=CHARTS) as executor:
+            list(executor.map(lambda symbol: shards.confirm(symbol, 0, NOW), SYMBOLS[:CHARTS]))
+        charts = time.perf_counter() - start
+    finally:
+        shards.close()
+    return detect, charts
+
+
+def main():
+    logging.disable(logging.WARNING)
+    warnings.simplefilter("ignore")
+    windows = cycles()
+    analysed = len(SYMBOLS) * CYCLES
+
+    with tempfile.TemporaryDirectory() as charts_dir:
+        # Workers write charts to static/charts under the working directory
+        os.chdir(charts_dir)
+
+        elapsed = in_process(windows)
+        print(f"{'mode':<14} {'symbols/s':>10} {'charts/s':>9}")
+        print(f"{'in process':<14} {analysed / elapsed:>10.0f} {'-':>9}")
+        for processes in sorted({1, 2, os.cpu_count() or 1}):
+            detect, charts = sharded(windows, processes)
+            print(f"{f'{processes} processes':<14} {analysed / detect:>10.0f} {CHARTS / charts:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
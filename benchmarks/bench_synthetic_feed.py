@@ -0,0 +1,75 @@
+"""
+Micro-benchmark: the previous per-candle Python loop generator vs
+SyntheticMarketFeed, for a range of (symbols x candles) sizes.
+
+Run with: python -m benchmarks.bench_synthetic_feed
+"""
+import random
+import time
+
+from api.synthetic_feed import SyntheticMarketFeed
+
+SIZES = ((5, 100), (100, 1_000), (1_000, 1_000), (2_000, 2_000))
+
+# The loop generator is only timed up to this many candles
+LOOP_MAX_CANDLES = 100_000
+
+
+def loop_generator(n_symbols, n_candles):
+    """The previous path: one Python loop iteration and dict per candle"""
+    for _ in range(n_symbols):
+        current_price = random.uniform(1.1, 1.3)
+        trend_duration = random.randint(5, 15)
+        trend_direction = random.choice([-1, 1])
+        trend_strength = random.uniform(0.0001, 0.0003)
+        trend_count = 0
+        candles = []
+        for i in range(n_candles):
+            if trend_count >= trend_duration:
+                trend_direction = -trend_direction
+                trend_duration = random.randint(5, 15)
+                trend_strength = random.uniform(0.0001, 0.0003)
+                trend_count = 0
+            total_move = current_price * trend_strength * trend_direction + random.uniform(-0.0001, 0.0001) * current_price
+            open_price = current_price
+            close_price = current_price + total_move
+            candles.append({
+                "timestamp": i * 60,
+                "open": round(open_price, 5),
+                "high": round(max(open_price, close_price) + abs(random.uniform(0, total_move)), 5),
+                "low": round(min(open_price, close_price) - abs(random.uniform(0, total_move)), 5),
+                "close": round(close_price, 5),
+                "volume": random.randint(100, 1000)
+            })
+            current_price = close_price
+            trend_count += 1
+
+
+def timed(func):
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def main():
+    print(f"{'symbols':>8} {'candles':>8} {'loop (ms)':>10} {'generate (ms)':>14} {'candles_many (ms)':>18} {'Mcandles/s':>11}")
+    for n_symbols, n_candles in SIZES:
+        symbols = [f"SYM{i}/USD" for i in range(n_symbols)]
+        total = n_symbols * n_candles
+
+        loop_ms = "-"
+        if total <= LOOP_MAX_CANDLES:
+            loop_ms = f"{timed(lambda: loop_generator(n_symbols, n_candles)) * 1000:.1f}"
+
+        feed = SyntheticMarketFeed(seed=1)
+        generate_time = timed(lambda: feed.generate(symbols, 60, n_candles))
+
+        feed = SyntheticMarketFeed(seed=1, capacity=n_candles)
+        many_time = timed(lambda: feed.candles_many(symbols, 60, n_candles))
+
+        print(f"{n_symbols:>8} {n_candles:>8} {loop_ms:>10} {generate_time * 1000:>14.1f} "
+              f"{many_time * 1000:>18.1f} {total / generate_time / 1e6:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
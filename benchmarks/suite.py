@@ -0,0 +1,329 @@
+"""
+Component benchmark suite with regression thresholds.
+
+Times the hot paths of one analysis cycle on synthetic data at several
+sizes and compares each result with the baseline stored in
+benchmarks/baseline.json. A benchmark regresses when it is slower than
+its baseline by more than the threshold percentage. The exit status is 1
+if any benchmark regressed. Everything runs offline: there is no provider,
+database or Telegram request, and charts go to a temporary directory.
+
+Run with:
+    python -m benchmarks.suite                     # compare with the baseline
+    python -m benchmarks.suite --threshold 10      # stricter threshold
+    python -m benchmarks.suite -k indicators       # only matching benchmarks
+    python -m benchmarks.suite --update-baseline   # record a new baseline
+
+Baselines are machine-specific: record them on the machine that runs the
+comparison, with the declared dependencies installed (the Telegram
+formatters need aiohttp). Each benchmark is timed in rounds interleaved
+with a fixed calibration workload, and the median ratio to the
+calibration is compared. That absorbs a uniformly faster or slower
+machine and short bursts of load from other processes; sustained load
+still shows up, so prefer a quiet machine.
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import sys
+import tempfile
+import timeit
+import types
+import warnings
+from datetime import datetime
+from statistics import median
+
+import numpy as np
+import pandas as pd
+
+from api.clock import SystemClock
+from api.synthetic_feed import SyntheticMarketFeed
+from utils.technical_indicators import TechnicalIndicators
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+# Allowed slowdown against the baseline, in percent. Four runs of the
+# unchanged tree on a shared single-core runner changed by up to +24%; the
+# default leaves a margin above that noise
+DEFAULT_THRESHOLD = float(os.environ.get("BENCHMARK_REGRESSION_THRESHOLD", 40))
+
+# Each benchmark is timed in ROUNDS rounds of enough calls to take at least
+# MIN_TIME, each right after CALIBRATION_TIME of the calibration workload
+MIN_TIME = 0.1
+CALIBRATION_TIME = 0.05
+ROUNDS = 15
+
+FIXED_NOW = 1_700_000_000
+
+
+def synthetic_frame(size):
+    feed = SyntheticMarketFeed(seed=1, capacity=size, clock=lambda: FIXED_NOW)
+    return pd.DataFrame(np.array(feed.candles("EUR/USD", 60, size)))
+
+
+def detector():
+    """A MarketAnalyzer with only what _detect_signal needs: no provider, database or thread"""
+    from utils.market_analyzer import MarketAnalyzer
+
+    analyzer = MarketAnalyzer.__new__(MarketAnalyzer)
+    analyzer.clock = SystemClock()
+    return analyzer
+
+
+def sample_signal(df, analyzer):
+    """A Signal-like object built from _detect_signal output, as the analysis loop stores it"""
+    settings = types.SimpleNamespace(min_confidence_threshold=0)
+    data = analyzer._detect_signal(df, "EUR/USD", settings)
+    return types.SimpleNamespace(
+        symbol="EUR/USD",
+        timeframe="M1",
+        sent_at=datetime.fromtimestamp(FIXED_NOW),
+        result="WIN",
+        open_price=float(df['close'].iloc[-2]),
+        close_price=float(df['close'].iloc[-1]),
+        post_analysis="Harga bergerak naik sesuai prediksi",
+        **data
+    )
+
+
+def bench_calculate_indicators(size):
+    indicators = TechnicalIndicators()
+    df = synthetic_frame(size)
+    return lambda: indicators.calculate_indicators(df)
+
+
+def bench_detect_signal(size):
+    analyzer = detector()
+    df = TechnicalIndicators().calculate_indicators(synthetic_frame(size))
+    settings = types.SimpleNamespace(min_confidence_threshold=0)
+    return lambda: analyzer._detect_signal(df, "EUR/USD", settings)
+
+
+def bench_detect_candle_pattern(size):
+    analyzer = detector()
+    df = synthetic_frame(size)
+    return lambda: analyzer._detect_candle_pattern(df)
+
+
+def bench_predict_win_probability(size):
+    from utils.ml_predictor import MLPredictor
+
+    # An empty model directory: the predictor uses its fallback, as it does without a trained model
+    predictor = MLPredictor(model_dir=tempfile.mkdtemp(prefix="bench_models_"))
+    features = {
+        'rsi': 62.5, 'macd': 0.00012, 'ema_diff': 0.08, 'bb_pos': 0.7,
+        'volatility': 6.5, 'volume_ratio': 1.3, 'price_pressure': 0.6, 'is_buy': 1,
+    }
+    return lambda: predictor.predict_win_probability(features)
+
+
+def bench_generate_chart(size):
+    from utils.chart_generator import ChartGenerator
+
+    generator = ChartGenerator()
+    analyzer = detector()
+    df = TechnicalIndicators().calculate_indicators(synthetic_frame(size))
+    signal = sample_signal(df, analyzer)
+    save_dir = tempfile.mkdtemp(prefix="bench_charts_")
+    return lambda: generator.generate_chart(df, signal, save_dir=save_dir, filename="bench.png")
+
+
+def bench_format_signal_message(size):
+    from utils.telegram_bot import TelegramBot
+
+    bot = TelegramBot(token="offline")
+    signal = sample_signal(TechnicalIndicators().calculate_indicators(synthetic_frame(size)), detector())
+    return lambda: bot._format_signal_message(signal)
+
+
+def bench_format_result_message(size):
+    from utils.telegram_bot import TelegramBot
+
+    bot = TelegramBot(token="offline")
+    signal = sample_signal(TechnicalIndicators().calculate_indicators(synthetic_frame(size)), detector())
+    return lambda: bot._format_result_message(signal)
+
+
+# (name, setup, sizes); setup(size) returns the function to time. Components
+# are imported in setup, so a missing optional dependency only skips the
+# benchmarks that need it
+BENCHMARKS = (
+    ("calculate_indicators", bench_calculate_indicators, (100, 1_000, 10_000)),
+    ("detect_signal", bench_detect_signal, (100, 1_000, 10_000)),
+    ("detect_candle_pattern", bench_detect_candle_pattern, (100, 10_000)),
+    ("predict_win_probability", bench_predict_win_probability, (1,)),
+    ("generate_chart", bench_generate_chart, (100,)),
+    ("format_signal_message", bench_format_signal_message, (100,)),
+    ("format_result_message", bench_format_result_message, (100,)),
+)
+
+
+def timer_loops(func, min_time):
+    """A timeit.Timer for func and the number of calls that takes at least min_time"""
+    func()  # warm-up
+    timer = timeit.Timer(func)
+    loops, elapsed = timer.autorange()
+    if elapsed < min_time:
+        loops = max(1, int(loops * min_time / elapsed))
+    return timer, loops
+
+
+def measure(func, calibration):
+    """
+    Median seconds per call and median ratio to the calibration workload
+    over ROUNDS rounds, each timing the calibration right before func. A
+    burst of load from other processes only skews the rounds it overlaps
+    """
+    timer, loops = timer_loops(func, MIN_TIME)
+    calibration_timer, calibration_loops = calibration
+    seconds, ratios = [], []
+    for _ in range(ROUNDS):
+        reference = calibration_timer.timeit(calibration_loops) / calibration_loops
+        elapsed = timer.timeit(loops) / loops
+        seconds.append(elapsed)
+        ratios.append(elapsed / reference)
+    return median(seconds), median(ratios)
+
+
+def calibration_workload():
+    """A fixed mix of NumPy and interpreter work, timed alongside the suite to measure machine speed"""
+    values = np.arange(20_000, dtype=np.float64)
+    total = 0.0
+    for value in values[:2_000].tolist():
+        total += value * 0.5
+    return float(np.sqrt(values).sum() + np.cumsum(values)[-1]) + total
+
+
+def run(selected=None):
+    """
+    Per benchmark key, median seconds per call and median ratio to the
+    calibration workload, plus the median calibration time
+    """
+    results = {}
+    calibration = timer_loops(calibration_workload, CALIBRATION_TIME)
+    for name, setup, sizes in BENCHMARKS:
+        for size in sizes:
+            key = f"{name}[{size}]"
+            if selected and not any(pattern in key for pattern in selected):
+                continue
+            try:
+                func = setup(size)
+            except ImportError as e:
+                print(f"  {key:<36} {'skipped':>10}    ({e})", flush=True)
+                continue
+            results[key] = measure(func, calibration)
+            print(f"  {key:<36} {results[key][0] * 1e3:>10.3f} ms", flush=True)
+
+    timer, loops = calibration
+    return results, median(timer.repeat(repeat=ROUNDS, number=loops)) / loops
+
+
+def environment():
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def load_baseline(path):
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_baseline(path, results, calibration, previous=None):
+    """
+    Write results into the baseline. Benchmarks that were not run keep their
+    old ratio, and their time rescaled to this run's calibration
+    """
+    benchmarks, relative = {}, {}
+    if previous and "relative" in previous:
+        scale = calibration / previous["calibration"]
+        benchmarks.update((key, round(seconds * scale, 9)) for key, seconds in previous["benchmarks"].items())
+        relative.update(previous["relative"])
+    for key, (seconds, ratio) in results.items():
+        benchmarks[key] = round(seconds, 9)
+        relative[key] = round(ratio, 6)
+    baseline = {
+        "environment": environment(),
+        "calibration": round(calibration, 9),
+        "benchmarks": dict(sorted(benchmarks.items())),
+        "relative": dict(sorted(relative.items())),
+    }
+    with open(path, "w") as f:
+        json.dump(baseline, f, indent=1)
+        f.write("\n")
+
+
+def compare(results, calibration, baseline, threshold):
+    """
+    Print each benchmark against its baseline; return the keys that regressed.
+    The change is that of the median ratio to the calibration workload, so a
+    machine that is uniformly slower or busier does not count as a regression
+    """
+    speed = calibration / baseline["calibration"]
+    print(f"\nMachine speed against baseline: calibration {speed:.2f}x the baseline time")
+    regressions = []
+    print(f"\n{'benchmark':<38} {'baseline ms':>12} {'current ms':>11} {'change':>8}")
+    for key, (seconds, ratio) in results.items():
+        reference = baseline["relative"].get(key)
+        if reference is None:
+            print(f"{key:<38} {'-':>12} {seconds * 1e3:>11.3f} {'new':>8}")
+            continue
+
+        change = (ratio / reference - 1) * 100
+        regressed = change > threshold
+        if regressed:
+            regressions.append(key)
+        print(f"{key:<38} {baseline['benchmarks'][key] * 1e3:>12.3f} {seconds * 1e3:>11.3f} {change:>+7.1f}%"
+              f"{'  REGRESSION' if regressed else ''}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Component benchmark suite with regression thresholds")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="Baseline JSON file")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help=f"Allowed slowdown in percent (default: {DEFAULT_THRESHOLD:g}, "
+                             "or BENCHMARK_REGRESSION_THRESHOLD)")
+    parser.add_argument("-k", dest="selected", action="append", help="Only run benchmarks whose name contains this")
+    parser.add_argument("--update-baseline", action="store_true", help="Record the results as the new baseline")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    warnings.simplefilter("ignore")
+
+    print("Running benchmarks:")
+    results, calibration = run(args.selected)
+    baseline = load_baseline(args.baseline)
+
+    if args.update_baseline:
+        save_baseline(args.baseline, results, calibration, baseline)
+        print(f"\nBaseline written to {args.baseline}")
+        return 0
+
+    if baseline is None or "relative" not in baseline:
+        print(f"\nNo baseline with calibration ratios at {args.baseline}; record one with --update-baseline")
+        return 0
+
+    if baseline.get("environment") != environment():
+        print(f"\nNote: baseline was recorded on {baseline.get('environment')}; timings may not be comparable")
+
+    regressions = compare(results, calibration, baseline, args.threshold)
+    if regressions:
+        print(f"\n{len(regressions)} benchmark(s) slower than baseline by more than {args.threshold:g}%: "
+              f"{', '.join(regressions)}")
+        return 1
+    print(f"\nNo regressions beyond {args.threshold:g}%")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,8 +1,14 @@
 import logging
-from app import app, db, market_analyzer, telegram_bot
-from models import Setting
 import os
 
+# Worker analisis (forkserver, lihat utils/symbol_shards.py) menjalankan ulang
+# modul utama sebagai __mp_main__; aplikasi dan bot hanya dibuat di proses utama
+ANALYSIS_WORKER = __name__ == '__mp_main__'
+
+if not ANALYSIS_WORKER:
+    from app import app, db, leader_election, start_bot
+    from models import Setting
+
 # Konfigurasi logging
 logging.basicConfig(
     level=logging.INFO,
@@ -32,21 +38,20 @@ def ensure_bot_active():
             db.session.commit()
             logging.info("Setting diperbarui dengan status aktif")
         
-        # Mulai bot market analyzer jika belum berjalan
+        # Bot hanya berjalan di proses leader (lihat leader_election di app.py);
+        # di proses standby bot dimulai saat proses ini terpilih
         try:
-            if not market_analyzer.running:
-                market_analyzer.start_analysis(settings)
-                logging.info("Bot analisis pasar dimulai pada startup aplikasi")
-            
-            # Mulai bot Telegram listener untuk menanggapi perintah
-            telegram_bot.set_token(settings.telegram_token)
-            telegram_bot.start_listening()
-            logging.info("Bot Telegram listener dimulai")
+            if leader_election.is_leader:
+                start_bot()
+                logging.info("Bot analisis pasar dan listener Telegram berjalan di proses leader")
+            else:
+                logging.info("Proses ini standby, bot berjalan di proses leader")
         except Exception as e:
             logging.error(f"Error saat memulai bot: {str(e)}")
 
 # Jalankan fungsi untuk memastikan bot aktif
-ensure_bot_active()
+if not ANALYSIS_WORKER:
+    ensure_bot_active()
 
 if __name__ == "__main__":
     app.run(host="0.0.0.0", port=5000, debug=True)
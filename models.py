@@ -45,7 +45,7 @@ class Signal(db.Model):
     chart_url = db.Column(db.String(256))  # URL ke gambar grafik analisis
     
     # Result data
-    result = db.Column(db.String(8), nullable=True)  # WIN, LOSS, DRAW, atau None jika belum ada hasil
+    result = db.Column(db.String(8), nullable=True)  # WIN, LOSS, DRAW, EXPIRED (candle tidak tersedia), atau None jika belum ada hasil
     open_price = db.Column(db.Float, nullable=True)  # Harga saat open
     close_price = db.Column(db.Float, nullable=True)  # Harga saat close
     post_analysis = db.Column(db.Text, nullable=True)  # Analisis pasca-eksekusi
@@ -76,3 +76,22 @@ class Setting(db.Model):
     def get_symbols_list(self):
         """Mengembalikan daftar simbol aktif sebagai list."""
         return [symbol.strip() for symbol in self.active_symbols.split(",")]
+
+class LeaderLease(db.Model):
+    name = db.Column(db.String(64), primary_key=True)  # Peran yang dipegang leader, misalnya: analyzer
+    holder = db.Column(db.String(128), nullable=False)  # host:pid:token proses pemegang lease
+    expires_at = db.Column(db.DateTime, nullable=False)  # Lease berlaku sampai waktu ini (UTC)
+    heartbeat_at = db.Column(db.DateTime, nullable=False)  # Perpanjangan terakhir (UTC)
+    acquired_at = db.Column(db.DateTime, nullable=False)  # Waktu pemegang saat ini terpilih (UTC)
+    
+    def __repr__(self):
+        return f'<LeaderLease {self.name} held by {self.holder} until {self.expires_at}>'
+
+class BotStats(db.Model):
+    name = db.Column(db.String(64), primary_key=True)  # Peran leader yang menerbitkan, misalnya: analyzer
+    holder = db.Column(db.String(128), nullable=False)  # host:pid:token proses leader yang menerbitkan
+    payload = db.Column(db.Text, nullable=False)  # JSON statistik provider, cache indikator dan pipeline
+    published_at = db.Column(db.DateTime, nullable=False)  # Waktu diterbitkan (UTC)
+    
+    def __repr__(self):
+        return f'<BotStats {self.name} from {self.holder} at {self.published_at}>'
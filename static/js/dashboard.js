@@ -192,6 +192,11 @@ function fetchLatestSignals() {
                     resultClass = 'draw';
                     resultIcon = 'minus-circle';
                     resultText = 'DRAW';
+                } else if (signal.result === 'EXPIRED') {
+                    // Candle eksekusi tidak tersedia, hasil tidak dapat ditentukan
+                    resultClass = 'expired';
+                    resultIcon = 'question-circle';
+                    resultText = 'EXPIRED';
                 }
                 
                 const directionClass = signal.direction === 'BUY' ? 'buy' : 'sell';
@@ -254,9 +259,10 @@ function updateStatistics(signals) {
         if (signal.result === 'WIN') wins++;
         else if (signal.result === 'LOSS') losses++;
         else if (signal.result === 'DRAW') draws++;
+        // EXPIRED dan PENDING belum punya hasil, jadi tidak masuk pembagi win rate
     });
     
-    // Hitung win rate
+    // Hitung win rate dari sinyal yang hasilnya sudah diketahui
     const total = wins + losses + draws;
     const winRate = total > 0 ? Math.round((wins / total) * 100) : 0;
     
@@ -0,0 +1,137 @@
+"""
+The confirmation refresh must not spend the credits the next candle-close
+analysis needs: the loop is run for several minutes on a replay clock
+against a fake provider, with the default budget of 8 credits a minute.
+"""
+import types
+from datetime import datetime
+
+import pytest
+
+from api.candles import DATETIME_FORMAT
+from api.clock import ReplayClock
+from api.pocket_option import PocketOptionAPI
+from api.request_scheduler import RequestScheduler
+from utils.indicator_cache import IndicatorCache
+from utils.market_analyzer import CANDLE_SECONDS, MarketAnalyzer
+from utils.technical_indicators import TechnicalIndicators
+
+SYMBOLS = ["EUR/USD", "GBP/USD", "USD/JPY", "AUD/JPY", "USD/CAD"]
+CANDIDATES = SYMBOLS[:3]
+START = 1_700_000_040 + 1  # one second after a candle boundary
+MINUTES = 6
+
+
+class FakeProvider:
+    """Twelve Data time_series stand-in; the forming bar's close moves with the clock"""
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.requests = []
+
+    def time_series(self, symbol, interval, outputsize, start_date=None, end_date=None):
+        self.requests.append((self.clock.time(), symbol))
+        symbols = symbol.split(",")
+        rows = {name: self._rows(outputsize) for name in symbols}
+        return types.SimpleNamespace(as_json=lambda: rows[symbols[0]] if len(symbols) == 1 else rows)
+
+    def _rows(self, outputsize):
+        now = self.clock.time()
+        current = int(now) // CANDLE_SECONDS * CANDLE_SECONDS
+        rows = []
+        for age in range(outputsize):
+            timestamp = current - age * CANDLE_SECONDS
+            close = 1.1 + (now - timestamp) * 1e-5 if age == 0 else 1.1 + (timestamp % 7) * 1e-4
+            rows.append({
+                'datetime': datetime.fromtimestamp(timestamp).strftime(DATETIME_FORMAT),
+                'open': 1.1, 'high': max(1.1, close) + 1e-4, 'low': min(1.1, close) - 1e-4,
+                'close': close, 'volume': 100,
+            })
+        return rows  # newest first, as Twelve Data returns them
+
+
+class RecordingPipeline:
+    def __init__(self):
+        self.jobs = []
+
+    def submit(self, job):
+        self.jobs.append(job)
+        return True
+
+    def stats(self):
+        return {}
+
+
+def build_analyzer(credits_per_minute):
+    clock = ReplayClock(START)
+    provider = FakeProvider(clock)
+    api = PocketOptionAPI(clock=clock, provider=provider, credits_per_minute=credits_per_minute)
+    api.request_scheduler = RequestScheduler(credits_per_minute, clock=clock.time)
+
+    analyzer = MarketAnalyzer.detector(clock)
+    analyzer.pocket_option_api = api
+    analyzer.indicator_cache = IndicatorCache(TechnicalIndicators())
+    analyzer.shards = None
+    analyzer.pipeline = RecordingPipeline()
+    settings = types.SimpleNamespace(
+        min_confidence_threshold=0,
+        signal_time_before_candle=10,
+        get_symbols_list=lambda: list(SYMBOLS),
+    )
+    return analyzer, provider, settings
+
+
+def run_minutes(analyzer, settings, on_heavy_pass):
+    """The analysis loop's schedule: heavy pass after the close, confirmation at T-10s"""
+    clock = analyzer.clock
+    api = analyzer.pocket_option_api
+    last_signal_candle = dict.fromkeys(SYMBOLS, 0)
+    for _ in range(MINUTES):
+        candle_open = int(clock.time()) // CANDLE_SECONDS * CANDLE_SECONDS
+        analyzer._find_signal_candidates(SYMBOLS, settings)
+        on_heavy_pass(api, candle_open)
+
+        candle_close = candle_open + CANDLE_SECONDS
+        clock.sleep(candle_close - settings.signal_time_before_candle - clock.time())
+        analyzer._confirm_and_send(list(CANDIDATES), settings, last_signal_candle, candle_close)
+        clock.sleep(candle_close + 1 - clock.time())
+
+
+def last_timestamps(api):
+    return {symbol: int(api.candle_buffers[(symbol, "1min")].last_candle['timestamp']) for symbol in SYMBOLS}
+
+
+def test_heavy_pass_stays_fresh_on_the_default_budget():
+    analyzer, _, settings = build_analyzer(credits_per_minute=8)
+    stale = []
+
+    def check(api, candle_open):
+        stale.extend(
+            (candle_open, symbol) for symbol, timestamp in last_timestamps(api).items()
+            if timestamp != candle_open
+        )
+
+    run_minutes(analyzer, settings, check)
+    assert stale == []
+    assert len(analyzer.pipeline.jobs) == MINUTES * len(CANDIDATES)
+
+
+def test_confirmation_refreshes_the_forming_bar_when_credits_allow():
+    analyzer, provider, settings = build_analyzer(credits_per_minute=60)
+    run_minutes(analyzer, settings, lambda api, candle_open: None)
+
+    confirm_requests = [
+        symbols for at, symbols in provider.requests
+        if at % CANDLE_SECONDS == CANDLE_SECONDS - settings.signal_time_before_candle
+    ]
+    assert len(confirm_requests) == MINUTES
+    assert all(sorted(symbols.split(",")) == sorted(s.replace("/", "") for s in CANDIDATES)
+               for symbols in confirm_requests)
+
+
+@pytest.mark.parametrize("cost, keep, expected", [(3, 5, False), (1, 5, True), (0, 6, True)])
+def test_can_refresh_reserves_the_next_batch(cost, keep, expected):
+    analyzer, _, _ = build_analyzer(credits_per_minute=8)
+    api = analyzer.pocket_option_api
+    api.request_scheduler.tokens = 8.0
+    assert api.can_refresh(SYMBOLS[:cost], reserve=keep, within=10) is expected
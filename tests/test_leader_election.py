@@ -0,0 +1,153 @@
+"""
+LeaderElection election, takeover and demotion between several "processes"
+(LeaderElection instances) sharing one SQLite lease table.
+"""
+import threading
+import time
+
+import pytest
+from flask import Flask
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy.orm import DeclarativeBase
+
+from utils.leader_election import LeaderElection
+
+TTL = 0.6
+HEARTBEAT = 0.1
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+db = SQLAlchemy(model_class=Base)
+
+
+class LeaderLease(db.Model):
+    """Same columns as models.LeaderLease, on a database the test owns"""
+    name = db.Column(db.String(64), primary_key=True)
+    holder = db.Column(db.String(128), nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False)
+    heartbeat_at = db.Column(db.DateTime, nullable=False)
+    acquired_at = db.Column(db.DateTime, nullable=False)
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{tmp_path / 'lease.db'}"
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+    yield app
+    with app.app_context():
+        db.engine.dispose()
+
+
+class Process:
+    """One contender with its callbacks recorded on a shared timeline"""
+
+    def __init__(self, app, name, timeline):
+        self.name = name
+        self.timeline = timeline
+        self.elected = threading.Event()
+        self.demoted = threading.Event()
+        self.election = LeaderElection(
+            app, db, 'analyzer', on_elected=self._on_elected, on_demoted=self._on_demoted,
+            ttl=TTL, heartbeat_interval=HEARTBEAT, lease_model=LeaderLease
+        )
+
+    def _on_elected(self):
+        self.timeline.append((time.monotonic(), self.name, 'elected'))
+        self.elected.set()
+
+    def _on_demoted(self):
+        self.timeline.append((time.monotonic(), self.name, 'demoted'))
+        self.demoted.set()
+
+
+def lease_holder(app):
+    with app.app_context():
+        return db.session.get(LeaderLease, 'analyzer').holder
+
+
+def test_only_one_process_is_elected(app):
+    timeline = []
+    processes = [Process(app, f"p{i}", timeline) for i in range(3)]
+    for process in processes:
+        process.election.start()
+    try:
+        time.sleep(5 * HEARTBEAT)
+        leaders = [process for process in processes if process.election.is_leader]
+        assert len(leaders) == 1
+        assert [event for _, _, event in timeline] == ['elected']
+        assert lease_holder(app) == leaders[0].election.identity
+    finally:
+        for process in processes:
+            process.election.stop()
+
+
+def test_standby_takes_over_after_the_leader_stops_renewing(app):
+    timeline = []
+    leader = Process(app, "leader", timeline)
+    standby = Process(app, "standby", timeline)
+    leader.election.start()
+    assert leader.elected.wait(2)
+    standby.election.start()
+
+    # The leader can no longer reach the database: it keeps the role only
+    # while its last lease is valid, and must step down before anyone else
+    # is elected
+    def unreachable():
+        raise RuntimeError("database unreachable")
+
+    leader.election.try_acquire = unreachable
+    try:
+        assert standby.elected.wait(TTL + 10 * HEARTBEAT)
+        assert leader.demoted.is_set()
+        assert [(name, event) for _, name, event in timeline] == [
+            ("leader", "elected"), ("leader", "demoted"), ("standby", "elected")
+        ]
+        assert lease_holder(app) == standby.election.identity
+    finally:
+        standby.election.stop()
+        leader.election.stop()
+
+
+def test_stop_releases_the_lease_for_an_immediate_takeover(app):
+    timeline = []
+    leader = Process(app, "leader", timeline)
+    standby = Process(app, "standby", timeline)
+    leader.election.start()
+    assert leader.elected.wait(2)
+    standby.election.start()
+    time.sleep(2 * HEARTBEAT)
+    assert not standby.election.is_leader
+
+    stopped_at = time.monotonic()
+    leader.election.stop()
+    try:
+        assert leader.demoted.is_set()
+        assert standby.elected.wait(TTL)
+        # Well before the released lease would have expired on its own
+        assert timeline[-1][0] - stopped_at < TTL
+    finally:
+        standby.election.stop()
+
+
+def test_a_lease_taken_over_demotes_the_old_holder(app):
+    timeline = []
+    first = Process(app, "first", timeline)
+    second = Process(app, "second", timeline)
+
+    assert first.election.try_acquire()
+    first.election._set_leader(True)
+    assert not second.election.try_acquire()
+
+    time.sleep(TTL + HEARTBEAT)  # first missed its renewals; the lease expired
+    assert second.election.try_acquire()
+    first.election._set_leader(first.election.try_acquire())
+
+    assert first.demoted.is_set()
+    assert not first.election.is_leader
+    assert lease_holder(app) == second.election.identity
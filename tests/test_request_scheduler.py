@@ -0,0 +1,111 @@
+"""
+RequestScheduler reservation and deferral, on a clock the tests move by hand.
+"""
+import threading
+import time
+
+import pytest
+
+from api.request_scheduler import PRIORITY_ANALYSIS, PRIORITY_RESULT, RequestDeferred, RequestScheduler
+
+
+class ManualClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+def make_scheduler(credits_per_minute=8, **kwargs):
+    clock = ManualClock()
+    return RequestScheduler(credits_per_minute, clock=clock, **kwargs), clock
+
+
+def analysis(scheduler, cost=1):
+    return scheduler.execute(lambda: "ok", cost=cost, priority=PRIORITY_ANALYSIS)
+
+
+def test_analysis_stops_at_the_result_reserve():
+    scheduler, _ = make_scheduler(8)
+    assert scheduler.reserved_credits == 2
+
+    for _ in range(6):
+        assert analysis(scheduler) == "ok"
+    with pytest.raises(RequestDeferred):
+        analysis(scheduler)
+
+    # The reserve is still there for results
+    assert scheduler.execute(lambda: "result", cost=2, priority=PRIORITY_RESULT, timeout=0) == "result"
+    assert scheduler.stats()["deferred"] == 1
+    assert scheduler.stats()["executed"] == 7
+
+
+def test_deferred_analysis_runs_once_the_bucket_refills():
+    scheduler, clock = make_scheduler(8)
+    analysis(scheduler, cost=6)
+    with pytest.raises(RequestDeferred):
+        analysis(scheduler)
+
+    clock.advance(60 / 8)  # one credit
+    assert analysis(scheduler) == "ok"
+
+
+def test_analysis_is_deferred_while_a_result_request_waits():
+    scheduler, clock = make_scheduler(8)
+    scheduler.execute(lambda: None, cost=8, priority=PRIORITY_RESULT)
+
+    results = []
+    waiter = threading.Thread(
+        target=lambda: results.append(scheduler.execute(lambda: "result", priority=PRIORITY_RESULT, timeout=60))
+    )
+    waiter.start()
+    for _ in range(200):
+        if scheduler.waiting[PRIORITY_RESULT]:
+            break
+        time.sleep(0.01)
+    assert scheduler.stats()["queue_depth"] == {"result": 1, "analysis": 0}
+
+    # Even with credits above the reserve, analysis yields to the waiting result
+    clock.advance(60)
+    with pytest.raises(RequestDeferred):
+        analysis(scheduler)
+
+    with scheduler.condition:
+        scheduler.condition.notify_all()
+    waiter.join(timeout=5)
+    assert results == ["result"]
+    assert analysis(scheduler) == "ok"
+
+
+def test_result_request_times_out_without_credits():
+    scheduler, _ = make_scheduler(8)
+    scheduler.execute(lambda: None, cost=8, priority=PRIORITY_RESULT)
+    with pytest.raises(RequestDeferred):
+        scheduler.execute(lambda: None, priority=PRIORITY_RESULT, timeout=0)
+
+
+def test_penalize_blocks_every_priority_until_retry_after():
+    scheduler, clock = make_scheduler(8)
+    scheduler.penalize(retry_after=30)
+    with pytest.raises(RequestDeferred):
+        analysis(scheduler)
+    with pytest.raises(RequestDeferred):
+        scheduler.execute(lambda: None, priority=PRIORITY_RESULT, timeout=0)
+
+    clock.advance(30)
+    assert scheduler.execute(lambda: "result", priority=PRIORITY_RESULT, timeout=0) == "result"
+
+
+def test_batch_larger_than_the_budget_runs_when_full_and_leaves_debt():
+    scheduler, clock = make_scheduler(8)
+    assert analysis(scheduler, cost=20) == "ok"
+    assert scheduler.stats()["credits_available"] == -12
+
+    clock.advance(60)
+    with pytest.raises(RequestDeferred):
+        analysis(scheduler)
+    assert scheduler.stats()["credits_used_last_minute"] == 0
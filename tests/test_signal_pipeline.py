@@ -0,0 +1,131 @@
+"""
+SignalPipeline deadlines and discard: a signal that is late for a stage is
+handed to on_missed instead of being sent.
+"""
+import threading
+import time
+
+from api.clock import ReplayClock, SystemClock
+from utils.market_analyzer import MarketAnalyzer
+from utils.signal_pipeline import SignalPipeline
+
+RENDER_SECONDS = 0.3
+
+
+class Recorder:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.delivered = []
+        self.missed = []
+
+    def deliver(self, job):
+        with self.lock:
+            self.delivered.append(job['symbol'])
+        return job
+
+    def on_missed(self, job):
+        with self.lock:
+            self.missed.append(job['symbol'])
+
+
+def test_jobs_late_for_a_stage_are_missed_not_delivered():
+    recorder = Recorder()
+
+    def render(job):
+        time.sleep(RENDER_SECONDS)
+        return job
+
+    pipeline = SignalPipeline(
+        [('render', render, 1, 8), ('deliver', recorder.deliver, 1, 8)],
+        SystemClock(), on_missed=recorder.on_missed
+    )
+    pipeline.start()
+    deadline = time.time() + RENDER_SECONDS * 1.5
+    for symbol in ("A", "B", "C", "D"):
+        assert pipeline.submit({'symbol': symbol, 'deadline': deadline})
+    time.sleep(RENDER_SECONDS * 3)
+    pipeline.stop()
+
+    # A is rendered in time; B finishes rendering after the deadline, C and D
+    # are still queued for render when it passes
+    assert recorder.delivered == ["A"]
+    assert sorted(recorder.missed) == ["B", "C", "D"]
+    stats = pipeline.stats()
+    assert (stats['render']['processed'], stats['render']['missed']) == (2, 2)
+    assert (stats['deliver']['processed'], stats['deliver']['missed']) == (1, 1)
+
+
+def test_submit_gives_up_when_the_first_queue_stays_full_past_the_deadline():
+    recorder = Recorder()
+    release = threading.Event()
+
+    def blocked(job):
+        release.wait(5)
+        return job
+
+    clock = SystemClock()
+    pipeline = SignalPipeline([('detect', blocked, 1, 1)], clock, on_missed=recorder.on_missed)
+    pipeline.start()
+    try:
+        assert pipeline.submit({'symbol': "A", 'deadline': None})
+        while pipeline.stats()['detect']['busy'] == 0:
+            time.sleep(0.01)
+        assert pipeline.submit({'symbol': "B", 'deadline': None})  # fills the queue
+
+        started = time.monotonic()
+        assert not pipeline.submit({'symbol': "C", 'deadline': clock.time() + 0.2})
+        assert time.monotonic() - started < 2
+        assert recorder.missed == ["C"]
+        assert pipeline.stats()['detect']['missed'] == 1
+    finally:
+        release.set()
+        pipeline.stop()
+
+
+def test_submit_after_the_deadline_is_missed_at_once():
+    recorder = Recorder()
+    clock = ReplayClock(1_700_000_000)
+    pipeline = SignalPipeline([('deliver', recorder.deliver, 1, 1)], clock, on_missed=recorder.on_missed)
+    pipeline.start()
+    pipeline.submit({'symbol': "A", 'deadline': clock.time() - 1})
+    pipeline.stop()
+    assert recorder.delivered == []
+    assert recorder.missed == ["A"]
+
+
+def test_discard_drops_queued_signals_and_their_charts(tmp_path):
+    recorder = Recorder()
+    release = threading.Event()
+    analyzer = MarketAnalyzer.detector(SystemClock())
+
+    def render(job):
+        release.wait(5)
+        job['chart_path'].write_bytes(b"png")
+        return job
+
+    def on_missed(job):
+        recorder.on_missed(job)
+        analyzer._discard_signal(job)
+
+    pipeline = SignalPipeline(
+        [('render', render, 1, 8), ('deliver', recorder.deliver, 1, 8)],
+        SystemClock(), on_missed=on_missed
+    )
+    pipeline.start()
+    charts = {symbol: tmp_path / f"signal_{symbol}.png" for symbol in ("A", "B", "C")}
+    for symbol, chart_path in charts.items():
+        pipeline.submit({'symbol': symbol, 'deadline': None, 'chart_path': chart_path})
+    while pipeline.stats()['render']['busy'] == 0:
+        time.sleep(0.01)
+
+    # A is being rendered: it finishes that stage but is not delivered
+    pipeline.discard()
+    release.set()
+    pipeline.stop()
+
+    assert recorder.delivered == []
+    assert sorted(recorder.missed) == ["A", "B", "C"]
+    assert not any(chart_path.exists() for chart_path in charts.values())
+    stats = pipeline.stats()
+    assert (stats['render']['processed'], stats['render']['discarded']) == (1, 2)
+    assert stats['deliver']['discarded'] == 1
@@ -0,0 +1,272 @@
+import logging
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from api.candle_store import CandleStore
+from api.pocket_option import INTERVAL_SECONDS
+from utils.candle_patterns import CANDLE_PATTERNS, classify_candles
+from utils.indicator_kernels import KernelWorkspace
+from utils.indicator_registry import DEFAULT_REGISTRY
+from utils.signal_evaluator import (
+    BUY, DRAW, LOSS, NO_SIGNAL, SELL, SIGNAL_COLUMNS, SIGNAL_INDICATORS, WIN,
+    evaluate_features, last_features, signal_features, trade_results
+)
+
+logger = logging.getLogger(__name__)
+
+# Jumlah candle yang dianalisis per siklus, sama dengan limit=100 di loop analisis
+ANALYSIS_WINDOW = 100
+
+# Candle per shard: satu simbol dibagi menjadi rentang waktu sepanjang ini
+# (30 hari M1) supaya semua proses pool tetap sibuk
+SHARD_CANDLES = 43_200
+
+# Jendela analisis yang dievaluasi bersama dalam satu array 2-D
+BLOCK_WINDOWS = 2048
+
+# Sinyal hasil backtest; result hanya berarti jika resolved (candle eksekusi ada)
+SIGNAL_DTYPE = np.dtype([
+    ("timestamp", "i8"),
+    ("direction", "i1"),
+    ("confidence", "f8"),
+    ("win_rate_prediction", "f8"),
+    ("pattern", "i1"),
+    ("result", "i1"),
+    ("resolved", "?"),
+])
+
+
+def backtest_candles(candles, interval_seconds, min_confidence_threshold=75, start=None, stop=None,
+                     window=ANALYSIS_WINDOW, workspace=None, params=None):
+    """
+    Menjalankan aturan sinyal atas riwayat candle. Candle ke-i dianalisis
+    seperti di loop analisis: indikator dihitung dari `window` candle
+    terakhir sampai candle i, lalu _detect_signal dievaluasi di candle i.
+    Sinyal dieksekusi di candle berikutnya dan dinilai dengan aturan
+    _check_signal_results
+
+    Args:
+        candles: Array CANDLE_DTYPE urut waktu (misalnya hasil CandleStore.read)
+        interval_seconds (int): Panjang satu candle dalam detik
+        min_confidence_threshold (float): Confidence minimum sebuah sinyal
+        start, stop (int): Rentang indeks candle yang dianalisis (default: semua)
+        window (int): Jumlah candle per analisis
+        workspace (KernelWorkspace): Buffer kerja kernel indikator
+        params (dict): Ambang aturan sinyal (default: SIGNAL_PARAMS)
+
+    Returns:
+        ndarray: Array SIGNAL_DTYPE, satu baris per sinyal
+    """
+    start, stop, features = history_features(candles, start, stop, window, workspace)
+    evaluated = evaluate_features(features, min_confidence_threshold, params)
+
+    rows = np.flatnonzero(evaluated['direction'] != NO_SIGNAL)
+    index = rows + start
+    signals = np.empty(len(rows), dtype=SIGNAL_DTYPE)
+    signals['timestamp'] = candles['timestamp'][index]
+    signals['direction'] = evaluated['direction'][rows]
+    signals['confidence'] = evaluated['confidence'][rows]
+    signals['win_rate_prediction'] = evaluated['win_rate_prediction'][rows]
+
+    # Pola candle hanya bergantung pada 3 candle terakhir
+    pattern_start = max(start - 2, 0)
+    patterns = classify_candles(*(candles[name][pattern_start:stop] for name in ('open', 'high', 'low', 'close')))
+    signals['pattern'] = patterns[index - pattern_start]
+
+    resolved, open_, close = execution_candles(candles, index, interval_seconds)
+    signals['resolved'] = resolved
+    signals['result'] = trade_results(signals['direction'], open_, close)
+    return signals
+
+
+def history_features(candles, start=None, stop=None, window=ANALYSIS_WINDOW, workspace=None):
+    """
+    signal_features candle start..stop-1, masing-masing dihitung dari
+    jendela analisisnya sendiri. Hasilnya bisa dievaluasi berulang kali
+    dengan evaluate_features untuk ambang yang berbeda
+
+    Returns:
+        tuple: (start, stop, dict fitur 1-D sepanjang stop - start); start
+            paling kecil window - 1, candle pertama dengan jendela penuh
+    """
+    workspace = workspace or KernelWorkspace()
+    start = max(window - 1, 0 if start is None else start)
+    stop = len(candles) if stop is None else min(stop, len(candles))
+
+    columns = {name: np.asarray(candles[name], dtype=np.float64)
+               for name in ('open', 'high', 'low', 'close', 'volume')}
+
+    blocks = []
+    for block_start in range(start, stop, BLOCK_WINDOWS):
+        block_stop = min(block_start + BLOCK_WINDOWS, stop)
+
+        # Satu baris per candle yang dianalisis: `window` candle terakhirnya
+        windows = {
+            name: np.ascontiguousarray(sliding_window_view(values[block_start - window + 1:block_stop], window))
+            for name, values in columns.items()
+        }
+        windows.update(DEFAULT_REGISTRY.evaluate(windows, SIGNAL_INDICATORS, workspace))
+        blocks.append(last_features(signal_features({name: windows[name] for name in SIGNAL_COLUMNS})))
+
+    if not blocks:
+        # Rentang kosong: fitur dengan panjang nol dari satu jendela kosong
+        empty = {name: np.empty((0, window)) for name in SIGNAL_COLUMNS}
+        return start, start, last_features(signal_features(empty))
+
+    return start, stop, {name: np.concatenate([block[name] for block in blocks]) for name in blocks[0]}
+
+
+def execution_candles(candles, index, interval_seconds):
+    """
+    Candle eksekusi sinyal di candle `index`: candle berikutnya, jika
+    tersimpan tanpa celah
+
+    Returns:
+        tuple: (resolved, open, close) per sinyal
+    """
+    timestamps = candles['timestamp']
+    execution = np.minimum(index + 1, max(len(candles) - 1, 0))
+    resolved = (index + 1 < len(candles)) & (timestamps[execution] == timestamps[index] + interval_seconds)
+    return resolved, np.asarray(candles['open'][execution]), np.asarray(candles['close'][execution])
+
+
+def run_shard(store_root, symbol, interval, start, stop, min_confidence_threshold, window=ANALYSIS_WINDOW):
+    """backtest_candles untuk satu shard (simbol, rentang indeks); dijalankan di proses pool"""
+    candles = CandleStore(store_root).read(symbol, interval)
+    return backtest_candles(candles, INTERVAL_SECONDS[interval], min_confidence_threshold,
+                            start, stop, window)
+
+
+def plan_shards(store, symbols, interval, start_timestamp=None, end_timestamp=None, shard_candles=SHARD_CANDLES):
+    """
+    Membagi riwayat setiap simbol menjadi shard (simbol, start, stop) berisi
+    paling banyak `shard_candles` candle dalam rentang waktu yang diminta
+    """
+    shards = []
+    for symbol in symbols:
+        timestamps = store.read(symbol, interval)['timestamp']
+        lo = 0 if start_timestamp is None else int(np.searchsorted(timestamps, start_timestamp, side='left'))
+        hi = len(timestamps) if end_timestamp is None else int(np.searchsorted(timestamps, end_timestamp, side='right'))
+        for shard_start in range(lo, hi, shard_candles):
+            shards.append((symbol, shard_start, min(shard_start + shard_candles, hi)))
+    return shards
+
+
+def run_backtest(store_root, symbols=None, interval='1min', start_timestamp=None, end_timestamp=None,
+                 min_confidence_threshold=75, workers=None, window=ANALYSIS_WINDOW, shard_candles=SHARD_CANDLES):
+    """
+    Backtest riwayat CandleStore, dibagi per simbol dan rentang waktu ke
+    pool proses
+
+    Args:
+        store_root (str): Direktori CandleStore
+        symbols (list): Simbol yang diuji (default: semua simbol tersimpan untuk interval ini)
+        interval (str): Interval Twelve Data (1min, 5min, ...)
+        start_timestamp, end_timestamp (int): Rentang waktu candle (epoch, opsional)
+        min_confidence_threshold (float): Confidence minimum sebuah sinyal
+        workers (int): Jumlah proses (default: jumlah CPU; 1 berarti tanpa pool)
+        window (int): Jumlah candle per analisis
+        shard_candles (int): Candle per shard
+
+    Returns:
+        BacktestReport: Sinyal dan hasil per simbol
+    """
+    store = CandleStore(store_root)
+    if symbols is None:
+        symbols = sorted(entry['symbol'] for entry in store.series() if entry['interval'] == interval)
+
+    shards = plan_shards(store, symbols, interval, start_timestamp, end_timestamp, shard_candles)
+    tasks = [(store_root, symbol, interval, start, stop, min_confidence_threshold, window)
+             for symbol, start, stop in shards]
+    logger.info(f"Backtest {len(symbols)} simbol dalam {len(shards)} shard")
+
+    results = map_shards(run_shard, tasks, workers)
+
+    signals = OrderedDict((symbol, []) for symbol in symbols)
+    for (symbol, _, _), shard_signals in zip(shards, results):
+        signals[symbol].append(shard_signals)
+    return BacktestReport(OrderedDict(
+        (symbol, np.concatenate(parts) if parts else np.empty(0, dtype=SIGNAL_DTYPE))
+        for symbol, parts in signals.items()
+    ))
+
+
+def map_shards(function, tasks, workers=None):
+    """function(*task) untuk setiap shard di pool proses; workers=1 berjalan di proses ini"""
+    if workers == 1 or not tasks:
+        return [function(*task) for task in tasks]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(function, *zip(*tasks)))
+
+
+class BacktestReport:
+    """
+    Sinyal backtest per simbol beserta ringkasannya. Win rate dihitung dari
+    sinyal yang candle eksekusinya tersedia: WIN / (WIN + LOSS)
+    """
+
+    def __init__(self, signals):
+        self.signals = signals
+
+    def all_signals(self):
+        return np.concatenate(list(self.signals.values())) if self.signals else np.empty(0, dtype=SIGNAL_DTYPE)
+
+    def by_symbol(self):
+        return [dict(key=symbol, **_summarize(signals)) for symbol, signals in self.signals.items()]
+
+    def by_pattern(self):
+        signals = self.all_signals()
+        return [
+            dict(key=CANDLE_PATTERNS[code], **_summarize(signals[signals['pattern'] == code]))
+            for code in np.unique(signals['pattern'])
+        ]
+
+    def by_direction(self):
+        signals = self.all_signals()
+        return [
+            dict(key=label, **_summarize(signals[signals['direction'] == code]))
+            for code, label in ((BUY, "BUY"), (SELL, "SELL"))
+        ]
+
+    def total(self):
+        return dict(key="TOTAL", **_summarize(self.all_signals()))
+
+    def format(self):
+        """Tabel teks ringkasan per simbol, arah dan pola"""
+        sections = [
+            ("Simbol", self.by_symbol() + [self.total()]),
+            ("Arah", self.by_direction()),
+            ("Pola candle", sorted(self.by_pattern(), key=lambda row: -row['signals'])),
+        ]
+        lines = []
+        for title, rows in sections:
+            lines.append(f"{title:<34} {'sinyal':>8} {'WIN':>7} {'LOSS':>7} {'DRAW':>6} "
+                         f"{'tanpa hasil':>11} {'win rate':>9} {'confidence':>10}")
+            for row in rows:
+                lines.append(f"{row['key']:<34} {row['signals']:>8} {row['wins']:>7} {row['losses']:>7} "
+                             f"{row['draws']:>6} {row['unresolved']:>11} {_percent(row['win_rate']):>9} "
+                             f"{_percent(row['avg_confidence']):>10}")
+            lines.append("")
+        return "\n".join(lines)
+
+
+def _summarize(signals):
+    resolved = signals[signals['resolved']]
+    wins = int(np.count_nonzero(resolved['result'] == WIN))
+    losses = int(np.count_nonzero(resolved['result'] == LOSS))
+    return {
+        'signals': len(signals),
+        'wins': wins,
+        'losses': losses,
+        'draws': int(np.count_nonzero(resolved['result'] == DRAW)),
+        'unresolved': len(signals) - len(resolved),
+        'win_rate': wins / (wins + losses) * 100 if wins + losses else None,
+        'avg_confidence': float(signals['confidence'].mean()) if len(signals) else None,
+    }
+
+
+def _percent(value):
+    return "-" if value is None else f"{value:.1f}%"
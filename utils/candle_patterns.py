@@ -0,0 +1,107 @@
+import numpy as np
+
+# Label pola candlestick; indeks tuple ini adalah kode yang dikembalikan classify_candles
+CANDLE_PATTERNS = (
+    "Unknown Pattern",
+    "Hammer Rebound AI-classified",
+    "Shooting Star Pattern",
+    "Bullish Engulfing Pattern",
+    "Bearish Engulfing Pattern",
+    "Doji Pattern (indecision)",
+    "Bullish Marubozu (strong buyers)",
+    "Bearish Marubozu (strong sellers)",
+    "Inside Bar Pattern",
+    "Three White Soldiers Pattern",
+    "Bullish Candle",
+    "Bearish Candle",
+)
+
+UNKNOWN_PATTERN = 0
+BULLISH_CANDLE = CANDLE_PATTERNS.index("Bullish Candle")
+BEARISH_CANDLE = CANDLE_PATTERNS.index("Bearish Candle")
+
+# Jumlah candle yang dibutuhkan untuk mengklasifikasi satu candle
+PATTERN_WINDOW = 3
+
+_LABELS = np.array(CANDLE_PATTERNS, dtype=object)
+
+
+def classify_candles(open_, high, low, close):
+    """
+    Mengklasifikasi pola setiap candle sekaligus, dengan urutan prioritas
+    yang sama seperti MarketAnalyzer._detect_candle_pattern: hammer,
+    shooting star, engulfing, doji, marubozu, inside bar, three white soldiers
+
+    Args:
+        open_, high, low, close: Array harga 1-D atau 2-D (simbol x waktu);
+            candle berurutan sepanjang sumbu terakhir
+
+    Returns:
+        ndarray: Kode pola (indeks CANDLE_PATTERNS) untuk setiap candle. Dua
+            candle pertama bernilai UNKNOWN_PATTERN karena riwayatnya kurang
+    """
+    open_, high, low, close = (np.asarray(values, dtype=np.float64) for values in (open_, high, low, close))
+
+    body_size = np.abs(close - open_)
+    candle_range = high - low
+    is_bullish = close > open_
+    is_bearish = ~is_bullish
+
+    # max()/min() Python atas (open, close), termasuk perilakunya terhadap NaN
+    body_top = np.where(close > open_, close, open_)
+    body_bottom = np.where(close < open_, close, open_)
+    upper_shadow = high - body_top
+    lower_shadow = body_bottom - low
+
+    small_body = body_size < 0.3 * candle_range
+    hammer = is_bullish & small_body & (upper_shadow < 0.2 * candle_range) & (lower_shadow > 0.6 * candle_range)
+    shooting_star = is_bearish & small_body & (upper_shadow > 0.6 * candle_range) & (lower_shadow < 0.2 * candle_range)
+    doji = body_size < 0.1 * candle_range
+    marubozu = body_size > 0.8 * candle_range
+
+    # Kondisi yang membandingkan dengan candle sebelumnya; candle pertama tidak punya
+    prev_open, prev_high, prev_low, prev_close = (_previous(values) for values in (open_, high, low, close))
+    prev_body_size = _previous(body_size)
+    prev_bullish = _previous(is_bullish, fill=False)
+
+    larger_body = body_size > prev_body_size
+    bullish_engulfing = (is_bullish & ~prev_bullish & larger_body
+                         & (open_ < prev_close) & (close > prev_open))
+    bearish_engulfing = (is_bearish & prev_bullish & larger_body
+                         & (open_ > prev_close) & (close < prev_open))
+    inside_bar = (high < prev_high) & (low > prev_low)
+
+    rising = (close > prev_close) & (open_ > prev_open) & is_bullish
+    three_white_soldiers = rising & _previous(rising, fill=False) & _previous(is_bullish, fill=False, shift=2)
+
+    codes = np.select(
+        [hammer, shooting_star, bullish_engulfing, bearish_engulfing, doji,
+         marubozu & is_bullish, marubozu, inside_bar, three_white_soldiers, is_bullish],
+        list(range(UNKNOWN_PATTERN + 1, BEARISH_CANDLE)),
+        default=BEARISH_CANDLE
+    ).astype(np.int8)
+    codes[..., :PATTERN_WINDOW - 1] = UNKNOWN_PATTERN
+    return codes
+
+
+def candle_pattern_labels(df):
+    """
+    Label pola candlestick untuk setiap baris DataFrame OHLC
+
+    Args:
+        df (DataFrame): DataFrame dengan kolom open, high, low, close
+
+    Returns:
+        ndarray: Label pola (str) per candle
+    """
+    codes = classify_candles(df['open'].to_numpy(), df['high'].to_numpy(),
+                             df['low'].to_numpy(), df['close'].to_numpy())
+    return _LABELS[codes]
+
+
+def _previous(values, fill=np.nan, shift=1):
+    """values digeser `shift` candle ke kanan sepanjang sumbu terakhir"""
+    shifted = np.empty_like(values)
+    shifted[..., :shift] = fill
+    shifted[..., shift:] = values[..., :-shift]
+    return shifted
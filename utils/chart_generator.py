@@ -8,9 +8,15 @@ import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 import logging
+import threading
 
 logger = logging.getLogger(__name__)
 
+# Indikator yang digambar di grafik (volume_ma opsional)
+CHART_INDICATORS = ('rsi', 'macd', 'macd_signal', 'ema50', 'bb_upper', 'bb_middle', 'bb_lower', 'volume_ma')
+
+_PYPLOT_LOCK = threading.Lock()
+
 class ChartGenerator:
     """
     Kelas untuk menghasilkan dan menyimpan grafik analisis teknikal
@@ -67,39 +73,42 @@ class ChartGenerator:
             df_plot['datetime'] = pd.to_datetime(df_plot['datetime'])
             df_plot.set_index('datetime', inplace=True)
         
-        # Buat figure dan grid untuk subplot
-        fig = plt.figure(figsize=self.fig_size, dpi=self.dpi)
+        # pyplot menyimpan state global (figure aktif, rcParams): satu grafik
+        # digambar pada satu waktu meskipun dipanggil dari beberapa thread
+        with _PYPLOT_LOCK:
+            # Buat figure dan grid untuk subplot
+            fig = plt.figure(figsize=self.fig_size, dpi=self.dpi)
         
-        # Definisikan grid untuk subplot
-        gs = fig.add_gridspec(4, 1, height_ratios=[3, 1, 1, 1])
+            # Definisikan grid untuk subplot
+            gs = fig.add_gridspec(4, 1, height_ratios=[3, 1, 1, 1])
         
-        # Plot candlestick (ax1)
-        ax1 = fig.add_subplot(gs[0])
-        self._plot_candlestick(ax1, df_plot)
+            # Plot candlestick (ax1)
+            ax1 = fig.add_subplot(gs[0])
+            self._plot_candlestick(ax1, df_plot)
         
-        # Plot volume (ax2)
-        ax2 = fig.add_subplot(gs[1], sharex=ax1)
-        self._plot_volume(ax2, df_plot)
+            # Plot volume (ax2)
+            ax2 = fig.add_subplot(gs[1], sharex=ax1)
+            self._plot_volume(ax2, df_plot)
         
-        # Plot MACD (ax3)
-        ax3 = fig.add_subplot(gs[2], sharex=ax1)
-        self._plot_macd(ax3, df_plot)
+            # Plot MACD (ax3)
+            ax3 = fig.add_subplot(gs[2], sharex=ax1)
+            self._plot_macd(ax3, df_plot)
         
-        # Plot RSI (ax4)
-        ax4 = fig.add_subplot(gs[3], sharex=ax1)
-        self._plot_rsi(ax4, df_plot)
+            # Plot RSI (ax4)
+            ax4 = fig.add_subplot(gs[3], sharex=ax1)
+            self._plot_rsi(ax4, df_plot)
         
-        # Tambahkan informasi signal
-        self._annotate_signal(ax1, signal, df_plot)
+            # Tambahkan informasi signal
+            self._annotate_signal(ax1, signal, df_plot)
         
-        # Sempurnakan tata letak
-        plt.tight_layout()
-        plt.subplots_adjust(hspace=0)
-        
-        # Simpan gambar
-        plt.savefig(save_path, bbox_inches='tight')
-        plt.close(fig)
+            # Sempurnakan tata letak
+            plt.tight_layout()
+            plt.subplots_adjust(hspace=0)
         
+            # Simpan gambar
+            plt.savefig(save_path, bbox_inches='tight')
+            plt.close(fig)
+
         logger.info(f"Chart berhasil disimpan di {save_path}")
         
         # Return path ke file
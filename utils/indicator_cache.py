@@ -0,0 +1,153 @@
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+# Parameter indikator yang dipakai calculate_indicators, bagian dari kunci cache
+INDICATOR_PARAMS = (
+    ('rsi', 14),
+    ('macd', (12, 26, 9)),
+    ('ema', 50),
+    ('bollinger_bands', (20, 2)),
+    ('atr', 14),
+    ('volume_ma', 20),
+)
+
+
+class IndicatorCache:
+    """
+    Memoization LRU di depan TechnicalIndicators.
+
+    Kuncinya (simbol, timeframe, timestamp candle terakhir, parameter, kolom
+    yang diminta). Di dalam satu candle datanya tidak berubah, jadi analisis
+    berulang pada candle yang sama cukup satu lookup dictionary. Kunci juga memuat jumlah
+    candle, candle pertama dan nilai OHLCV candle terakhir, sehingga candle
+    terakhir yang direvisi atau jendela yang berbeda tidak memakai hasil lama.
+
+    DataFrame yang dikembalikan dipakai bersama oleh semua pemanggil dan
+    tidak boleh diubah.
+    """
+
+    def __init__(self, technical_indicators, maxsize=512):
+        self.technical_indicators = technical_indicators
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def calculate_indicators(self, df, symbol, timeframe='M1', params=INDICATOR_PARAMS, columns=None):
+        """
+        calculate_indicators dengan cache
+
+        Args:
+            df (DataFrame): DataFrame dengan data OHLCV
+            symbol (str): Simbol trading
+            timeframe (str): Timeframe candle
+            params (tuple): Parameter indikator
+            columns (list): Indikator yang dibutuhkan (default: semua)
+
+        Returns:
+            DataFrame: DataFrame dengan indikator teknikal tambahan
+        """
+        key = self._key(symbol, timeframe, (params, _columns_key(columns)), df)
+        result = self._get(key)
+        if result is None:
+            result = self.technical_indicators.calculate_indicators(df, columns=columns)
+            self._put(key, result)
+        return result
+
+    def calculate_indicators_batch(self, data, timeframe='M1', params=INDICATOR_PARAMS, columns=None):
+        """
+        Indikator untuk banyak simbol; hanya simbol yang tidak ada di cache
+        yang dihitung, bersama-sama dalam satu calculate_indicators_batch
+
+        Args:
+            data (dict): simbol -> array CANDLE_DTYPE
+            timeframe (str): Timeframe candle
+            params (tuple): Parameter indikator
+            columns (list): Indikator yang dibutuhkan (default: semua)
+
+        Returns:
+            dict: simbol -> DataFrame dengan indikator teknikal
+        """
+        frames = {}
+        missing = {}
+        for symbol, candles in data.items():
+            key = self._key(symbol, timeframe, (params, _columns_key(columns)), candles)
+            frame = self._get(key)
+            if frame is None:
+                missing[symbol] = (key, candles)
+            else:
+                frames[symbol] = frame
+
+        if missing:
+            batch = self.technical_indicators.calculate_indicators_batch(
+                {symbol: candles for symbol, (_, candles) in missing.items()},
+                columns=columns
+            )
+            for symbol, (key, _) in missing.items():
+                frame = batch.frame(symbol)
+                self._put(key, frame)
+                frames[symbol] = frame
+
+        return frames
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'size': len(self.entries),
+                'maxsize': self.maxsize,
+            }
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def _get(self, key):
+        with self.lock:
+            result = self.entries.get(key)
+            if result is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return result
+
+    def _put(self, key, result):
+        with self.lock:
+            self.entries[key] = result
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    @staticmethod
+    def _key(symbol, timeframe, params, candles):
+        """Kunci dari DataFrame atau array CANDLE_DTYPE"""
+        if not len(candles):
+            return (symbol, timeframe, None, 0, None, None, params)
+
+        if isinstance(candles, pd.DataFrame):
+            first = candles.iloc[0]
+            last = candles.iloc[-1]
+        else:
+            first = candles[0]
+            last = candles[-1]
+
+        return (
+            symbol,
+            timeframe,
+            int(last['timestamp']),
+            len(candles),
+            int(first['timestamp']),
+            tuple(float(last[column]) for column in ('open', 'high', 'low', 'close', 'volume')),
+            params,
+        )
+
+
+def _columns_key(columns):
+    return None if columns is None else tuple(columns)
@@ -0,0 +1,266 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Kolom indikator yang dihasilkan, sesuai urutan di calculate_indicators
+INDICATOR_COLUMNS = (
+    'rsi', 'macd', 'macd_signal', 'macd_hist', 'ema50',
+    'bb_middle', 'bb_upper', 'bb_lower', 'atr', 'volume_ma'
+)
+
+# Panjang blok EMA maksimum; faktor (1 - alpha) ** -panjang_blok dijaga di
+# bawah e ** EMA_MAX_EXPONENT supaya jauh dari overflow
+EMA_MAX_BLOCK = 1024
+EMA_MAX_EXPONENT = 600
+
+# Mulai panjang ini, jumlah bergulir dihitung dengan `period` penjumlahan
+# irisan yang bersebelahan; di bawahnya satu reduce atas jendela lebih murah
+SLICED_SUM_MIN_LENGTH = 2048
+
+
+class KernelWorkspace:
+    """
+    Buffer kerja yang dialokasikan sekali dan dipakai ulang antar panggilan
+    kernel. Buffer hanya dialokasikan ulang jika ukuran input berubah.
+    Satu workspace tidak boleh dipakai oleh dua thread sekaligus.
+    """
+
+    def __init__(self):
+        self.buffers = {}
+        self.ema_tables = {}
+
+    def buffer(self, name, shape):
+        buffer = self.buffers.get(name)
+        if buffer is None or buffer.shape != shape:
+            buffer = np.empty(shape)
+            self.buffers[name] = buffer
+        return buffer
+
+    def ema_table(self, alpha):
+        """Faktor (1 - alpha) ** -(k + 1) dan (1 - alpha) ** (k + 1) untuk satu blok EMA"""
+        table = self.ema_tables.get(alpha)
+        if table is None:
+            block = int(min(EMA_MAX_BLOCK, EMA_MAX_EXPONENT / -np.log1p(-alpha)))
+            steps = np.arange(1, block + 1)
+            table = ((1 - alpha) ** -steps, (1 - alpha) ** steps)
+            self.ema_tables[alpha] = table
+        return table
+
+
+# Semua kernel bekerja sepanjang sumbu terakhir (waktu), untuk array 1-D
+# maupun 2-D (simbol x waktu), dan menulis hasilnya ke `out`. Input harus
+# float64; `out` tidak boleh sama dengan input.
+
+def rolling_sum(values, period, out):
+    """rolling(window=period).sum(); NaN sampai jendela pertama penuh"""
+    length = values.shape[-1]
+    out[..., :period - 1] = np.nan
+    if length < period:
+        return out
+
+    sums = out[..., period - 1:]
+    if length < SLICED_SUM_MIN_LENGTH:
+        np.add.reduce(sliding_window_view(values, period, axis=-1), axis=-1, out=sums)
+        return out
+
+    sums[...] = values[..., :length - period + 1]
+    for offset in range(1, period):
+        sums += values[..., offset:length - period + 1 + offset]
+    return out
+
+
+def rolling_mean(values, period, out):
+    """rolling(window=period).mean()"""
+    rolling_sum(values, period, out)
+    out[..., period - 1:] /= period
+    return out
+
+
+def rolling_std(values, period, out, workspace):
+    """rolling(window=period).std() dengan ddof=1"""
+    # Nilai digeser terhadap nilai terakhir supaya varians harga yang kecil
+    # tidak hilang karena pembatalan
+    shifted = workspace.buffer('std_shifted', values.shape)
+    np.subtract(values, values[..., -1:], out=shifted)
+    squares = workspace.buffer('std_squares', values.shape)
+    np.multiply(shifted, shifted, out=squares)
+
+    sums = workspace.buffer('std_sums', values.shape)
+    rolling_sum(shifted, period, sums)
+    rolling_sum(squares, period, out)
+
+    # var = (sum(x^2) - sum(x)^2 / n) / (n - 1)
+    np.multiply(sums, sums, out=sums)
+    sums /= period
+    np.subtract(out, sums, out=out)
+    np.maximum(out, 0.0, out=out)
+    out /= period - 1
+    np.sqrt(out, out=out)
+    return out
+
+
+def ema(values, period, out, workspace):
+    """
+    ewm(span=period, adjust=False).mean(), dihitung per blok candle:
+
+        y[s + j] = (1 - a) ** (j + 1) * (y[s - 1] + a * sum(x[s + k] * (1 - a) ** -(k + 1), k <= j))
+
+    sehingga rekursinya menjadi satu cumsum per blok. Baris yang diawali NaN
+    (riwayat lebih pendek dalam array 2-D) dimulai dari nilai pertamanya
+    yang bukan NaN, dan NaN di tengah data dilewati, seperti pandas
+    """
+    length = values.shape[-1]
+    if not length:
+        return out
+
+    # Satu reduce untuk memeriksa NaN; kasus tanpa NaN tidak mengalokasikan apa pun
+    if not np.isnan(np.add.reduce(values, axis=None)):
+        return _ema_blocks(values, period, out, workspace)
+
+    missing = np.isnan(values)
+    started = np.logical_or.accumulate(~missing, axis=-1)
+    if (missing & started).any():
+        return _ema_with_gaps(values, period, out, workspace)
+    return _ema_from_first_valid(values, period, out, workspace)
+
+
+def _ema_blocks(values, period, out, workspace):
+    length = values.shape[-1]
+    alpha = 2.0 / (period + 1)
+    grow, decay = workspace.ema_table(alpha)
+    block_size = min(len(grow), length - 1) or 1
+    scratch = workspace.buffer('ema_scratch', values.shape[:-1] + (block_size,))
+
+    out[..., 0] = values[..., 0]
+    start = 1
+    while start < length:
+        stop = min(start + block_size, length)
+        size = stop - start
+        block = scratch[..., :size]
+
+        np.multiply(values[..., start:stop], grow[:size], out=block)
+        np.cumsum(block, axis=-1, out=block)
+        block *= alpha
+        block += out[..., start - 1:start]
+        np.multiply(block, decay[:size], out=out[..., start:stop])
+        start = stop
+    return out
+
+
+def _ema_from_first_valid(values, period, out, workspace):
+    # NaN di awal diisi dengan nilai pertama, yang membuat EMA konstan sampai data dimulai
+    filled = workspace.buffer('ema_filled', values.shape)
+    filled[...] = values
+    starts = {}
+    for index in np.ndindex(values.shape[:-1]):
+        row = values[index]
+        start = int(np.argmax(~np.isnan(row)))
+        starts[index] = start
+        filled[index][:start] = row[start]
+
+    _ema_blocks(filled, period, out, workspace)
+    for index, start in starts.items():
+        out[index][:start] = np.nan
+    return out
+
+
+def _ema_with_gaps(values, period, out, workspace):
+    # Seperti ewm(adjust=False) pandas: posisi NaN mengulang EMA terakhir,
+    # dan bobot EMA lama tetap meluruh selama celah, jadi nilai pertama
+    # setelah celah g candle adalah
+    #     ((1 - a) ** (g + 1) * y + a * x) / ((1 - a) ** (g + 1) + a)
+    # Setiap potongan data tanpa NaN dihitung per blok dari nilai awal itu
+    alpha = 2.0 / (period + 1)
+    for index in np.ndindex(values.shape[:-1]):
+        row = values[index]
+        row_out = out[index]
+        valid = np.flatnonzero(~np.isnan(row))
+        if not len(valid):
+            row_out[:] = np.nan
+            continue
+
+        breaks = np.flatnonzero(np.diff(valid) > 1) + 1
+        starts = valid[np.r_[0, breaks]]
+        stops = valid[np.r_[breaks - 1, len(valid) - 1]] + 1
+
+        row_out[:starts[0]] = np.nan
+        previous = previous_stop = None
+        for start, stop in zip(starts, stops):
+            segment = row[start:stop].copy()
+            if previous is not None:
+                row_out[previous_stop:start] = previous
+                decay = (1 - alpha) ** (start - previous_stop + 1)
+                segment[0] = (decay * previous + alpha * segment[0]) / (decay + alpha)
+            _ema_blocks(segment, period, row_out[start:stop], workspace)
+            previous, previous_stop = row_out[stop - 1], stop
+        row_out[previous_stop:] = previous
+    return out
+
+
+def rsi(close, period, out, workspace):
+    """RSI dengan rata-rata sederhana gain dan loss, seperti calculate_rsi"""
+    if not close.shape[-1]:
+        return out
+
+    delta = workspace.buffer('rsi_delta', close.shape)
+    delta[..., 0] = np.nan
+    np.subtract(close[..., 1:], close[..., :-1], out=delta[..., 1:])
+
+    gains = workspace.buffer('rsi_gains', close.shape)
+    np.maximum(delta, 0.0, out=gains)
+    losses = workspace.buffer('rsi_losses', close.shape)
+    np.minimum(delta, 0.0, out=losses)
+    np.negative(losses, out=losses)
+
+    avg_gain = workspace.buffer('rsi_avg_gain', close.shape)
+    rolling_mean(gains, period, avg_gain)
+    rolling_mean(losses, period, out)
+
+    # rsi = 100 - 100 / (1 + avg_gain / avg_loss); x/0 = inf dan 0/0 = NaN seperti pandas
+    with np.errstate(divide='ignore', invalid='ignore'):
+        np.divide(avg_gain, out, out=out)
+        out += 1
+        np.divide(100.0, out, out=out)
+        np.subtract(100.0, out, out=out)
+    return out
+
+
+def macd(close, fast_period, slow_period, signal_period, out_macd, out_signal, out_hist, workspace):
+    ema(close, fast_period, out_macd, workspace)
+    ema_slow = workspace.buffer('macd_slow', close.shape)
+    ema(close, slow_period, ema_slow, workspace)
+    out_macd -= ema_slow
+
+    ema(out_macd, signal_period, out_signal, workspace)
+    np.subtract(out_macd, out_signal, out=out_hist)
+    return out_macd, out_signal, out_hist
+
+
+def bollinger_bands(close, period, std_dev, out_middle, out_upper, out_lower, workspace):
+    rolling_mean(close, period, out_middle)
+
+    rolling_std(close, period, out_upper, workspace)
+    out_upper *= std_dev
+    np.subtract(out_middle, out_upper, out=out_lower)
+    out_upper += out_middle
+    return out_middle, out_upper, out_lower
+
+
+def true_range(high, low, close, out, workspace):
+    """max(high - low, |high - close sebelumnya|, |low - close sebelumnya|)"""
+    np.subtract(high, low, out=out)
+
+    # Candle pertama tidak punya close sebelumnya; np.fmax melewati NaN
+    # seperti DataFrame.max(axis=1)
+    gap = workspace.buffer('true_range_gap', close.shape)
+    for prices in (high, low):
+        np.subtract(prices[..., 1:], close[..., :-1], out=gap[..., 1:])
+        np.abs(gap[..., 1:], out=gap[..., 1:])
+        np.fmax(out[..., 1:], gap[..., 1:], out=out[..., 1:])
+    return out
+
+
+def atr(high, low, close, period, out, workspace):
+    """ATR: rata-rata sederhana true range"""
+    tr = workspace.buffer('atr_true_range', close.shape)
+    true_range(high, low, close, tr, workspace)
+    return rolling_mean(tr, period, out)
@@ -0,0 +1,167 @@
+import numpy as np
+
+from utils import indicator_kernels
+from utils.indicator_kernels import KernelWorkspace
+
+# Kolom harga yang menjadi input graf indikator
+SOURCE_COLUMNS = ('open', 'high', 'low', 'close', 'volume')
+
+
+class Indicator:
+    """
+    Satu node di graf indikator: nama output, nama input (kolom harga atau
+    indikator lain), parameter, dan fungsi compute(out, workspace, *inputs, **params)
+    yang menulis hasilnya ke `out`
+    """
+
+    def __init__(self, name, compute, inputs, params=None):
+        self.name = name
+        self.compute = compute
+        self.inputs = tuple(inputs)
+        self.params = dict(params or {})
+
+    def __repr__(self):
+        return f"Indicator({self.name!r}, inputs={self.inputs}, params={self.params})"
+
+
+class LazyIndicators:
+    """
+    Indikator yang dihitung saat diminta. Setiap node dihitung paling banyak
+    sekali, jadi hasil antara seperti EMA close dipakai bersama oleh semua
+    indikator yang membutuhkannya
+    """
+
+    def __init__(self, registry, columns, workspace=None):
+        self.registry = registry
+        self.values = dict(columns)
+        self.workspace = workspace or KernelWorkspace()
+        self.shape = np.shape(columns['close'])
+
+    def __getitem__(self, name):
+        values = self.values.get(name)
+        if values is None:
+            indicator = self.registry.get(name)
+            inputs = [self[input_name] for input_name in indicator.inputs]
+            # Output baru per node: hasilnya disimpan IndicatorCache dan frame
+            # pemanggil, jadi tidak boleh ditimpa panggilan berikutnya
+            values = np.empty(self.shape)
+            indicator.compute(values, self.workspace, *inputs, **indicator.params)
+            self.values[name] = values
+        return values
+
+    def __contains__(self, name):
+        return name in self.values or name in self.registry
+
+    def evaluate(self, names):
+        return {name: self[name] for name in names}
+
+
+class IndicatorRegistry:
+    """
+    Daftar indikator yang mendeklarasikan input dan parameternya. Konsumen
+    meminta output berdasarkan nama, dan hanya graf dependensi output itu
+    yang dievaluasi
+    """
+
+    def __init__(self):
+        self.indicators = {}
+
+    def register(self, name, compute, inputs, params=None):
+        """Mendaftarkan indikator; semua input harus kolom harga atau indikator yang sudah terdaftar"""
+        for input_name in inputs:
+            if input_name not in SOURCE_COLUMNS and input_name not in self.indicators:
+                raise ValueError(f"Input {input_name} untuk indikator {name} belum terdaftar")
+        self.indicators[name] = Indicator(name, compute, inputs, params)
+        return self.indicators[name]
+
+    def get(self, name):
+        indicator = self.indicators.get(name)
+        if indicator is None:
+            raise KeyError(f"Indikator tidak dikenal: {name}")
+        return indicator
+
+    def __contains__(self, name):
+        return name in self.indicators
+
+    def dependencies(self, names):
+        """Semua node yang dibutuhkan untuk `names`, dalam urutan evaluasi"""
+        order = []
+
+        def visit(name):
+            if name in SOURCE_COLUMNS or name in order:
+                return
+            for input_name in self.get(name).inputs:
+                visit(input_name)
+            order.append(name)
+
+        for name in names:
+            visit(name)
+        return order
+
+    def lazy(self, columns, workspace=None):
+        """LazyIndicators di atas kolom harga 1-D atau 2-D (simbol x waktu)"""
+        return LazyIndicators(self, columns, workspace)
+
+    def evaluate(self, columns, names, workspace=None):
+        """Menghitung hanya `names` (dan dependensinya); mengembalikan dict nama -> array"""
+        return self.lazy(columns, workspace).evaluate(names)
+
+
+def _ema(out, workspace, values, period):
+    indicator_kernels.ema(values, period, out, workspace)
+
+
+def _sma(out, workspace, values, period):
+    indicator_kernels.rolling_mean(values, period, out)
+
+
+def _std(out, workspace, values, period):
+    indicator_kernels.rolling_std(values, period, out, workspace)
+
+
+def _rsi(out, workspace, close, period):
+    indicator_kernels.rsi(close, period, out, workspace)
+
+
+def _true_range(out, workspace, high, low, close):
+    indicator_kernels.true_range(high, low, close, out, workspace)
+
+
+def _difference(out, workspace, first, second):
+    np.subtract(first, second, out=out)
+
+
+def _band(out, workspace, middle, deviation, width):
+    np.multiply(deviation, width, out=out)
+    out += middle
+
+
+def default_registry():
+    """Registry berisi indikator calculate_indicators beserta hasil antaranya"""
+    registry = IndicatorRegistry()
+
+    registry.register('rsi', _rsi, ('close',), {'period': 14})
+
+    # MACD berbagi EMA close dengan indikator lain yang memakai periode sama
+    registry.register('ema12', _ema, ('close',), {'period': 12})
+    registry.register('ema26', _ema, ('close',), {'period': 26})
+    registry.register('macd', _difference, ('ema12', 'ema26'))
+    registry.register('macd_signal', _ema, ('macd',), {'period': 9})
+    registry.register('macd_hist', _difference, ('macd', 'macd_signal'))
+
+    registry.register('ema50', _ema, ('close',), {'period': 50})
+
+    registry.register('bb_middle', _sma, ('close',), {'period': 20})
+    registry.register('bb_std', _std, ('close',), {'period': 20})
+    registry.register('bb_upper', _band, ('bb_middle', 'bb_std'), {'width': 2})
+    registry.register('bb_lower', _band, ('bb_middle', 'bb_std'), {'width': -2})
+
+    registry.register('true_range', _true_range, ('high', 'low', 'close'))
+    registry.register('atr', _sma, ('true_range',), {'period': 14})
+
+    registry.register('volume_ma', _sma, ('volume',), {'period': 20})
+
+    return registry
+
+
+DEFAULT_REGISTRY = default_registry()
@@ -0,0 +1,194 @@
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import case, or_, update
+from sqlalchemy.exc import IntegrityError
+
+logger = logging.getLogger(__name__)
+
+# Lama lease berlaku tanpa diperpanjang (detik); standby mengambil alih paling lambat setelah ini
+LEASE_TTL = float(os.environ.get('LEADER_LEASE_TTL', 10))
+
+# Selang perpanjangan lease oleh leader dan percobaan oleh standby (detik)
+HEARTBEAT_INTERVAL = float(os.environ.get('LEADER_HEARTBEAT_INTERVAL', 2))
+
+
+def utc_now():
+    """Waktu UTC tanpa tzinfo, seperti kolom DateTime LeaderLease yang sudah tersimpan"""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class LeaderElection:
+    """
+    Pemilihan leader lewat baris LeaderLease di database, supaya dari
+    beberapa proses (worker gunicorn) hanya satu yang menjalankan peran
+    tertentu, misalnya analyzer dan listener Telegram.
+
+    Setiap proses mencoba mengambil atau memperpanjang lease setiap
+    HEARTBEAT_INTERVAL detik dengan satu UPDATE bersyarat: berhasil jika
+    lease miliknya sendiri atau sudah kedaluwarsa. Leader yang tidak bisa
+    memperpanjang lease (database tidak terjangkau, proses macet) berhenti
+    sendiri sebelum lease-nya habis, dan standby mengambil alih paling
+    lambat LEASE_TTL + HEARTBEAT_INTERVAL detik setelah leader mati. Waktu
+    lease memakai jam UTC proses, jadi beberapa host harus sinkron (NTP).
+    """
+
+    def __init__(self, app, db, name, on_elected=None, on_demoted=None, on_renewed=None,
+                 ttl=LEASE_TTL, heartbeat_interval=HEARTBEAT_INTERVAL, lease_model=None):
+        """
+        Args:
+            app (Flask): Aplikasi untuk app context database
+            db (SQLAlchemy): Objek database
+            name (str): Nama peran yang dipilihkan leader-nya
+            on_elected (callable): Dipanggil saat proses ini menjadi leader
+            on_demoted (callable): Dipanggil saat proses ini berhenti menjadi leader
+            on_renewed (callable): Dipanggil setiap heartbeat selama proses ini
+                leader, misalnya untuk menerapkan perubahan dari proses lain
+            ttl (float): Lama lease berlaku tanpa diperpanjang (detik)
+            heartbeat_interval (float): Selang perpanjangan lease (detik)
+            lease_model: Model baris lease (default: models.LeaderLease)
+        """
+        if heartbeat_interval >= ttl:
+            raise ValueError("Heartbeat interval harus lebih pendek dari TTL lease")
+
+        if lease_model is None:
+            from models import LeaderLease as lease_model
+
+        self.app = app
+        self.db = db
+        self.lease_model = lease_model
+        self.name = name
+        self.on_elected = on_elected
+        self.on_demoted = on_demoted
+        self.on_renewed = on_renewed
+        self.ttl = ttl
+        self.heartbeat_interval = heartbeat_interval
+        self.identity = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+        self.is_leader = False
+        # Batas lease menurut jam monotonic proses ini, dihitung dari sebelum UPDATE
+        self.valid_until = 0.0
+        self.stopped = threading.Event()
+        self.thread = None
+
+    def start(self):
+        """Mulai thread heartbeat; aman dipanggil berulang kali"""
+        if self.thread and self.thread.is_alive():
+            return
+        self.stopped.clear()
+        self.thread = threading.Thread(target=self._run, name=f"leader-{self.name}", daemon=True)
+        self.thread.start()
+        logger.info(f"Pemilihan leader '{self.name}' dimulai sebagai {self.identity}")
+
+    def stop(self):
+        """Hentikan heartbeat dan lepaskan lease agar standby bisa langsung mengambil alih"""
+        self.stopped.set()
+        if self.thread and self.thread.is_alive():
+            self.thread.join(timeout=self.heartbeat_interval + 5)
+        self._set_leader(False)
+        try:
+            self.release()
+        except Exception as e:
+            logger.error(f"Error saat melepas lease '{self.name}': {str(e)}")
+
+    def try_acquire(self):
+        """
+        Mengambil atau memperpanjang lease
+
+        Returns:
+            bool: True jika proses ini memegang lease sampai TTL berikutnya
+        """
+        LeaderLease = self.lease_model
+
+        started = time.monotonic()
+        now = utc_now()
+        expires_at = now + timedelta(seconds=self.ttl)
+
+        with self.app.app_context():
+            session = self.db.session
+            result = session.execute(
+                update(LeaderLease)
+                .where(LeaderLease.name == self.name,
+                       or_(LeaderLease.holder == self.identity, LeaderLease.expires_at < now))
+                .values(
+                    holder=self.identity,
+                    expires_at=expires_at,
+                    heartbeat_at=now,
+                    acquired_at=case((LeaderLease.holder == self.identity, LeaderLease.acquired_at), else_=now)
+                )
+                .execution_options(synchronize_session=False)
+            )
+            acquired = result.rowcount == 1
+            session.commit()
+
+            if not acquired and session.get(LeaderLease, self.name) is None:
+                # Belum ada baris lease: proses yang pertama menyisipkan menjadi leader
+                session.add(LeaderLease(name=self.name, holder=self.identity, expires_at=expires_at,
+                                        heartbeat_at=now, acquired_at=now))
+                try:
+                    session.commit()
+                    acquired = True
+                except IntegrityError:
+                    session.rollback()
+
+        if acquired:
+            self.valid_until = started + self.ttl
+        return acquired
+
+    def release(self):
+        """Membuat lease milik proses ini langsung kedaluwarsa"""
+        LeaderLease = self.lease_model
+
+        with self.app.app_context():
+            self.db.session.execute(
+                update(LeaderLease)
+                .where(LeaderLease.name == self.name, LeaderLease.holder == self.identity)
+                .values(expires_at=utc_now())
+                .execution_options(synchronize_session=False)
+            )
+            self.db.session.commit()
+
+    def _run(self):
+        while not self.stopped.is_set():
+            try:
+                leader = self.try_acquire()
+            except Exception as e:
+                logger.error(f"Error saat memperpanjang lease '{self.name}': {str(e)}")
+                # Tetap leader selama lease terakhir masih berlaku
+                leader = self.is_leader and time.monotonic() < self.valid_until
+
+            self._set_leader(leader)
+            if self.is_leader and self.on_renewed:
+                self._run_callback(self.on_renewed)
+
+            # Bangun lebih awal jika lease akan habis sebelum heartbeat berikutnya
+            timeout = self.heartbeat_interval
+            if self.is_leader:
+                timeout = max(0.0, min(timeout, self.valid_until - time.monotonic()))
+            self.stopped.wait(timeout)
+
+    def _set_leader(self, leader):
+        if leader == self.is_leader:
+            return
+
+        self.is_leader = leader
+        if leader:
+            logger.info(f"{self.identity} menjadi leader '{self.name}'")
+            callback = self.on_elected
+        else:
+            logger.warning(f"{self.identity} bukan lagi leader '{self.name}'")
+            callback = self.on_demoted
+
+        if callback:
+            self._run_callback(callback)
+
+    def _run_callback(self, callback):
+        try:
+            callback()
+        except Exception as e:
+            logger.error(f"Error saat menjalankan callback leader '{self.name}': {str(e)}")
@@ -6,14 +6,56 @@ import numpy as np
 from datetime import datetime, timedelta
 import asyncio
 import os
+from concurrent.futures.process import BrokenProcessPool
 
 from utils.technical_indicators import TechnicalIndicators
-from utils.chart_generator import ChartGenerator
+from utils.indicator_cache import IndicatorCache
+from utils.chart_generator import ChartGenerator, CHART_INDICATORS
+from utils.candle_patterns import PATTERN_WINDOW, candle_pattern_labels
+from utils.signal_evaluator import SIGNAL_INDICATORS, SIGNAL_PARAMS, trade_result
 from utils.ml_predictor import MLPredictor
+from utils.symbol_shards import SymbolShards
+from utils.signal_pipeline import SignalPipeline
 from api.pocket_option import PocketOptionAPI
+from api.candle_store import CandleStore
+from api.request_scheduler import PRIORITY_RESULT
 
 logger = logging.getLogger(__name__)
 
+# Indikator yang dihitung tiap siklus analisis: sinyal dan grafik
+ANALYSIS_INDICATORS = tuple(dict.fromkeys(SIGNAL_INDICATORS + CHART_INDICATORS))
+
+# Panjang candle yang dianalisis (M1) dalam detik
+CANDLE_SECONDS = 60
+
+# Jumlah proses worker untuk indikator, deteksi dan chart; 1 berarti semuanya di proses ini
+ANALYSIS_PROCESSES = int(os.environ.get('ANALYSIS_PROCESSES', 1))
+
+# Tahap pipeline sinyal: (nama, jumlah thread, panjang antrean). Chart
+# digambar satu per satu di proses ini (pyplot), jadi render cukup satu thread
+PIPELINE_STAGES = (
+    ('detect', int(os.environ.get('PIPELINE_DETECT_WORKERS', 8)), 64),
+    ('persist', int(os.environ.get('PIPELINE_PERSIST_WORKERS', 2)), 64),
+    ('render', int(os.environ.get('PIPELINE_RENDER_WORKERS', 1)), 32),
+    ('deliver', int(os.environ.get('PIPELINE_DELIVER_WORKERS', 4)), 64),
+)
+
+
+# Pencarian candle eksekusi yang gagal sebelum hasil sinyal dinyatakan EXPIRED
+RESULT_LOOKUP_ATTEMPTS = 3
+
+# Umur sinyal tanpa candle eksekusi yang langsung dinyatakan EXPIRED
+RESULT_MAX_AGE = timedelta(hours=1)
+
+# Hasil sinyal yang candle eksekusinya tidak bisa didapat
+RESULT_EXPIRED = "EXPIRED"
+
+
+def _next_boundary(timestamp, seconds):
+    """Batas candle pertama setelah epoch `timestamp`"""
+    return (int(timestamp) // seconds + 1) * seconds
+
+
 class MarketAnalyzer:
     """
     Kelas utama untuk menganalisis pasar OTC dan menghasilkan sinyal trading.
@@ -25,11 +67,39 @@ class MarketAnalyzer:
         """
         self.running = False
         self.analysis_thread = None
+        self.pipeline = None
+        self.shards = None
+        # Jumlah pencarian candle eksekusi yang gagal per id sinyal
+        self.result_misses = {}
         self.technical_indicators = TechnicalIndicators()
+        self.indicator_cache = IndicatorCache(self.technical_indicators)
         self.chart_generator = ChartGenerator()
         self.ml_predictor = MLPredictor()
-        self.pocket_option_api = PocketOptionAPI()
+        replay_path = os.environ.get('MARKET_DATA_REPLAY_PATH')
+        if replay_path:
+            # Putar ulang rekaman provider; kecepatan 0 = secepat mungkin
+            replay_speed = float(os.environ.get('MARKET_DATA_REPLAY_SPEED', 1)) or None
+            self.pocket_option_api = PocketOptionAPI.from_recording(replay_path, speed=replay_speed)
+        else:
+            self.pocket_option_api = PocketOptionAPI(
+                candle_store=CandleStore(os.environ.get('CANDLE_STORE_PATH', os.path.join('instance', 'candles')))
+            )
+        # Semua pembacaan waktu mengikuti jam API (jam replay saat memutar ulang rekaman)
+        self.clock = self.pocket_option_api.clock
         self.db = None  # Akan diset saat start_analysis
+    
+    @classmethod
+    def detector(cls, clock):
+        """
+        MarketAnalyzer yang hanya dipakai untuk _detect_signal: tanpa
+        provider, database maupun thread analisis
+        
+        Args:
+            clock: Jam untuk waktu eksekusi sinyal (SystemClock, ReplayClock)
+        """
+        analyzer = cls.__new__(cls)
+        analyzer.clock = clock
+        return analyzer
         
     def start_analysis(self, settings):
         """
@@ -46,6 +116,11 @@ class MarketAnalyzer:
         from app import db
         self.db = db
         
+        # Leader sebelumnya (proses lain) mungkin sudah menambah candle ke store;
+        # tanpa index terbaru, append akan menimpa data dan index milik proses itu
+        if self.pocket_option_api.candle_store is not None:
+            self.pocket_option_api.candle_store.reload()
+        
         # Set API key untuk Pocket Option
         self.pocket_option_api.set_api_key(settings.pocket_option_api_key)
         
@@ -57,10 +132,16 @@ class MarketAnalyzer:
         
         logger.info("Analisis pasar dimulai")
         
-    def stop_analysis(self):
+    def stop_analysis(self, discard_pending=False):
         """
         Menghentikan analisis pasar
+        
+        Args:
+            discard_pending (bool): Buang sinyal yang masih antre di pipeline
+                alih-alih mengirimnya, misalnya saat proses ini bukan lagi leader
         """
+        if discard_pending and self.pipeline:
+            self.pipeline.discard()
         self.running = False
         if self.analysis_thread and self.analysis_thread.is_alive():
             # Tunggu thread berhenti (max 5 detik)
@@ -70,7 +151,11 @@ class MarketAnalyzer:
         
     def _analyze_markets(self, settings):
         """
-        Metode untuk menganalisis pasar secara terus-menerus
+        Loop analisis yang mengikuti batas candle M1. Analisis berat (ambil
+        data, indikator, deteksi sinyal semua simbol) berjalan sekali tepat
+        setelah candle ditutup. Pada T-signal_time_before_candle hanya simbol
+        kandidat yang dikonfirmasi ulang dan dikirim, lalu loop tidur sampai
+        batas candle berikutnya
         
         Args:
             settings (Setting): Pengaturan untuk analisis
@@ -78,137 +163,394 @@ class MarketAnalyzer:
         # Import Flask app untuk menggunakan app context
         from app import app
         
-        # Import models di sini untuk menghindari circular import
-        from models import Signal
-        
         # Dapatkan daftar simbol yang akan dianalisis
         symbols = settings.get_symbols_list()
         
         logger.info(f"Mulai menganalisis {len(symbols)} simbol: {', '.join(symbols)}")
         
-        # Persiapkan struktur data untuk menyimpan waktu sinyal terakhir
-        last_signal_time = {}
-        for symbol in symbols:
-            last_signal_time[symbol] = datetime.now() - timedelta(hours=1)
+        # Open candle eksekusi (epoch) dari sinyal terakhir per simbol
+        last_signal_candle = dict.fromkeys(symbols, 0)
+        
+        # Konfirmasi, penyimpanan, chart dan pengiriman sinyal berjalan di tahap terpisah
+        stage_functions = {
+            'detect': self._detect_stage,
+            'persist': self._persist_stage,
+            'render': self._render_stage,
+            'deliver': self._deliver_stage,
+        }
+        self.pipeline = SignalPipeline(
+            [(name, stage_functions[name], workers, maxsize) for name, workers, maxsize in PIPELINE_STAGES],
+            self.clock,
+            on_missed=self._discard_signal
+        )
+        self.pipeline.start()
+        
+        # Indikator, deteksi dan chart dibagi ke beberapa proses jika diminta
+        if ANALYSIS_PROCESSES > 1:
+            self.shards = SymbolShards(symbols, ANALYSIS_PROCESSES)
+            logger.info(f"Simbol dibagi ke {ANALYSIS_PROCESSES} proses worker")
         
         # Loop utama analisis
         while self.running:
             try:
+                # Batas candle yang sedang berjalan dan waktu konfirmasi sebelum candle berikutnya
+                candle_close = _next_boundary(self.clock.time(), CANDLE_SECONDS)
+                confirm_at = candle_close - settings.signal_time_before_candle
+                
                 # Gunakan app context untuk operasi database
                 with app.app_context():
-                    # Periksa waktu saat ini
-                    current_time = datetime.now()
-                    current_minute = current_time.minute
-                    current_second = current_time.second
-                    
-                    # Pemeriksaan waktu untuk mengirim sinyal
-                    time_to_send_signal = current_second >= (60 - settings.signal_time_before_candle)
-                    
-                    # Analisis setiap simbol
-                    for symbol in symbols:
-                        try:
-                            # Hindari mengirim sinyal terlalu sering untuk simbol yang sama
-                            if (current_time - last_signal_time[symbol]).total_seconds() < 60:
-                                continue
-                                
-                            # Dapatkan data historis dari Pocket Option - Selalu gunakan M1 (paksa)
-                            historical_data = self.pocket_option_api.get_historical_data(
-                                symbol,
-                                "M1",  # Paksa timeframe ke M1 sesuai permintaan
-                                limit=100  # Ambil 100 candle terakhir
-                            )
-                            
-                            if not historical_data or len(historical_data) < 50:
-                                logger.warning(f"Data historis tidak cukup untuk {symbol}")
-                                continue
-                                
-                            # Konversi ke DataFrame pandas
-                            df = pd.DataFrame(historical_data)
-                            
-                            # Hitung indikator teknikal
-                            df = self.technical_indicators.calculate_indicators(df)
-                            
-                            # Analisis pasar dan deteksi sinyal
-                            signal_data = self._detect_signal(df, symbol, settings)
-                            
-                            # Jika sinyal terdeteksi dan waktunya tepat untuk mengirim
-                            if signal_data and time_to_send_signal:
-                                # Perbarui waktu sinyal terakhir
-                                last_signal_time[symbol] = current_time
-                                
-                                # Buat objek sinyal - selalu gunakan timeframe M1
-                                signal = Signal(
-                                    symbol=symbol,
-                                    timeframe="M1",  # Paksa timeframe ke M1 sesuai permintaan
-                                    direction=signal_data['direction'],
-                                    executed_at=signal_data['executed_at'],
-                                    sent_at=current_time,
-                                    
-                                    # Market snapshot
-                                    volatility=signal_data['volatility'],
-                                    strength_by_volume=signal_data['strength_by_volume'],
-                                    price_pressure=signal_data['price_pressure'],
-                                    microtrend_structure=signal_data['microtrend_structure'],
-                                    
-                                    # Technical analysis
-                                    rsi=signal_data['rsi'],
-                                    rsi_analysis=signal_data['rsi_analysis'],
-                                    macd=signal_data['macd'],
-                                    ema50=signal_data['ema50'],
-                                    bollinger_bands=signal_data['bollinger_bands'],
-                                    volume_analysis=signal_data['volume_analysis'],
-                                    candle_pattern=signal_data['candle_pattern'],
-                                    
-                                    # AI data
-                                    confidence=signal_data['confidence'],
-                                    win_rate_prediction=signal_data['win_rate_prediction'],
-                                    risk_level=signal_data['risk_level'],
-                                    
-                                    # Chart data dibuat nanti
-                                    chart_url=''
-                                )
-                                
-                                # Simpan signal ke database
-                                self.db.session.add(signal)
-                                self.db.session.commit()
-                                
-                                # Buat chart untuk sinyal
-                                chart_path = self.chart_generator.generate_chart(
-                                    df,
-                                    signal,
-                                    save_dir=os.path.join('static', 'charts'),
-                                    filename=f"signal_{signal.id}_{symbol.replace('/', '_')}.png"
-                                )
-                                
-                                # Update chart_url dalam database
-                                signal.chart_url = chart_path
-                                self.db.session.commit()
-                                
-                                # Kirim sinyal ke Telegram
-                                from utils.telegram_bot import TelegramBot
-                                telegram_bot = TelegramBot(settings.telegram_token)
-                                telegram_bot.send_chart_with_signal(
-                                    settings.telegram_chat_id,
-                                    signal,
-                                    chart_path
-                                )
-                                
-                                logger.info(f"Sinyal {signal.direction} untuk {symbol} berhasil dikirim")
-                                
-                        except Exception as e:
-                            logger.error(f"Error saat menganalisis {symbol}: {str(e)}")
+                    candidates = self._find_signal_candidates(symbols, settings)
                     
                     # Periksa hasil dari sinyal yang sudah dikirim
                     self._check_signal_results()
                 
-                # Tidur selama 1 detik sebelum iterasi berikutnya
-                time.sleep(1)
+                if candidates:
+                    lateness = self.clock.time() - confirm_at
+                    if lateness > 0:
+                        logger.warning(f"Analisis selesai {lateness:.2f} detik setelah waktu kirim, "
+                                       f"{len(candidates)} kandidat sinyal dilewati")
+                    else:
+                        self._sleep_until(confirm_at)
+                        if not self.running:
+                            break
+                        with app.app_context():
+                            self._confirm_and_send(candidates, settings, last_signal_candle, candle_close)
+                
+                # Tidur sampai candle ditutup, lalu analisis candle berikutnya
+                self._sleep_until(candle_close)
                 
             except Exception as e:
                 logger.error(f"Error dalam loop analisis utama: {str(e)}")
-                time.sleep(5)  # Tunggu lebih lama jika terjadi error
-                
+                self.clock.sleep(5)  # Tunggu lebih lama jika terjadi error
+        
+        self.pipeline.stop()
+        if self.shards:
+            self.shards.close()
+            self.shards = None
         logger.info("Loop analisis pasar berhenti")
+    
+    def _find_signal_candidates(self, symbols, settings):
+        """
+        Analisis berat satu candle: ambil data historis dan hitung indikator
+        semua simbol, lalu deteksi sinyal
+        
+        Args:
+            symbols (list): Simbol yang dianalisis
+            settings (Setting): Pengaturan untuk analisis
+            
+        Returns:
+            list: Simbol yang punya sinyal dan perlu dikonfirmasi sebelum dikirim
+        """
+        if self.shards:
+            try:
+                written = self.shards.write(self._fetch_candles(symbols))
+                for symbol in set(symbols) - set(written):
+                    logger.warning(f"Data historis tidak cukup untuk {symbol}")
+                return self.shards.detect(written, settings.min_confidence_threshold, self.clock.time())
+            except BrokenProcessPool as e:
+                # Worker mati (misalnya kehabisan memori): buat ulang, candle ini dianalisis di proses ini
+                logger.error(f"Proses worker analisis berhenti: {str(e)}")
+                self._restart_shards(symbols)
+        
+        indicator_frames = self._indicator_frames(symbols)
+        
+        candidates = []
+        for symbol in symbols:
+            try:
+                if symbol not in indicator_frames:
+                    logger.warning(f"Data historis tidak cukup untuk {symbol}")
+                    continue
+                
+                if self._detect_signal(indicator_frames[symbol], symbol, settings):
+                    candidates.append(symbol)
+                    
+            except Exception as e:
+                logger.error(f"Error saat menganalisis {symbol}: {str(e)}")
+        
+        return candidates
+    
+    def _restart_shards(self, symbols):
+        """
+        Mengganti proses worker yang rusak. Jika gagal, analisis berjalan di
+        proses ini seterusnya
+        
+        Args:
+            symbols (list): Simbol yang dibagi ke proses worker
+        """
+        shards, self.shards = self.shards, None
+        try:
+            shards.close()
+        except Exception as e:
+            logger.error(f"Error saat menutup proses worker analisis: {str(e)}")
+        
+        try:
+            self.shards = SymbolShards(symbols, ANALYSIS_PROCESSES)
+            logger.info(f"Proses worker analisis dibuat ulang ({ANALYSIS_PROCESSES} proses)")
+        except Exception as e:
+            logger.error(f"Gagal membuat ulang proses worker, analisis berjalan di proses ini: {str(e)}")
+    
+    def _confirm_and_send(self, candidates, settings, last_signal_candle, deadline):
+        """
+        Konfirmasi akhir pada T-signal_time_before_candle: candle kandidat
+        yang sedang terbentuk diambil ulang dari provider (jika kreditnya
+        tidak dibutuhkan analisis candle berikutnya), lalu setiap simbol
+        masuk pipeline sinyal (detect, persist, render, deliver) dan dideteksi
+        ulang dengan data itu. Sinyal yang belum terkirim saat candle dibuka
+        dibuang, bukan dikirim terlambat
+        
+        Args:
+            candidates (list): Simbol hasil _find_signal_candidates
+            settings (Setting): Pengaturan untuk analisis
+            last_signal_candle (dict): Open candle eksekusi sinyal terakhir per simbol
+            deadline (float): Waktu open candle eksekusi (epoch)
+        """
+        current_time = self.clock.now()
+        
+        # Paling banyak satu sinyal per candle untuk simbol yang sama. Dibandingkan
+        # per candle, bukan dengan jam saat bangun, supaya jitter tidur tidak
+        # membuat jarak dua konfirmasi berturut-turut kurang dari satu candle
+        candidates = [
+            symbol for symbol in candidates
+            if last_signal_candle[symbol] <= deadline - CANDLE_SECONDS
+        ]
+        
+        # Candle yang sedang terbentuk hanya diambil ulang jika kredit provider
+        # untuk analisis berat di batas candle berikutnya tetap cukup; jika
+        # tidak, konfirmasi memakai candle dari cache
+        refresh = self.pocket_option_api.can_refresh(
+            candidates, reserve=len(settings.get_symbols_list()), within=deadline - self.clock.time()
+        )
+        if candidates and not refresh:
+            logger.info("Kredit provider disimpan untuk analisis candle berikutnya, konfirmasi memakai data cache")
+        
+        if self.shards:
+            # Indikator dihitung di proses worker dari buffer bersama
+            indicator_frames = dict.fromkeys(self.shards.write(self._fetch_candles(candidates, refresh=refresh)))
+        else:
+            indicator_frames = self._indicator_frames(candidates, refresh=refresh)
+        
+        submitted = 0
+        for symbol in candidates:
+            if symbol not in indicator_frames:
+                continue
+            submitted += self.pipeline.submit({
+                'symbol': symbol,
+                'df': indicator_frames[symbol],
+                'settings': settings,
+                'current_time': current_time,
+                'deadline': deadline,
+                'last_signal_candle': last_signal_candle,
+            })
+        
+        logger.info(f"{submitted} kandidat sinyal masuk pipeline, antrean: " + ", ".join(
+            f"{name} {stats['queue']}" for name, stats in self.pipeline.stats().items()
+        ))
+    
+    def _detect_stage(self, job):
+        """
+        Tahap detect: deteksi ulang sinyal kandidat (di proses worker beserta
+        chart-nya jika simbol dibagi ke beberapa proses)
+        
+        Args:
+            job (dict): symbol, df (None jika memakai proses worker), settings,
+                current_time, deadline, last_signal_candle
+            
+        Returns:
+            dict: Job dengan signal_data dan chart_path, None jika tidak terkonfirmasi
+        """
+        symbol = job['symbol']
+        if self.shards:
+            signal_data, chart_path = self.shards.confirm(
+                symbol, job['settings'].min_confidence_threshold, job['current_time'].timestamp()
+            )
+        else:
+            signal_data = self._detect_signal(job['df'], symbol, job['settings'])
+            chart_path = None
+        
+        if not signal_data:
+            logger.info(f"Sinyal {symbol} tidak terkonfirmasi")
+            return None
+        
+        # Catat candle eksekusi sinyal terakhir
+        job['last_signal_candle'][symbol] = job['deadline']
+        job.update(signal_data=signal_data, chart_path=chart_path)
+        return job
+    
+    def _persist_stage(self, job):
+        """Tahap persist: menyimpan sinyal ke database"""
+        # Import di sini untuk menghindari circular import
+        from app import app
+        from models import Signal
+        
+        signal_data = job['signal_data']
+        with app.app_context():
+            # Buat objek sinyal - selalu gunakan timeframe M1
+            signal = Signal(
+                symbol=job['symbol'],
+                timeframe="M1",  # Paksa timeframe ke M1 sesuai permintaan
+                direction=signal_data['direction'],
+                executed_at=signal_data['executed_at'],
+                sent_at=job['current_time'],
+                
+                # Market snapshot
+                volatility=signal_data['volatility'],
+                strength_by_volume=signal_data['strength_by_volume'],
+                price_pressure=signal_data['price_pressure'],
+                microtrend_structure=signal_data['microtrend_structure'],
+                
+                # Technical analysis
+                rsi=signal_data['rsi'],
+                rsi_analysis=signal_data['rsi_analysis'],
+                macd=signal_data['macd'],
+                ema50=signal_data['ema50'],
+                bollinger_bands=signal_data['bollinger_bands'],
+                volume_analysis=signal_data['volume_analysis'],
+                candle_pattern=signal_data['candle_pattern'],
+                
+                # AI data
+                confidence=signal_data['confidence'],
+                win_rate_prediction=signal_data['win_rate_prediction'],
+                risk_level=signal_data['risk_level'],
+                
+                # Chart data dibuat di tahap render
+                chart_url=''
+            )
+            
+            # Simpan signal ke database
+            self.db.session.add(signal)
+            self.db.session.commit()
+            job['signal_id'] = signal.id
+        return job
+    
+    def _render_stage(self, job):
+        """Tahap render: membuat chart sinyal (kecuali sudah digambar proses worker) dan menyimpan path-nya"""
+        from app import app
+        from models import Signal
+        
+        symbol = job['symbol']
+        with app.app_context():
+            signal = self.db.session.get(Signal, job['signal_id'])
+            
+            # Buat chart untuk sinyal, kecuali sudah digambar proses worker
+            if job['chart_path'] is None:
+                job['chart_path'] = self.chart_generator.generate_chart(
+                    job['df'],
+                    signal,
+                    save_dir=os.path.join('static', 'charts'),
+                    filename=f"signal_{signal.id}_{symbol.replace('/', '_')}.png"
+                )
+            
+            # Update chart_url dalam database
+            signal.chart_url = job['chart_path']
+            self.db.session.commit()
+        return job
+    
+    def _deliver_stage(self, job):
+        """Tahap deliver: mengirim sinyal dan chart ke Telegram"""
+        from app import app
+        from models import Signal
+        from utils.telegram_bot import TelegramBot
+        
+        settings = job['settings']
+        with app.app_context():
+            signal = self.db.session.get(Signal, job['signal_id'])
+            
+            # Kirim sinyal ke Telegram
+            telegram_bot = TelegramBot(settings.telegram_token)
+            telegram_bot.send_chart_with_signal(
+                settings.telegram_chat_id,
+                signal,
+                job['chart_path']
+            )
+            
+            sent_at = self.clock.now()
+            logger.info(f"Sinyal {signal.direction} untuk {job['symbol']} berhasil dikirim "
+                        f"(detik {sent_at.second}, eksekusi {signal.executed_at.strftime('%H:%M:%S')})")
+        return job
+    
+    def _discard_signal(self, job):
+        """
+        Sinyal yang melewati open candle tidak dikirim dan tidak ikut dihitung
+        hasilnya: baris sinyal dan chart yang sudah digambar ikut dihapus
+        """
+        # Chart bisa sudah digambar proses worker sebelum sinyal disimpan
+        chart_path = job.get('chart_path')
+        if chart_path:
+            try:
+                os.remove(chart_path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.error(f"Gagal menghapus chart {chart_path}: {str(e)}")
+        
+        if 'signal_id' not in job:
+            return
+        
+        from app import app
+        from models import Signal
+        
+        with app.app_context():
+            signal = self.db.session.get(Signal, job['signal_id'])
+            if signal is not None:
+                self.db.session.delete(signal)
+                self.db.session.commit()
+    
+    def _indicator_frames(self, symbols, refresh=False):
+        """
+        Data historis M1 dan indikator teknikal untuk beberapa simbol
+        
+        Args:
+            symbols (list): Simbol yang diambil
+            refresh (bool): Ambil ulang candle yang sedang terbentuk dari provider
+            
+        Returns:
+            dict: symbol -> DataFrame dengan indikator, hanya simbol dengan data cukup
+        """
+        # Hitung indikator teknikal semua simbol sekaligus dalam satu pass NumPy;
+        # hanya indikator yang dipakai sinyal dan grafik, dan dalam candle
+        # yang sama hasilnya diambil dari cache
+        return self.indicator_cache.calculate_indicators_batch(
+            self._fetch_candles(symbols, refresh), timeframe="M1", columns=ANALYSIS_INDICATORS
+        )
+    
+    def _fetch_candles(self, symbols, refresh=False):
+        """
+        Data historis M1 beberapa simbol dalam satu request
+        
+        Args:
+            symbols (list): Simbol yang diambil
+            refresh (bool): Ambil ulang candle yang sedang terbentuk, walaupun
+                cache masih berlaku sampai batas candle berikutnya
+            
+        Returns:
+            dict: symbol -> array CANDLE_DTYPE, hanya simbol dengan data cukup
+        """
+        # Dapatkan data historis semua simbol dalam satu request - Selalu gunakan M1 (paksa)
+        historical_data_by_symbol = self.pocket_option_api.get_historical_data_many(
+            symbols,
+            "M1",  # Paksa timeframe ke M1 sesuai permintaan
+            limit=100,  # Ambil 100 candle terakhir
+            columnar=True,  # Array kolom NumPy, langsung dipakai oleh DataFrame
+            refresh=refresh
+        )
+        return {
+            symbol: data for symbol, data in historical_data_by_symbol.items()
+            if data is not None and len(data) >= 50
+        }
+    
+    def _sleep_until(self, timestamp):
+        """
+        Tidur sampai waktu epoch `timestamp` menurut self.clock, paling lama
+        satu detik sekali supaya stop_analysis tetap cepat berhenti
+        
+        Args:
+            timestamp (float): Waktu bangun (epoch)
+        """
+        while self.running:
+            remaining = timestamp - self.clock.time()
+            if remaining <= 0:
+                return
+            self.clock.sleep(min(remaining, 1.0))
         
     def _detect_signal(self, df, symbol, settings):
         """
@@ -230,7 +572,7 @@ class MarketAnalyzer:
         prev_candle = df.iloc[-2]
         
         # Hitung waktu eksekusi (candle berikutnya)
-        next_candle_time = datetime.now().replace(second=0, microsecond=0) + timedelta(minutes=1)
+        next_candle_time = self.clock.now().replace(second=0, microsecond=0) + timedelta(minutes=1)
         
         # Variabel untuk menyimpan hasil analisis
         direction = None
@@ -243,7 +585,7 @@ class MarketAnalyzer:
         rsi_prev = prev_candle['rsi']
         
         rsi_analysis = ""
-        if rsi < 30:
+        if rsi < SIGNAL_PARAMS['rsi_oversold']:
             rsi_analysis = "Oversold, potensi reversal naik"
             if rsi > rsi_prev:
                 reason.append("RSI oversold dengan divergence positif")
@@ -251,7 +593,7 @@ class MarketAnalyzer:
             else:
                 reason.append("RSI oversold tapi masih turun")
                 direction_bias = None
-        elif rsi > 70:
+        elif rsi > SIGNAL_PARAMS['rsi_overbought']:
             rsi_analysis = "Overbought, potensi reversal turun"
             if rsi < rsi_prev:
                 reason.append("RSI overbought dengan divergence negatif")
@@ -358,7 +700,7 @@ class MarketAnalyzer:
             bb_width = (bb_upper - bb_lower) / bb_middle
             bb_width_prev = (prev_candle['bb_upper'] - prev_candle['bb_lower']) / prev_candle['bb_middle']
             
-            if bb_width < 0.02:  # Volatilitas sangat rendah
+            if bb_width < SIGNAL_PARAMS['bb_squeeze_width']:  # Volatilitas sangat rendah
                 bb_analysis = "Squeeze kuat, bersiap untuk breakout"
                 reason.append("Bollinger Band Squeeze (potensi breakout)")
                 # Arah ditentukan oleh indikator lain
@@ -457,7 +799,7 @@ class MarketAnalyzer:
             1 if "cross" in macd_analysis.lower() else 0.7,
             1 if "break" in ema_analysis.lower() else 0.7,
             1 if "break" in bb_analysis.lower() else 0.7,
-            0.8 if volume_ratio > 1.2 else 0.5
+            0.8 if volume_ratio > SIGNAL_PARAMS['volume_surge_ratio'] else 0.5
         ]
         
         # Konversi faktor ke skor confidence 0-100%
@@ -533,83 +875,11 @@ class MarketAnalyzer:
         Returns:
             str: Pola candlestick yang terdeteksi
         """
-        if len(df) < 3:
+        if len(df) < PATTERN_WINDOW:
             return "Unknown Pattern"
             
-        # Ambil 3 candle terakhir
-        last_candles = df.iloc[-3:].copy()
-        
-        # Hitung panjang body dan shadow untuk setiap candle
-        for i in range(len(last_candles)):
-            candle = last_candles.iloc[i]
-            body_size = abs(candle['close'] - candle['open'])
-            candle_range = candle['high'] - candle['low']
-            
-            # Tambahkan kolom baru
-            last_candles.loc[last_candles.index[i], 'body_size'] = body_size
-            last_candles.loc[last_candles.index[i], 'candle_range'] = candle_range
-            last_candles.loc[last_candles.index[i], 'is_bullish'] = candle['close'] > candle['open']
-        
-        # Candle terakhir
-        last_candle = last_candles.iloc[-1]
-        prev_candle = last_candles.iloc[-2]
-        
-        # Deteksi berbagai pola candlestick
-        
-        # Pola Hammer (bullish reversal)
-        if (last_candle['is_bullish'] and 
-            last_candle['body_size'] < 0.3 * last_candle['candle_range'] and 
-            (last_candle['high'] - max(last_candle['open'], last_candle['close'])) < 0.2 * last_candle['candle_range'] and
-            (min(last_candle['open'], last_candle['close']) - last_candle['low']) > 0.6 * last_candle['candle_range']):
-            return "Hammer Rebound AI-classified"
-        
-        # Pola Shooting Star (bearish reversal)
-        if (not last_candle['is_bullish'] and 
-            last_candle['body_size'] < 0.3 * last_candle['candle_range'] and 
-            (last_candle['high'] - max(last_candle['open'], last_candle['close'])) > 0.6 * last_candle['candle_range'] and
-            (min(last_candle['open'], last_candle['close']) - last_candle['low']) < 0.2 * last_candle['candle_range']):
-            return "Shooting Star Pattern"
-        
-        # Pola Engulfing (reversal)
-        if (last_candle['is_bullish'] and not prev_candle['is_bullish'] and 
-            last_candle['body_size'] > prev_candle['body_size'] and 
-            last_candle['open'] < prev_candle['close'] and 
-            last_candle['close'] > prev_candle['open']):
-            return "Bullish Engulfing Pattern"
-        
-        if (not last_candle['is_bullish'] and prev_candle['is_bullish'] and 
-            last_candle['body_size'] > prev_candle['body_size'] and 
-            last_candle['open'] > prev_candle['close'] and 
-            last_candle['close'] < prev_candle['open']):
-            return "Bearish Engulfing Pattern"
-        
-        # Pola Doji (indecision)
-        if last_candle['body_size'] < 0.1 * last_candle['candle_range']:
-            return "Doji Pattern (indecision)"
-        
-        # Pola Marubozu (strong trend)
-        if (last_candle['body_size'] > 0.8 * last_candle['candle_range']):
-            if last_candle['is_bullish']:
-                return "Bullish Marubozu (strong buyers)"
-            else:
-                return "Bearish Marubozu (strong sellers)"
-        
-        # Pola Inside Bar (consolidation)
-        if (last_candle['high'] < prev_candle['high'] and last_candle['low'] > prev_candle['low']):
-            return "Inside Bar Pattern"
-        
-        # Pola Three White Soldiers (bullish continuation)
-        if (len(last_candles) >= 3 and 
-            all(last_candles.iloc[i]['is_bullish'] for i in range(-3, 0)) and 
-            last_candles.iloc[-1]['close'] > last_candles.iloc[-2]['close'] > last_candles.iloc[-3]['close'] and
-            last_candles.iloc[-1]['open'] > last_candles.iloc[-2]['open'] > last_candles.iloc[-3]['open']):
-            return "Three White Soldiers Pattern"
-        
-        # Tidak ada pola spesifik yang terdeteksi
-        if last_candle['is_bullish']:
-            return "Bullish Candle"
-        else:
-            return "Bearish Candle"
+        # Klasifikasi vektor atas candle terakhir; prioritas pola ada di classify_candles
+        return candle_pattern_labels(df.iloc[-PATTERN_WINDOW:])[-1]
             
     def _check_signal_results(self):
         """
@@ -628,7 +898,7 @@ class MarketAnalyzer:
             # Cari sinyal tanpa hasil dengan waktu eksekusi yang sudah berlalu + 1 menit
             signals_to_check = Signal.query.filter(
                 Signal.result.is_(None),
-                Signal.executed_at < (datetime.now() - timedelta(minutes=1))
+                Signal.executed_at < (self.clock.now() - timedelta(minutes=1))
             ).all()
             
             if not signals_to_check:
@@ -637,6 +907,18 @@ class MarketAnalyzer:
             # Dapatkan pengaturan untuk Telegram
             settings = Setting.query.first()
             
+            # Ambil data candle semua simbol sekaligus (satu request per timeframe)
+            symbols_by_timeframe = {}
+            for signal in signals_to_check:
+                symbols_by_timeframe.setdefault(signal.timeframe, []).append(signal.symbol)
+            for timeframe, symbols in symbols_by_timeframe.items():
+                self.pocket_option_api.get_historical_data_many(
+                    symbols,
+                    timeframe,
+                    limit=100,
+                    priority=PRIORITY_RESULT
+                )
+            
             for signal in signals_to_check:
                 try:
                     # Dapatkan data candle untuk periode eksekusi
@@ -647,28 +929,16 @@ class MarketAnalyzer:
                     )
                     
                     if not candle_data:
-                        logger.warning(f"Tidak bisa mendapatkan data candle untuk signal {signal.id}")
+                        self._result_missing(signal)
                         continue
+                    self.result_misses.pop(signal.id, None)
                         
                     # Simpan harga open dan close
                     signal.open_price = candle_data['open']
                     signal.close_price = candle_data['close']
                     
                     # Tentukan hasil berdasarkan arah sinyal dan pergerakan harga
-                    if signal.direction == "BUY":
-                        if candle_data['close'] > candle_data['open']:
-                            signal.result = "WIN"
-                        elif candle_data['close'] < candle_data['open']:
-                            signal.result = "LOSS"
-                        else:
-                            signal.result = "DRAW"
-                    else:  # SELL
-                        if candle_data['close'] < candle_data['open']:
-                            signal.result = "WIN"
-                        elif candle_data['close'] > candle_data['open']:
-                            signal.result = "LOSS"
-                        else:
-                            signal.result = "DRAW"
+                    signal.result = trade_result(signal.direction, candle_data['open'], candle_data['close'])
                     
                     # Buat analisis pasca-eksekusi
                     if signal.result == "WIN":
@@ -696,3 +966,29 @@ class MarketAnalyzer:
                     
                 except Exception as e:
                     logger.error(f"Error saat memeriksa hasil signal {signal.id}: {str(e)}")
+    
+    def _result_missing(self, signal):
+        """
+        Mencatat candle eksekusi yang tidak bisa didapat. Setelah
+        RESULT_LOOKUP_ATTEMPTS kali, atau jika sinyal lebih tua dari
+        RESULT_MAX_AGE, hasilnya dinyatakan EXPIRED supaya candle yang sama
+        tidak diminta ke provider di setiap siklus
+        
+        Args:
+            signal (Signal): Sinyal yang hasilnya belum bisa ditentukan
+        """
+        misses = self.result_misses.get(signal.id, 0) + 1
+        age = self.clock.now() - signal.executed_at
+        if misses < RESULT_LOOKUP_ATTEMPTS and age < RESULT_MAX_AGE:
+            self.result_misses[signal.id] = misses
+            logger.warning(f"Tidak bisa mendapatkan data candle untuk signal {signal.id} "
+                           f"(percobaan {misses}/{RESULT_LOOKUP_ATTEMPTS})")
+            return
+        
+        from app import db
+        
+        self.result_misses.pop(signal.id, None)
+        signal.result = RESULT_EXPIRED
+        signal.post_analysis = "Data candle eksekusi tidak tersedia dari provider, hasil tidak dapat ditentukan."
+        db.session.commit()
+        logger.warning(f"Hasil sinyal {signal.id} untuk {signal.symbol} tidak dapat ditentukan, ditandai {RESULT_EXPIRED}")
@@ -0,0 +1,153 @@
+import itertools
+import logging
+import random
+from collections import OrderedDict
+
+import numpy as np
+
+from api.candle_store import CandleStore
+from api.pocket_option import INTERVAL_SECONDS
+from utils.backtester import (
+    ANALYSIS_WINDOW, SHARD_CANDLES, execution_candles, history_features, map_shards, plan_shards
+)
+from utils.signal_evaluator import BUY, SELL, SIGNAL_PARAMS, evaluate_features
+
+logger = logging.getLogger(__name__)
+
+# Nilai default yang dicoba untuk setiap ambang
+PARAMETER_GRID = OrderedDict([
+    ('rsi_oversold', (20, 25, 30, 35)),
+    ('rsi_overbought', (65, 70, 75, 80)),
+    ('bb_squeeze_width', (0.01, 0.02, 0.03)),
+    ('volume_surge_ratio', (1.0, 1.2, 1.5)),
+    ('min_confidence_threshold', (60, 65, 70, 75, 80)),
+])
+
+# Kolom hitungan per kombinasi di hasil sweep_shard
+COUNT_COLUMNS = ('signals', 'wins', 'losses', 'draws', 'unresolved')
+
+
+def grid_combinations(grid=PARAMETER_GRID):
+    """Semua kombinasi nilai grid, masing-masing sebagai dict nama -> nilai"""
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*grid.values())]
+
+
+def random_combinations(grid=PARAMETER_GRID, count=100, seed=None):
+    """`count` kombinasi acak yang berbeda dari grid"""
+    combinations = grid_combinations(grid)
+    return random.Random(seed).sample(combinations, min(count, len(combinations)))
+
+
+def sweep_shard(store_root, symbol, interval, start, stop, combinations, window=ANALYSIS_WINDOW):
+    """
+    Mengevaluasi semua kombinasi atas satu shard. Indikator dan fitur sinyal
+    dihitung sekali; setiap kombinasi hanya menjalankan ulang aturannya
+
+    Returns:
+        ndarray: Hitungan COUNT_COLUMNS per kombinasi, bentuk (kombinasi, 5)
+    """
+    candles = CandleStore(store_root).read(symbol, interval)
+    start, stop, features = history_features(candles, start, stop, window)
+    resolved, open_, close = execution_candles(candles, np.arange(start, stop), INTERVAL_SECONDS[interval])
+
+    # Hasil trade setiap candle untuk kedua arah, seperti trade_results
+    up = resolved & (close > open_)
+    down = resolved & (close < open_)
+    flat = resolved & ~up & ~down
+
+    # Kombinasi dengan ambang aturan yang sama hanya berbeda di confidence
+    # minimum: arah dievaluasi sekali, lalu disaring per confidence
+    counts = np.zeros((len(combinations), len(COUNT_COLUMNS)), dtype=np.int64)
+    groups = OrderedDict()
+    for position, combination in enumerate(combinations):
+        params = {name: value for name, value in combination.items() if name in SIGNAL_PARAMS}
+        groups.setdefault(tuple(sorted(params.items())), []).append(position)
+
+    for params, positions in groups.items():
+        evaluated = evaluate_features(features, 0, dict(params))
+        direction = evaluated['direction']
+        confidence = evaluated['confidence']
+        for position in positions:
+            threshold = combinations[position].get('min_confidence_threshold', 0)
+            accepted = confidence >= threshold
+            buy = accepted & (direction == BUY)
+            sell = accepted & (direction == SELL)
+            signals = np.count_nonzero(buy) + np.count_nonzero(sell)
+            counts[position] = (
+                signals,
+                np.count_nonzero(buy & up) + np.count_nonzero(sell & down),
+                np.count_nonzero(buy & down) + np.count_nonzero(sell & up),
+                np.count_nonzero((buy | sell) & flat),
+                signals - np.count_nonzero((buy | sell) & resolved),
+            )
+    return counts
+
+
+def run_sweep(store_root, combinations, symbols=None, interval='1min', start_timestamp=None, end_timestamp=None,
+              workers=None, window=ANALYSIS_WINDOW, shard_candles=SHARD_CANDLES):
+    """
+    Mengevaluasi kombinasi ambang atas riwayat CandleStore, dibagi per
+    simbol dan rentang waktu ke pool proses
+
+    Args:
+        store_root (str): Direktori CandleStore
+        combinations (list): dict ambang per kombinasi (lihat grid_combinations)
+        symbols (list): Simbol yang diuji (default: semua simbol tersimpan untuk interval ini)
+        interval (str): Interval Twelve Data (1min, 5min, ...)
+        start_timestamp, end_timestamp (int): Rentang waktu candle (epoch, opsional)
+        workers (int): Jumlah proses (default: jumlah CPU; 1 berarti tanpa pool)
+        window (int): Jumlah candle per analisis
+        shard_candles (int): Candle per shard
+
+    Returns:
+        SweepReport: Hitungan per kombinasi
+    """
+    store = CandleStore(store_root)
+    if symbols is None:
+        symbols = sorted(entry['symbol'] for entry in store.series() if entry['interval'] == interval)
+
+    shards = plan_shards(store, symbols, interval, start_timestamp, end_timestamp, shard_candles)
+    tasks = [(store_root, symbol, interval, start, stop, combinations, window) for symbol, start, stop in shards]
+    logger.info(f"Sweep {len(combinations)} kombinasi atas {len(symbols)} simbol dalam {len(shards)} shard")
+
+    counts = np.zeros((len(combinations), len(COUNT_COLUMNS)), dtype=np.int64)
+    for shard_counts in map_shards(sweep_shard, tasks, workers):
+        counts += shard_counts
+    return SweepReport(combinations, counts)
+
+
+class SweepReport:
+    """
+    Hasil sweep per kombinasi, diurutkan menurut win rate (WIN / (WIN + LOSS))
+    di antara kombinasi dengan cukup banyak sinyal
+    """
+
+    def __init__(self, combinations, counts):
+        self.combinations = combinations
+        self.counts = counts
+
+    def ranked(self, min_signals=30):
+        rows = []
+        for combination, counts in zip(self.combinations, self.counts.tolist()):
+            row = dict(combination, **dict(zip(COUNT_COLUMNS, counts)))
+            decided = row['wins'] + row['losses']
+            row['win_rate'] = row['wins'] / decided * 100 if decided else None
+            rows.append(row)
+
+        qualified = [row for row in rows if row['signals'] >= min_signals and row['win_rate'] is not None]
+        return sorted(qualified, key=lambda row: (-row['win_rate'], -row['signals']))
+
+    def format(self, top=20, min_signals=30):
+        """Tabel teks kombinasi terbaik"""
+        rows = self.ranked(min_signals)[:top]
+        names = list(self.combinations[0]) if self.combinations else []
+        lines = [f"{'#':>3} " + " ".join(f"{name:>{len(name)}}" for name in names)
+                 + f" {'sinyal':>8} {'WIN':>7} {'LOSS':>7} {'DRAW':>6} {'win rate':>9}"]
+        for rank, row in enumerate(rows, 1):
+            lines.append(f"{rank:>3} " + " ".join(f"{row[name]:>{len(name)}}" for name in names)
+                         + f" {row['signals']:>8} {row['wins']:>7} {row['losses']:>7} {row['draws']:>6}"
+                         f" {row['win_rate']:>8.1f}%")
+        if not rows:
+            lines.append(f"Tidak ada kombinasi dengan minimal {min_signals} sinyal")
+        return "\n".join(lines)
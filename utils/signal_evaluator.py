@@ -0,0 +1,377 @@
+import numpy as np
+import pandas as pd
+from pandas.api.indexers import BaseIndexer
+
+# Kode arah sinyal di evaluate_signal_arrays
+NO_SIGNAL = 0
+BUY = 1
+SELL = -1
+
+DIRECTIONS = {BUY: "BUY", SELL: "SELL"}
+
+# Level risiko menurut win rate, dicek berurutan seperti di _detect_signal
+RISK_LEVELS = (
+    (90, "Sangat Rendah"),
+    (80, "Rendah"),
+    (70, "Sedang"),
+    (60, "Tinggi"),
+)
+HIGHEST_RISK = "Sangat Tinggi"
+
+# Ambang aturan sinyal di _detect_signal
+SIGNAL_PARAMS = {
+    'rsi_oversold': 30,
+    'rsi_overbought': 70,
+    'bb_squeeze_width': 0.02,
+    'volume_surge_ratio': 1.2,
+}
+
+# Jumlah candle minimum sebelum _detect_signal mau menghasilkan sinyal
+MIN_CANDLES = 5
+
+# Hasil trade, ditentukan oleh candle eksekusi
+WIN = 1
+LOSS = -1
+DRAW = 0
+
+TRADE_RESULTS = {WIN: "WIN", LOSS: "LOSS", DRAW: "DRAW"}
+
+# Indikator yang dibaca _detect_signal
+SIGNAL_INDICATORS = ('rsi', 'macd', 'macd_signal', 'ema50', 'bb_upper', 'bb_middle', 'bb_lower', 'atr')
+
+# Kolom yang dibaca evaluator
+SIGNAL_COLUMNS = ('high', 'low', 'close', 'volume') + SIGNAL_INDICATORS
+
+
+def evaluate_signals(df, min_confidence_threshold=0, params=None):
+    """
+    Mengevaluasi logika MarketAnalyzer._detect_signal untuk setiap candle
+    sekaligus. Baris ke-i sama dengan hasil _detect_signal(df.iloc[:i + 1])
+
+    Args:
+        df (DataFrame): DataFrame dengan data OHLCV dan indikator teknikal
+        min_confidence_threshold (float): Confidence minimum sebuah sinyal
+        params (dict): Ambang aturan sinyal (default: SIGNAL_PARAMS)
+
+    Returns:
+        DataFrame: Kolom direction ("BUY"/"SELL"), confidence,
+            win_rate_prediction dan risk_level per candle; kosong (NA) jika
+            tidak ada sinyal
+    """
+    result = evaluate_signal_arrays({column: df[column].to_numpy() for column in SIGNAL_COLUMNS},
+                                    min_confidence_threshold, params)
+    direction = result['direction']
+    signal = direction != NO_SIGNAL
+
+    risk_level = np.full(direction.shape, None, dtype=object)
+    risk_level[signal] = _risk_levels(result['win_rate_prediction'][signal])
+
+    return pd.DataFrame({
+        'direction': np.where(direction == BUY, "BUY", np.where(signal, "SELL", None)),
+        'confidence': result['confidence'],
+        'win_rate_prediction': result['win_rate_prediction'],
+        'risk_level': risk_level,
+    }, index=df.index)
+
+
+def evaluate_signal_arrays(columns, min_confidence_threshold=0, params=None):
+    """
+    Versi evaluate_signals di atas array NumPy
+
+    Args:
+        columns (dict): Kolom SIGNAL_COLUMNS sebagai array 1-D atau 2-D
+            (simbol x waktu); candle berurutan sepanjang sumbu terakhir
+        min_confidence_threshold (float): Confidence minimum sebuah sinyal
+        params (dict): Ambang aturan sinyal (default: SIGNAL_PARAMS)
+
+    Returns:
+        dict: direction (NO_SIGNAL, BUY atau SELL), confidence dan
+            win_rate_prediction (NaN jika tidak ada sinyal) per candle
+    """
+    return evaluate_features(signal_features(columns), min_confidence_threshold, params)
+
+
+def signal_features(columns):
+    """
+    Bagian evaluasi yang tidak bergantung pada ambang aturan: perbandingan
+    dengan candle sebelumnya, rata-rata bergulir dan nilai yang dibulatkan.
+    Dihitung sekali, lalu evaluate_features bisa dijalankan untuk banyak
+    kombinasi ambang
+
+    Args:
+        columns (dict): Kolom SIGNAL_COLUMNS, seperti di evaluate_signal_arrays
+
+    Returns:
+        dict: Nama fitur -> array dengan bentuk yang sama seperti kolom input
+    """
+    high, low, price, volume = (np.asarray(columns[name], dtype=np.float64)
+                                for name in ('high', 'low', 'close', 'volume'))
+    rsi, macd, macd_signal, ema50, bb_upper, bb_middle, bb_lower, atr = (
+        np.asarray(columns[name], dtype=np.float64)
+        for name in ('rsi', 'macd', 'macd_signal', 'ema50', 'bb_upper', 'bb_middle', 'bb_lower', 'atr')
+    )
+    macd_prev, macd_signal_prev, price_prev, ema50_prev, bb_upper_prev, bb_middle_prev, bb_lower_prev = (
+        _previous(values) for values in (macd, macd_signal, price, ema50, bb_upper, bb_middle, bb_lower)
+    )
+    price_prev2 = _previous(price, shift=2)
+
+    # Setiap rantai if/elif menjadi mask yang saling lepas; perbandingan dengan
+    # NaN bernilai False, jadi NaN jatuh ke cabang else seperti versi skalar
+    cross_up = (macd > macd_signal) & (macd_prev <= macd_signal_prev)
+    break_up = (price > ema50) & (price_prev <= ema50_prev)
+    break_down = ~break_up & (price < ema50) & (price_prev >= ema50_prev)
+    above = ~break_up & ~break_down & (price > ema50)
+    below = ~break_up & ~break_down & ~above & (price < ema50)
+    below_lower = price <= bb_lower
+
+    # sum() atas 5 volume terakhir, dijumlahkan dengan urutan yang sama
+    volume_sum = _previous(volume, shift=4)
+    for shift in (3, 2, 1, 0):
+        volume_sum = volume_sum + _previous(volume, shift=shift)
+    volume_ratio = volume_sum / (5 * _rolling_mean(volume, 20))
+
+    enough_candles = np.ones(price.shape, dtype=bool)
+    enough_candles[..., :MIN_CANDLES - 1] = False
+
+    return {
+        'rsi': rsi,
+        'rsi_prev': _previous(rsi),
+        'macd_above': macd > macd_signal,
+        'macd_below': macd < macd_signal,
+        'macd_cross': cross_up | (~cross_up & (macd < macd_signal) & (macd_prev >= macd_signal_prev)),
+        'ema_break': break_up | break_down,
+        'ema_up': break_up | (above & (price - ema50 > price_prev - ema50_prev)),
+        'ema_down': break_down | (below & (ema50 - price > ema50_prev - price_prev)),
+        'below_lower': below_lower,
+        'above_upper': ~below_lower & (price >= bb_upper),
+        'bb_width': (bb_upper - bb_lower) / bb_middle,
+        'bb_width_prev': (bb_upper_prev - bb_lower_prev) / bb_middle_prev,
+        # Versi skalar membandingkan close sebelumnya dengan BB middle candle ini
+        'middle_up': (price > bb_middle) & (price_prev <= bb_middle),
+        'middle_down': (price < bb_middle) & (price_prev >= bb_middle),
+        'momentum_up': (price > price_prev) & (price_prev > price_prev2),
+        'momentum_down': (price < price_prev) & (price_prev < price_prev2),
+        'volatility': np.minimum(_round(atr / _rolling_mean(atr, 14) * 5, 1), 10),
+        'volume_ratio': volume_ratio,
+        'strength_by_volume': np.minimum(_round(volume_ratio * 100, 1), 100),
+        'price_pressure': _round((price - price_prev2) / price_prev2 * 100, 2),
+        'higher_low': low > _previous(low),
+        'lower_high': high < _previous(high),
+        # round(volume_ratio * 100) di teks analisis volume gagal untuk NaN dan
+        # inf; _detect_signal tidak menghasilkan sinyal untuk candle itu
+        'evaluable': enough_candles & np.isfinite(volume_ratio),
+    }
+
+
+def last_features(features):
+    """Fitur candle terakhir di setiap baris"""
+    return {name: values[..., -1] for name, values in features.items()}
+
+
+def evaluate_features(features, min_confidence_threshold=0, params=None):
+    """
+    Aturan sinyal di atas hasil signal_features
+
+    Args:
+        features (dict): Hasil signal_features (atau last_features)
+        min_confidence_threshold (float): Confidence minimum sebuah sinyal
+        params (dict): Ambang aturan sinyal (default: SIGNAL_PARAMS)
+
+    Returns:
+        dict: direction, confidence dan win_rate_prediction, seperti evaluate_signal_arrays
+    """
+    params = SIGNAL_PARAMS if params is None else {**SIGNAL_PARAMS, **params}
+    rsi = features['rsi']
+    rsi_prev = features['rsi_prev']
+
+    # 1. RSI: hanya menentukan bias arah
+    oversold = rsi < params['rsi_oversold']
+    overbought = ~oversold & (rsi > params['rsi_overbought'])
+    neutral = ~oversold & ~overbought
+    bullish = neutral & (rsi > 50)
+    bias = np.zeros(rsi.shape, dtype=np.int8)
+    bias[(oversold | bullish) & (rsi > rsi_prev)] = BUY
+    bias[(overbought | (neutral & ~bullish)) & (rsi < rsi_prev)] = SELL
+
+    # 2. MACD: arah masih kosong, jadi setiap cabang yang bukan netral menentukan arah
+    direction = np.zeros(rsi.shape, dtype=np.int8)
+    direction[features['macd_above']] = BUY
+    direction[features['macd_below']] = SELL
+
+    # 3. EMA50
+    _follow(direction, bias, features['ema_up'], BUY)
+    _follow(direction, bias, features['ema_down'], SELL)
+
+    # 4. Bollinger Bands
+    below_lower = features['below_lower']
+    above_upper = features['above_upper']
+    direction[below_lower & (bias != SELL)] = BUY
+    direction[above_upper & (bias != BUY)] = SELL
+
+    inside = ~below_lower & ~above_upper
+    squeeze = inside & (features['bb_width'] < params['bb_squeeze_width'])
+    widening = inside & ~squeeze & ~(features['bb_width'] < features['bb_width_prev'])
+    middle_up = widening & features['middle_up']
+    middle_down = widening & ~middle_up & features['middle_down']
+    _follow(direction, bias, middle_up, BUY)
+    _follow(direction, bias, middle_down, SELL)
+
+    # Tanpa arah: momentum 3 candle terakhir, atau tidak ada sinyal
+    undecided = direction == NO_SIGNAL
+    direction[undecided & features['momentum_up']] = BUY
+    direction[undecided & features['momentum_down']] = SELL
+
+    # "confirmed": higher low untuk BUY, lower high untuk SELL
+    confirmed = np.where(direction == BUY, features['higher_low'], features['lower_high'])
+
+    # === CONFIDENCE DAN WIN RATE ===
+    # Faktor RSI di _detect_signal mencari "oversold"/"overbought" di teks yang
+    # diawali huruf besar, sehingga nilainya selalu 0.5
+    rsi_factor = 0.5
+    macd_factor = np.where(features['macd_cross'], 1, 0.7)
+    ema_factor = np.where(features['ema_break'], 1, 0.7)
+    bb_factor = np.where(below_lower | above_upper | squeeze | middle_up | middle_down, 1, 0.7)
+    volume_factor = np.where(features['volume_ratio'] > params['volume_surge_ratio'], 0.8, 0.5)
+
+    confidence = _factor_score(rsi_factor, macd_factor, ema_factor, bb_factor, volume_factor)
+    direction[confidence < min_confidence_threshold] = NO_SIGNAL
+
+    win_rate_prediction = _factor_score(
+        confidence / 100,
+        np.where(features['volatility'] > 6, 0.9, 0.7),
+        np.where(features['strength_by_volume'] > 80, 0.9, 0.7),
+        np.where(np.abs(features['price_pressure']) > 0.5, 0.9, 0.7),
+        np.where(confirmed, 0.9, 0.7)
+    )
+
+    direction[~features['evaluable']] = NO_SIGNAL
+    no_signal = direction == NO_SIGNAL
+    confidence[no_signal] = np.nan
+    win_rate_prediction[no_signal] = np.nan
+
+    return {
+        'direction': direction,
+        'confidence': confidence,
+        'win_rate_prediction': win_rate_prediction,
+    }
+
+
+def trade_result(direction, open_price, close_price):
+    """
+    Hasil sinyal dari harga open dan close candle eksekusinya
+
+    Args:
+        direction (str): Arah sinyal ("BUY" atau "SELL")
+        open_price (float): Harga open candle eksekusi
+        close_price (float): Harga close candle eksekusi
+
+    Returns:
+        str: "WIN", "LOSS" atau "DRAW"
+    """
+    if direction == "BUY":
+        if close_price > open_price:
+            return "WIN"
+        elif close_price < open_price:
+            return "LOSS"
+        return "DRAW"
+
+    # SELL
+    if close_price < open_price:
+        return "WIN"
+    elif close_price > open_price:
+        return "LOSS"
+    return "DRAW"
+
+
+def trade_results(direction, open_, close):
+    """
+    trade_result untuk banyak sinyal sekaligus
+
+    Args:
+        direction: Array kode arah (BUY atau SELL)
+        open_, close: Array harga open dan close candle eksekusi
+
+    Returns:
+        ndarray: Kode hasil (WIN, LOSS atau DRAW)
+    """
+    buy = direction == BUY
+    up = close > open_
+    down = close < open_
+    return np.select(
+        [np.where(buy, up, down), np.where(buy, down, up)],
+        [WIN, LOSS],
+        default=DRAW
+    ).astype(np.int8)
+
+
+def _follow(direction, bias, mask, target):
+    """`if direction_bias == target or direction is None: direction = target` untuk candle di mask"""
+    direction[mask & ((bias == target) | (direction == NO_SIGNAL))] = target
+
+
+def _factor_score(*factors):
+    """min(round(sum(factors) / len(factors) * 100, 1), 100), dijumlahkan berurutan seperti sum()"""
+    total = 0
+    for factor in factors:
+        total = total + factor
+    return np.minimum(_round(total / len(factors) * 100, 1), 100)
+
+
+def _risk_levels(win_rate_prediction):
+    return np.select(
+        [win_rate_prediction > threshold for threshold, _ in RISK_LEVELS],
+        [level for _, level in RISK_LEVELS],
+        default=HIGHEST_RISK
+    ).astype(object)
+
+
+def _round(values, digits):
+    """
+    round() Python per elemen. np.round bisa berbeda satu digit untuk nilai
+    yang tepat di tengah dua kemungkinan pembulatan; nilai itu dibulatkan ulang
+    dengan round()
+    """
+    values = np.asarray(values, dtype=np.float64)
+    scaled = values * 10.0 ** digits
+    rounded = np.round(values, digits)
+    with np.errstate(invalid='ignore'):
+        ties = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    for index in zip(*np.nonzero(ties)):
+        rounded[index] = round(float(values[index]), digits)
+    return rounded
+
+
+def _rolling_mean(values, window):
+    """Series.rolling(window).mean() sepanjang sumbu terakhir, dengan hasil yang identik"""
+    if values.ndim == 1:
+        return pd.Series(values).rolling(window=window).mean().to_numpy()
+
+    # Semua baris dalam satu Series; jendela tidak melewati awal barisnya,
+    # sehingga setiap baris dihitung seperti Series tersendiri
+    indexer = _RowWindowIndexer(window_size=window, row_length=values.shape[-1])
+    flat = pd.Series(values.reshape(-1)).rolling(window=indexer, min_periods=window).mean()
+    return flat.to_numpy().reshape(values.shape)
+
+
+class _RowWindowIndexer(BaseIndexer):
+    """
+    Jendela bergulir per baris untuk array 2-D yang diratakan. Jendela pertama
+    setiap baris tidak bersinggungan dengan jendela sebelumnya, jadi pandas
+    memulai jumlah berjalannya dari nol seperti di awal sebuah Series
+    """
+
+    def get_window_bounds(self, num_values=0, min_periods=None, center=None, closed=None, step=None):
+        end = np.arange(1, num_values + 1, dtype=np.int64)
+        row_start = (end - 1) // self.row_length * self.row_length
+        start = np.maximum(end - self.window_size, row_start)
+        return start, end
+
+
+def _previous(values, shift=1):
+    """values digeser `shift` candle ke kanan sepanjang sumbu terakhir, diawali NaN"""
+    if not shift:
+        return values
+    shifted = np.empty_like(values)
+    shifted[..., :shift] = np.nan
+    shifted[..., shift:] = values[..., :-shift]
+    return shifted
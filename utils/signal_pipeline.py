@@ -0,0 +1,180 @@
+import logging
+import queue
+import threading
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+# Penanda berhenti untuk thread tahap
+_STOP = object()
+
+
+class PipelineStage:
+    """Satu tahap pipeline: antrean terbatas, thread pekerja dan hitungannya"""
+
+    def __init__(self, name, function, workers, maxsize):
+        self.name = name
+        self.function = function
+        self.workers = workers
+        self.queue = queue.Queue(maxsize)
+        self.threads = []
+        self.lock = threading.Lock()
+        self.busy = 0
+        self.counts = {'processed': 0, 'dropped': 0, 'missed': 0, 'failed': 0, 'discarded': 0}
+
+    def count(self, outcome):
+        with self.lock:
+            self.counts[outcome] += 1
+
+    def stats(self):
+        with self.lock:
+            return dict(queue=self.queue.qsize(), maxsize=self.queue.maxsize, workers=self.workers,
+                        busy=self.busy, **self.counts)
+
+
+class SignalPipeline:
+    """
+    Pipeline bertahap untuk sinyal: setiap tahap punya antrean terbatas dan
+    thread sendiri, jadi tahap yang lambat (render chart, API Telegram) tidak
+    menahan tahap sebelumnya untuk simbol lain. Antrean yang penuh menahan
+    tahap sebelumnya (backpressure) sampai deadline job.
+
+    Job adalah dict dengan 'symbol' dan 'deadline' (epoch atau None). Fungsi
+    tahap menerima job dan mengembalikan job untuk tahap berikutnya, atau
+    None untuk menghentikannya. Job yang deadline-nya lewat sebelum sebuah
+    tahap dimulai tidak diteruskan dan diserahkan ke on_missed, begitu juga
+    job yang dibuang setelah discard().
+    """
+
+    def __init__(self, stages, clock, on_missed=None):
+        """
+        Args:
+            stages (list): (nama, fungsi, jumlah thread, panjang antrean) per tahap, berurutan
+            clock: Jam untuk deadline (SystemClock, ReplayClock)
+            on_missed (callable): Dipanggil dengan job yang melewati deadline atau dibuang
+        """
+        self.stages = [PipelineStage(*stage) for stage in stages]
+        self.clock = clock
+        self.on_missed = on_missed
+        self.discarding = False
+
+    def start(self):
+        for index, stage in enumerate(self.stages):
+            for number in range(stage.workers):
+                thread = threading.Thread(target=self._work, args=(index,),
+                                          name=f"pipeline-{stage.name}-{number}", daemon=True)
+                thread.start()
+                stage.threads.append(thread)
+
+    def discard(self):
+        """
+        Membuang job yang masih antre dan yang masuk berikutnya tanpa
+        memprosesnya; job yang sedang diproses sebuah tahap tetap selesai
+        di tahap itu. Dipakai saat proses ini bukan lagi leader, supaya
+        sinyal tidak dikirim dua kali bersama leader baru
+        """
+        self.discarding = True
+
+    def stop(self, timeout=5):
+        """Menghentikan tahap satu per satu dari depan, setelah antreannya diproses (atau dibuang)"""
+        for stage in self.stages:
+            for _ in stage.threads:
+                stage.queue.put(_STOP)
+            for thread in stage.threads:
+                thread.join(timeout=timeout)
+            stage.threads = []
+
+    def submit(self, job):
+        """
+        Memasukkan job ke tahap pertama, menunggu tempat di antrean paling
+        lama sampai deadline-nya
+
+        Returns:
+            bool: False jika job melewati deadline sebelum masuk antrean
+        """
+        if self._put(0, job):
+            return True
+        self._miss(self.stages[0], job)
+        return False
+
+    def stats(self):
+        """Kedalaman antrean, thread sibuk dan hitungan hasil per tahap"""
+        return OrderedDict((stage.name, stage.stats()) for stage in self.stages)
+
+    def _work(self, index):
+        stage = self.stages[index]
+        while True:
+            job = stage.queue.get()
+            if job is _STOP:
+                return
+
+            if self.discarding:
+                self._discard(stage, job)
+                continue
+
+            if self._expired(job):
+                self._miss(stage, job)
+                continue
+
+            with stage.lock:
+                stage.busy += 1
+            try:
+                result = stage.function(job)
+            except Exception as e:
+                logger.error(f"Error di tahap {stage.name} untuk {job.get('symbol')}: {str(e)}")
+                stage.count('failed')
+                continue
+            finally:
+                with stage.lock:
+                    stage.busy -= 1
+
+            if result is None:
+                stage.count('dropped')
+                continue
+
+            stage.count('processed')
+            if index + 1 < len(self.stages) and not self._put(index + 1, result):
+                self._miss(self.stages[index + 1], result)
+
+    def _put(self, index, job):
+        stage = self.stages[index]
+        try:
+            stage.queue.put_nowait(job)
+            return True
+        except queue.Full:
+            logger.warning(f"Antrean tahap {stage.name} penuh ({stage.queue.maxsize}), "
+                           f"{job.get('symbol')} menunggu")
+
+        deadline = job.get('deadline')
+        try:
+            if deadline is None:
+                stage.queue.put(job)
+            else:
+                remaining = deadline - self.clock.time()
+                if remaining <= 0:
+                    return False
+                stage.queue.put(job, timeout=remaining)
+            return True
+        except queue.Full:
+            return False
+
+    def _expired(self, job):
+        deadline = job.get('deadline')
+        return deadline is not None and self.clock.time() >= deadline
+
+    def _miss(self, stage, job):
+        stage.count('missed')
+        logger.warning(f"Sinyal {job.get('symbol')} melewati deadline sebelum tahap {stage.name}, tidak dikirim")
+        self._give_up(job)
+
+    def _discard(self, stage, job):
+        stage.count('discarded')
+        logger.info(f"Sinyal {job.get('symbol')} dibuang sebelum tahap {stage.name}, pipeline dihentikan")
+        self._give_up(job)
+
+    def _give_up(self, job):
+        if self.on_missed:
+            try:
+                self.on_missed(job)
+            except Exception as e:
+                logger.error(f"Error saat membuang sinyal {job.get('symbol')}: {str(e)}")
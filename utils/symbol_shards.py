@@ -0,0 +1,229 @@
+import logging
+import multiprocessing
+import os
+import threading
+import types
+from concurrent.futures import ProcessPoolExecutor, wait
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from api.candles import CANDLE_DTYPE
+from api.clock import ReplayClock
+
+logger = logging.getLogger(__name__)
+
+# Candle per simbol di buffer bersama, sama dengan limit=100 di loop analisis
+SHARED_WINDOW = 100
+
+# State proses worker, diisi oleh _init_worker
+_worker = None
+
+# Modul yang sudah diimpor oleh proses forkserver, supaya worker baru tidak
+# mengimpor ulang numpy, pandas dan matplotlib
+FORKSERVER_PRELOAD = ['utils.market_analyzer', 'utils.chart_generator']
+
+
+class SharedCandleBuffer:
+    """
+    Candle terakhir semua simbol aktif dalam satu blok shared memory: array
+    CANDLE_DTYPE berbentuk (simbol, window) diikuti panjang data per simbol.
+    Koordinator menulis, proses worker membaca baris simbolnya langsung dari
+    blok yang sama tanpa menyalin atau mengirim candle lewat pipe
+    """
+
+    def __init__(self, symbols, window=SHARED_WINDOW, name=None):
+        self.symbols = list(symbols)
+        self.window = window
+        self.rows = {symbol: row for row, symbol in enumerate(self.symbols)}
+
+        candles_size = len(self.symbols) * window * CANDLE_DTYPE.itemsize
+        size = candles_size + len(self.symbols) * np.dtype(np.int64).itemsize
+        self.owner = name is None
+        if self.owner:
+            self.shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+
+        self.candles = np.ndarray((len(self.symbols), window), dtype=CANDLE_DTYPE, buffer=self.shm.buf)
+        self.lengths = np.ndarray(len(self.symbols), dtype=np.int64, buffer=self.shm.buf, offset=candles_size)
+        if self.owner:
+            self.lengths[:] = 0
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def write(self, symbol, candles):
+        """Menyimpan `window` candle terakhir sebuah simbol (array CANDLE_DTYPE)"""
+        row = self.rows[symbol]
+        candles = candles[-self.window:]
+        self.candles[row, :len(candles)] = candles
+        self.lengths[row] = len(candles)
+
+    def read(self, symbol):
+        """View candle sebuah simbol di shared memory; isinya berubah saat koordinator menulis lagi"""
+        row = self.rows[symbol]
+        return self.candles[row, :self.lengths[row]]
+
+    def close(self):
+        # View numpy harus dilepas sebelum blok ditutup
+        self.candles = self.lengths = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+class SymbolShards:
+    """
+    Membagi simbol aktif ke beberapa proses worker. Candle ditulis koordinator
+    ke SharedCandleBuffer; setiap worker menghitung indikator, mendeteksi
+    sinyal dan menggambar chart untuk simbol bagiannya, sehingga pekerjaan
+    yang terikat GIL berjalan di semua core. Penyimpanan ke database dan
+    pengiriman Telegram tetap di proses koordinator.
+
+    Proses dibuat lewat forkserver: koordinator sudah punya thread, lock dan
+    koneksi database, jadi fork langsung dari proses ini bisa mewariskan lock
+    yang sedang dipegang. Worker di-fork dari proses server yang bersih
+    (juga saat dibuat ulang setelah worker mati) dan hanya menerima nama
+    blok shared memory lewat initializer. Worker menjalankan ulang modul
+    utama sebagai __mp_main__, karena itu main.py tidak membuat aplikasi
+    di proses worker.
+    """
+
+    def __init__(self, symbols, processes, window=SHARED_WINDOW):
+        self.symbols = list(symbols)
+        self.processes = processes
+        self.buffer = SharedCandleBuffer(self.symbols, window)
+        context = multiprocessing.get_context('forkserver')
+        context.set_forkserver_preload(FORKSERVER_PRELOAD)
+        self.executor = ProcessPoolExecutor(
+            max_workers=processes,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(self.buffer.name, self.symbols, window)
+        )
+        self.in_flight = set()
+        self.lock = threading.Lock()
+
+    def write(self, data):
+        """
+        Menulis candle ke buffer bersama. Menunggu tugas worker yang masih
+        berjalan dulu dan menahan tugas baru sampai selesai menulis, supaya
+        tidak ada worker yang membaca baris setengah ditulis
+
+        Args:
+            data (dict): symbol -> array CANDLE_DTYPE
+
+        Returns:
+            list: Simbol yang ditulis
+        """
+        # _submit memakai lock yang sama, jadi tidak ada tugas baru sampai penulisan selesai
+        with self.lock:
+            wait(self.in_flight)
+            self.in_flight.clear()
+            for symbol, candles in data.items():
+                self.buffer.write(symbol, candles)
+        return list(data)
+
+    def detect(self, symbols, min_confidence_threshold, timestamp):
+        """
+        Deteksi sinyal semua simbol, satu tugas per shard
+
+        Args:
+            symbols (list): Simbol yang candle-nya sudah ditulis
+            min_confidence_threshold (float): Confidence minimum sinyal
+            timestamp (float): Waktu analisis (epoch) untuk waktu eksekusi sinyal
+
+        Returns:
+            list: Simbol yang punya sinyal
+        """
+        shards = [symbols[index::self.processes] for index in range(self.processes)]
+        futures = [self._submit(_detect_shard, shard, min_confidence_threshold, timestamp)
+                   for shard in shards if shard]
+        return [symbol for future in futures for symbol in future.result()]
+
+    def confirm(self, symbol, min_confidence_threshold, timestamp):
+        """
+        Deteksi ulang satu simbol di worker dan gambar chart-nya jika sinyal
+        masih berlaku
+
+        Returns:
+            tuple: (data sinyal, path chart), atau (None, None) tanpa sinyal
+        """
+        return self._submit(_confirm_symbol, symbol, min_confidence_threshold, timestamp).result()
+
+    def close(self):
+        self.executor.shutdown(wait=True, cancel_futures=True)
+        self.buffer.close()
+
+    def _submit(self, function, *args):
+        with self.lock:
+            future = self.executor.submit(function, *args)
+            self.in_flight.add(future)
+        return future
+
+
+def _init_worker(buffer_name, symbols, window):
+    """Initializer proses worker: pasang buffer bersama dan komponen analisis"""
+    global _worker
+    # Import di sini untuk menghindari circular import
+    from utils.chart_generator import ChartGenerator
+    from utils.indicator_cache import IndicatorCache
+    from utils.market_analyzer import MarketAnalyzer
+    from utils.technical_indicators import TechnicalIndicators
+
+    _worker = types.SimpleNamespace(
+        buffer=SharedCandleBuffer(symbols, window, name=buffer_name),
+        indicator_cache=IndicatorCache(TechnicalIndicators()),
+        chart_generator=ChartGenerator(),
+        detector=MarketAnalyzer.detector(ReplayClock(0)),
+    )
+
+
+def _indicator_frames(symbols):
+    from utils.market_analyzer import ANALYSIS_INDICATORS
+
+    return _worker.indicator_cache.calculate_indicators_batch({
+        symbol: candles for symbol, candles in ((symbol, _worker.buffer.read(symbol)) for symbol in symbols)
+        if len(candles)
+    }, timeframe="M1", columns=ANALYSIS_INDICATORS)
+
+
+def _detect(symbol, df, min_confidence_threshold, timestamp):
+    # Waktu eksekusi sinyal mengikuti jam koordinator, bukan jam worker
+    _worker.detector.clock = ReplayClock(timestamp)
+    settings = types.SimpleNamespace(min_confidence_threshold=min_confidence_threshold)
+    return _worker.detector._detect_signal(df, symbol, settings)
+
+
+def _detect_shard(symbols, min_confidence_threshold, timestamp):
+    candidates = []
+    for symbol, df in _indicator_frames(symbols).items():
+        try:
+            if _detect(symbol, df, min_confidence_threshold, timestamp):
+                candidates.append(symbol)
+        except Exception as e:
+            logger.error(f"Error saat menganalisis {symbol}: {str(e)}")
+    return candidates
+
+
+def _confirm_symbol(symbol, min_confidence_threshold, timestamp):
+    frames = _indicator_frames([symbol])
+    if symbol not in frames:
+        return None, None
+
+    df = frames[symbol]
+    signal_data = _detect(symbol, df, min_confidence_threshold, timestamp)
+    if not signal_data:
+        return None, None
+
+    # Chart digambar sebelum sinyal disimpan, jadi namanya dari simbol dan waktu eksekusi
+    signal = types.SimpleNamespace(symbol=symbol, result=None, **signal_data)
+    chart_path = _worker.chart_generator.generate_chart(
+        df,
+        signal,
+        save_dir=os.path.join('static', 'charts'),
+        filename=f"signal_{symbol.replace('/', '_')}_{signal_data['executed_at'].strftime('%Y%m%d_%H%M')}.png"
+    )
+    return signal_data, chart_path
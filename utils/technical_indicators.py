@@ -1,26 +1,48 @@
 import pandas as pd
 import numpy as np
 import logging
+import threading
+
+from utils import indicator_kernels
+from utils.indicator_kernels import INDICATOR_COLUMNS, KernelWorkspace
+from utils.indicator_registry import DEFAULT_REGISTRY
 
 logger = logging.getLogger(__name__)
 
+PRICE_COLUMNS = ('open', 'high', 'low', 'close', 'volume')
+
 class TechnicalIndicators:
     """
     Kelas untuk menghitung indikator teknikal yang digunakan dalam analisis pasar.
     """
     
-    def __init__(self):
+    def __init__(self, registry=None):
         """
         Inisialisasi TechnicalIndicators
+        
+        Args:
+            registry (IndicatorRegistry): Registry indikator (default: DEFAULT_REGISTRY)
         """
-        pass
+        # Graf indikator yang bisa dihitung
+        self.registry = registry or DEFAULT_REGISTRY
+        
+        # Buffer kerja kernel per thread, dipakai ulang antar panggilan
+        self._local = threading.local()
+        
+    def _workspace(self):
+        workspace = getattr(self._local, 'workspace', None)
+        if workspace is None:
+            workspace = self._local.workspace = KernelWorkspace()
+        return workspace
         
-    def calculate_indicators(self, df):
+    def calculate_indicators(self, df, columns=None):
         """
-        Menghitung semua indikator teknikal dari dataframe harga
+        Menghitung indikator teknikal dari dataframe harga
         
         Args:
             df (DataFrame): DataFrame dengan data OHLCV
+            columns (list): Indikator yang dibutuhkan (default: INDICATOR_COLUMNS);
+                hanya indikator ini dan dependensinya yang dihitung
             
         Returns:
             DataFrame: DataFrame dengan indikator teknikal tambahan
@@ -32,26 +54,15 @@ class TechnicalIndicators:
                 logger.error(f"DataFrame tidak memiliki kolom yang dibutuhkan: {col}")
                 raise ValueError(f"DataFrame harus memiliki kolom {required_columns}")
                 
-        # Buat salinan df untuk menghindari SettingWithCopyWarning
-        df = df.copy()
+        # Salinan dangkal: kolom baru tidak mengubah df asli dan data OHLCV tidak disalin
+        df = df.copy(deep=False)
         
-        # Hitung RSI
-        df = self.calculate_rsi(df)
-        
-        # Hitung MACD
-        df = self.calculate_macd(df)
-        
-        # Hitung EMA50
-        df = self.calculate_ema(df, period=50)
-        
-        # Hitung Bollinger Bands
-        df = self.calculate_bollinger_bands(df)
-        
-        # Hitung ATR (Average True Range) untuk mengukur volatilitas
-        df = self.calculate_atr(df)
-        
-        # Hitung Volume MA
-        df = self.calculate_volume_ma(df)
+        # Evaluasi graf indikator; hasil antara seperti EMA close dipakai bersama
+        columns = INDICATOR_COLUMNS if columns is None else columns
+        sources = {name: _values(df, name) for name in PRICE_COLUMNS}
+        values = self.registry.evaluate(sources, columns, self._workspace())
+        for name in columns:
+            df[name] = values[name]
         
         return df
         
@@ -66,21 +77,9 @@ class TechnicalIndicators:
         Returns:
             DataFrame: DataFrame dengan kolom 'rsi' tambahan
         """
-        delta = df['close'].diff()
-        
-        # Pisahkan gain dan loss
-        gain = delta.mask(delta < 0, 0.0)
-        loss = -delta.mask(delta > 0, 0.0)
-        
-        # Hitung average gain dan loss
-        avg_gain = gain.rolling(window=period).mean()
-        avg_loss = loss.rolling(window=period).mean()
-        
-        # Hitung RS (Relative Strength)
-        rs = avg_gain / avg_loss
-        
-        # Hitung RSI
-        df['rsi'] = 100 - (100 / (1 + rs))
+        rsi = np.empty(len(df))
+        indicator_kernels.rsi(_values(df, 'close'), period, rsi, self._workspace())
+        df['rsi'] = rsi
         
         return df
         
@@ -97,18 +96,16 @@ class TechnicalIndicators:
         Returns:
             DataFrame: DataFrame dengan kolom 'macd', 'macd_signal', dan 'macd_hist' tambahan
         """
-        # Hitung EMA cepat dan lambat
-        ema_fast = df['close'].ewm(span=fast_period, adjust=False).mean()
-        ema_slow = df['close'].ewm(span=slow_period, adjust=False).mean()
-        
-        # Hitung MACD line
-        df['macd'] = ema_fast - ema_slow
-        
-        # Hitung signal line
-        df['macd_signal'] = df['macd'].ewm(span=signal_period, adjust=False).mean()
-        
-        # Hitung histogram
-        df['macd_hist'] = df['macd'] - df['macd_signal']
+        macd = np.empty(len(df))
+        macd_signal = np.empty(len(df))
+        macd_hist = np.empty(len(df))
+        indicator_kernels.macd(
+            _values(df, 'close'), fast_period, slow_period, signal_period,
+            macd, macd_signal, macd_hist, self._workspace()
+        )
+        df['macd'] = macd
+        df['macd_signal'] = macd_signal
+        df['macd_hist'] = macd_hist
         
         return df
         
@@ -124,7 +121,9 @@ class TechnicalIndicators:
         Returns:
             DataFrame: DataFrame dengan kolom EMA tambahan
         """
-        df[f'ema{period}'] = df[column].ewm(span=period, adjust=False).mean()
+        ema = np.empty(len(df))
+        indicator_kernels.ema(_values(df, column), period, ema, self._workspace())
+        df[f'ema{period}'] = ema
         
         return df
         
@@ -140,15 +139,15 @@ class TechnicalIndicators:
         Returns:
             DataFrame: DataFrame dengan kolom Bollinger Bands tambahan
         """
-        # Hitung simple moving average
-        df['bb_middle'] = df['close'].rolling(window=period).mean()
-        
-        # Hitung standard deviasi
-        rolling_std = df['close'].rolling(window=period).std()
-        
-        # Hitung upper dan lower bands
-        df['bb_upper'] = df['bb_middle'] + (rolling_std * std_dev)
-        df['bb_lower'] = df['bb_middle'] - (rolling_std * std_dev)
+        bb_middle = np.empty(len(df))
+        bb_upper = np.empty(len(df))
+        bb_lower = np.empty(len(df))
+        indicator_kernels.bollinger_bands(
+            _values(df, 'close'), period, std_dev, bb_middle, bb_upper, bb_lower, self._workspace()
+        )
+        df['bb_middle'] = bb_middle
+        df['bb_upper'] = bb_upper
+        df['bb_lower'] = bb_lower
         
         return df
         
@@ -163,19 +162,11 @@ class TechnicalIndicators:
         Returns:
             DataFrame: DataFrame dengan kolom 'atr' tambahan
         """
-        high = df['high']
-        low = df['low']
-        close = df['close']
-        
-        # Hitung True Range
-        tr1 = high - low
-        tr2 = abs(high - close.shift())
-        tr3 = abs(low - close.shift())
-        
-        tr = pd.DataFrame({'tr1': tr1, 'tr2': tr2, 'tr3': tr3}).max(axis=1)
-        
-        # Hitung ATR
-        df['atr'] = tr.rolling(window=period).mean()
+        atr = np.empty(len(df))
+        indicator_kernels.atr(
+            _values(df, 'high'), _values(df, 'low'), _values(df, 'close'), period, atr, self._workspace()
+        )
+        df['atr'] = atr
         
         return df
         
@@ -190,6 +181,122 @@ class TechnicalIndicators:
         Returns:
             DataFrame: DataFrame dengan kolom 'volume_ma' tambahan
         """
-        df['volume_ma'] = df['volume'].rolling(window=period).mean()
+        volume_ma = np.empty(len(df))
+        indicator_kernels.rolling_mean(_values(df, 'volume'), period, volume_ma)
+        df['volume_ma'] = volume_ma
         
         return df
+        
+    def calculate_indicators_batch(self, data, symbols=None, columns=None):
+        """
+        Menghitung indikator untuk banyak simbol sekaligus dalam satu pass
+        NumPy sepanjang sumbu waktu, tanpa DataFrame per simbol
+        
+        Args:
+            data: dict simbol -> array CANDLE_DTYPE (hasil get_historical_data_many
+                dengan columnar=True), atau dict kolom -> array 2-D (simbol x waktu)
+                seperti hasil SyntheticMarketFeed.generate
+            symbols (list): Nama simbol untuk baris array 2-D
+            columns (list): Indikator yang dibutuhkan (default: INDICATOR_COLUMNS)
+            
+        Returns:
+            IndicatorBatch: Kolom 2-D beserta indikatornya, bisa diakses per simbol
+        """
+        symbols, stacked, starts = _stack_candles(data, symbols)
+        if not symbols:
+            return IndicatorBatch(symbols, stacked, starts)
+        
+        # Simbol dengan riwayat lebih pendek diawali NaN; kernel EMA memulai
+        # barisnya dari candle pertama yang berisi data
+        columns = INDICATOR_COLUMNS if columns is None else columns
+        values = self.registry.evaluate(stacked, columns, self._workspace())
+        stacked.update((name, values[name]) for name in columns)
+        return IndicatorBatch(symbols, stacked, starts)
+
+
+class IndicatorBatch:
+    """
+    Hasil calculate_indicators_batch: setiap kolom adalah array 2-D
+    (simbol x waktu). Simbol dengan riwayat lebih pendek diratakan ke kanan
+    dan diisi NaN di awal; frame() dan column() hanya mengembalikan bagian
+    yang berisi data.
+    """
+    
+    def __init__(self, symbols, columns, starts):
+        self.symbols = list(symbols)
+        self.columns = columns
+        self.starts = starts
+        self.rows = {symbol: i for i, symbol in enumerate(self.symbols)}
+        
+    def __len__(self):
+        return len(self.symbols)
+        
+    def __contains__(self, symbol):
+        return symbol in self.rows
+        
+    def column(self, name, symbol):
+        """Kolom satu simbol sebagai array 1-D"""
+        row = self.rows[symbol]
+        return self.columns[name][row, self.starts[row]:]
+        
+    def frame(self, symbol):
+        """DataFrame satu simbol dengan kolom yang sama seperti hasil calculate_indicators"""
+        return pd.DataFrame({name: self.column(name, symbol) for name in self.columns})
+        
+    def last(self, symbol):
+        """Nilai semua kolom pada candle terakhir simbol"""
+        row = self.rows[symbol]
+        return {name: values[row, -1] for name, values in self.columns.items()}
+
+
+def _stack_candles(data, symbols=None):
+    """
+    Menyusun input calculate_indicators_batch menjadi kolom 2-D (simbol x waktu)
+    
+    Returns:
+        tuple: (simbol, dict kolom -> array 2-D, indeks awal data tiap simbol)
+    """
+    # Sudah berupa kolom 2-D
+    if 'close' in data and np.ndim(data['close']) == 2:
+        columns = {
+            name: np.asarray(values, dtype=float) if name in PRICE_COLUMNS else np.asarray(values)
+            for name, values in data.items()
+        }
+        if symbols is None:
+            symbols = [str(i) for i in range(len(columns['close']))]
+        for name in PRICE_COLUMNS:
+            if name not in columns:
+                raise ValueError(f"Data harus memiliki kolom {list(PRICE_COLUMNS)}")
+        return list(symbols), columns, [0] * len(symbols)
+    
+    # dict simbol -> array CANDLE_DTYPE dengan panjang berbeda-beda
+    symbols = list(data if symbols is None else symbols)
+    if not symbols:
+        return [], {name: np.empty((0, 0)) for name in PRICE_COLUMNS}, []
+    length = max(len(data[symbol]) for symbol in symbols)
+    names = data[symbols[0]].dtype.names
+    
+    columns = {}
+    for name in names:
+        dtype = data[symbols[0]].dtype[name]
+        if name in PRICE_COLUMNS:
+            columns[name] = np.full((len(symbols), length), np.nan)
+        elif np.issubdtype(dtype, np.datetime64):
+            columns[name] = np.full((len(symbols), length), np.datetime64('NaT'), dtype=dtype)
+        else:
+            columns[name] = np.zeros((len(symbols), length), dtype=dtype)
+    
+    starts = []
+    for row, symbol in enumerate(symbols):
+        candles = data[symbol]
+        start = length - len(candles)
+        starts.append(start)
+        for name in names:
+            columns[name][row, start:] = candles[name]
+    
+    return symbols, columns, starts
+
+
+def _values(df, column):
+    """Kolom DataFrame sebagai array float64, tanpa salinan jika sudah float64"""
+    return df[column].to_numpy(dtype=np.float64)
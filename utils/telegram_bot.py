@@ -9,6 +9,14 @@ import aiohttp
 import asyncio
 from datetime import datetime, timedelta
 
+# Label hasil di pesan Telegram; EXPIRED berarti hasilnya tidak dapat ditentukan
+RESULT_LABELS = {
+    "WIN": "✅ WIN",
+    "LOSS": "❌ LOSS",
+    "DRAW": "⚠️ DRAW",
+    "EXPIRED": "⌛ EXPIRED (candle eksekusi tidak tersedia, tidak dihitung dalam win rate)",
+}
+
 class TelegramBot:
     """
     Kelas untuk mengelola interaksi dengan Telegram Bot API
@@ -379,18 +387,22 @@ Bot ini dirancang untuk pasar OTC Pocket Option dengan fokus pada timeframe M1,
         Returns:
             str: Pesan terformat
         """
-        # Emoji hasil
-        result_emoji = "✅" if signal.result == "WIN" else "❌" if signal.result == "LOSS" else "⚠️"
+        # Label hasil beserta emoji
+        result_label = RESULT_LABELS.get(signal.result, f"⚠️ {signal.result}")
         
         # Format waktu trade
         trade_time = signal.executed_at.strftime('%H:%M')
         
+        # Sinyal EXPIRED tidak punya harga open/close
+        open_price = signal.open_price if signal.open_price is not None else "-"
+        close_price = signal.close_price if signal.close_price is not None else "-"
+        
         message = f"""
-<b>HASIL: {result_emoji} {signal.result}</b>
+<b>HASIL: {result_label}</b>
 PAIR: {signal.symbol}
 WAKTU TRADE: {trade_time} WIB
-OPEN PRICE: {signal.open_price}
-CLOSE PRICE: {signal.close_price}
+OPEN PRICE: {open_price}
+CLOSE PRICE: {close_price}
 
 <b>ANALISIS PASCA-EKSEKUSI:</b>
 {signal.post_analysis}